@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import sys
+from argparse import ArgumentParser, Namespace
+from contextlib import redirect_stdout
+from io import StringIO
+from json import dump, load
+from os import listdir
+from os.path import dirname, exists, join, realpath, splitext
+from platform import python_implementation, python_version
+from statistics import mean, median, stdev
+from time import perf_counter
+from typing import Callable
+
+BENCHDIR = dirname(realpath(__file__))
+sys.path.insert(0, join(dirname(BENCHDIR), 'viper'))
+
+from closureCompiler import ClosureCompiler
+from compiler import Compiler
+from errors import Error
+from interpreter import Interpreter
+from lexer import Lexer
+from nodes import Node
+from parser import Parser
+from position import SourceMap
+from resolver import Frame, Resolver
+from vm import VM
+
+BASELINE = join(BENCHDIR, 'baseline.json')
+PHASES = ('lex', 'parse', 'run', 'total')
+THRESHOLD = 0.10
+NOISEFLOOR = 0.001
+
+class BenchmarkError(Exception):
+    def __init__(self, name: str, error: Error | str) -> None:
+        super().__init__(f'{name}: {error}')
+
+def programs(filters: list[str] | None = None) -> dict[str, str]:
+    names = sorted(splitext(fileName)[0] for fileName in listdir(BENCHDIR) if fileName.endswith('.vip'))
+    if filters: names = [name for name in names if any(pattern in name for pattern in filters)]
+    return {name: join(BENCHDIR, name + '.vip') for name in names}
+
+def countNodes(nodes: list[Node]) -> int:
+    seen: set[int] = set()
+    pending: list[object] = [nodes]
+    while pending:
+        value = pending.pop()
+        if isinstance(value, (list, tuple)): pending += value
+        elif isinstance(value, Node) and id(value) not in seen:
+            seen.add(id(value))
+            pending += vars(value).values()
+    return len(seen)
+
+def execute(nodes: list[Node], srcMap: SourceMap, engine: str) -> Error | None:
+    if engine == 'vm':
+        codeObj = Compiler(nodes, srcMap).compile()
+        if isinstance(codeObj, Error): return codeObj
+        result = VM(codeObj, srcMap).run()
+    elif engine == 'closure':
+        result = ClosureCompiler(nodes, srcMap).run()
+    else:
+        resolver = Resolver()
+        resolver.resolve(nodes)
+        result = Interpreter(nodes, srcMap, frame=Frame(resolver.frameSize)).traverse()
+    return result if isinstance(result, Error) else None
+
+def measure(name: str, srcCode: str, engine: str) -> dict[str, float | int]:
+    srcMap = SourceMap(srcCode.replace('\t', '    '))
+    timings: dict[str, float | int] = {}
+
+    start = perf_counter()
+    tokens = Lexer(srcMap).yieldTokens()
+    timings['lex'] = perf_counter() - start
+    if isinstance(tokens, Error): raise BenchmarkError(name, tokens)
+
+    start = perf_counter()
+    nodes = Parser(tokens, srcMap).parse()
+    timings['parse'] = perf_counter() - start
+    if isinstance(nodes, Error): raise BenchmarkError(name, nodes)
+    timings['tokens'] = len(tokens)
+    timings['nodes'] = countNodes(nodes)
+
+    start = perf_counter()
+    with redirect_stdout(StringIO()): error = execute(nodes, srcMap, engine)
+    timings['run'] = perf_counter() - start
+    if error != None: raise BenchmarkError(name, error)
+
+    timings['total'] = timings['lex'] + timings['parse'] + timings['run']
+    return timings
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    return {
+        'min': min(samples),
+        'median': median(samples),
+        'mean': mean(samples),
+        'stdev': stdev(samples) if len(samples) > 1 else 0.0,
+    }
+
+def benchmark(name: str, path: str, engine: str, repeat: int) -> dict:
+    with open(path, 'r') as srcFile: srcCode = srcFile.read()
+    runs = [measure(name, srcCode, engine) for _ in range(repeat)]
+    result: dict = {'tokens': runs[0]['tokens'], 'nodes': runs[0]['nodes']}
+    for phase in PHASES: result[phase] = summarize([run[phase] for run in runs])
+    return result
+
+def compare(results: dict[str, dict], baseline: dict[str, dict], threshold: float) -> list[str]:
+    regressions: list[str] = []
+    for name, result in results.items():
+        if name not in baseline: continue
+        for phase in PHASES:
+            old, new = baseline[name][phase]['median'], result[phase]['median']
+            if new - old < NOISEFLOOR or new <= old * (1 + threshold): continue
+            regressions.append(f'{name}.{phase}: {old * 1000:.2f}ms -> {new * 1000:.2f}ms (+{(new / old - 1) * 100:.1f}%)')
+    return regressions
+
+def report(results: dict[str, dict], baseline: dict[str, dict], write: Callable[[str], object] = print) -> None:
+    write(f"{'benchmark':<12} {'tokens':>8} {'nodes':>8} " + ' '.join(f'{phase + " ms":>10}' for phase in PHASES) + f" {'vs base':>9}")
+    for name, result in results.items():
+        timings = ' '.join(f"{result[phase]['median'] * 1000:>10.2f}" for phase in PHASES)
+        delta = ''
+        if name in baseline: delta = f"{(result['total']['median'] / baseline[name]['total']['median'] - 1) * 100:+.1f}%"
+        write(f"{name:<12} {result['tokens']:>8} {result['nodes']:>8} {timings} {delta:>9}")
+
+def getArgs() -> Namespace:
+    argParser = ArgumentParser(prog='bench', description='time the lex, parse and run phases of the Viper benchmark programs')
+    argParser.add_argument('filters', nargs='*', metavar='NAME', help='only run benchmarks whose name contains NAME')
+    argParser.add_argument('--engine', choices=['tree', 'vm', 'closure'], default='tree')
+    argParser.add_argument('--repeat', type=int, default=5, help='timed runs per benchmark (default: %(default)s)')
+    argParser.add_argument('--baseline', default=BASELINE, help='stored results to compare against (default: benchmarks/baseline.json)')
+    argParser.add_argument('--save', action='store_true', help='write these results to the baseline file instead of comparing')
+    argParser.add_argument('--threshold', type=float, default=THRESHOLD, help='fractional slowdown of a median that counts as a regression (default: %(default)s)')
+    argParser.add_argument('--out', metavar='FILE', help='also write the full results to FILE as JSON')
+    args = argParser.parse_args()
+    if args.repeat < 1: argParser.error('--repeat must be at least 1')
+    return args
+
+def main() -> int:
+    args = getArgs()
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 10000))
+
+    results: dict[str, dict] = {}
+    for name, path in programs(args.filters).items():
+        try: results[name] = benchmark(name, path, args.engine, args.repeat)
+        except BenchmarkError as e: print(f'error: {e}', file=sys.stderr); return 2
+
+    stored: dict = {}
+    if exists(args.baseline) and not args.save:
+        with open(args.baseline, 'r') as baselineFile: stored = load(baselineFile)
+    baseline = stored.get('engines', {}).get(args.engine, {})
+
+    document = {
+        'python': f'{python_implementation()} {python_version()}',
+        'repeat': args.repeat,
+        'engines': {args.engine: results},
+    }
+    report(results, baseline)
+
+    if args.out != None:
+        with open(args.out, 'w') as outFile: dump(document, outFile, indent=2)
+    if args.save:
+        if exists(args.baseline):
+            with open(args.baseline, 'r') as baselineFile: stored = load(baselineFile)
+            stored.setdefault('engines', {}).setdefault(args.engine, {}).update(results)
+            document = {**stored, 'python': document['python'], 'repeat': args.repeat}
+        with open(args.baseline, 'w') as baselineFile: dump(document, baselineFile, indent=2)
+        print(f'saved baseline for {args.engine} to {args.baseline}')
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    for regression in regressions: print(f'regression: {regression}', file=sys.stderr)
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
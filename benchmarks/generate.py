@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import sys
+from argparse import ArgumentParser, Namespace
+from itertools import count
+from typing import Callable, Iterator
+
+SHAPES = ('flat', 'nested', 'expression', 'chain')
+UNITS = {'': 1, 'B': 1, 'KB': 1000, 'MB': 1000 ** 2, 'GB': 1000 ** 3}
+DEPTH = 32
+TERMS = 500
+CHAIN = 100
+OPERATORS = ('+', '*', '-', '/', '+', '<', 'and', '-', '*', '>=', 'or')
+
+def parseSize(size: str) -> int:
+    size = size.strip().upper()
+    digits = size.rstrip('KMGB')
+    unit = size[len(digits):]
+    if unit not in UNITS or not digits: raise ValueError(f'invalid size: {size!r}')
+    return int(float(digits) * UNITS[unit])
+
+def formatSize(size: int) -> str:
+    for unit in ('GB', 'MB', 'KB'):
+        if size >= UNITS[unit] and size % UNITS[unit] == 0: return f'{size // UNITS[unit]}{unit}'
+    return f'{size}B'
+
+def flat(i: int) -> str:
+    j = i // 2
+    match i % 6:
+        case 0: return f'num v{i} = ({i} + v{j}) * 2 - {i % 7}\n'
+        case 1: return f"String s{i} = 'row {i}'\n"
+        case 2: return f'v{j} += {i} / 3\n'
+        case 3: return f'if (v{j} > {i}) {{ v{j} -= 1 }} elif (v{j} == 0) {{ v{j} = 1 }} else {{ v{j} += 1 }}\n'
+        case 4: return f'for (num k{i} = 0; k{i} < 3; k{i} += 1) {{ v{j} += k{i} }}\n'
+        case _: return f'num f{i}(num a, num b) return a * b + {i}\n'
+
+def nested(i: int, depth: int) -> str:
+    lines: list[str] = []
+    for level in range(depth):
+        indent = '    ' * level
+        match level % 3:
+            case 0: lines.append(f'{indent}if (d{i} > {level}) {{')
+            case 1: lines.append(f'{indent}for (num k{level} = 0; k{level} < {level}; k{level} += 1) {{')
+            case _: lines.append(f'{indent}while (d{i} < {level}) {{')
+        lines.append(f'{indent}    d{i} += {level}')
+    for level in reversed(range(depth)): lines.append('    ' * level + '}')
+    return '\n'.join(lines) + '\n'
+
+def expression(i: int, terms: int) -> str:
+    parts = [f'num e{i} =', '1']
+    for term in range(1, terms):
+        operand = f'x{term % 13}' if term % 3 else f'({term} - y{term % 5})' if term % 2 else f'{term}.5'
+        parts += [OPERATORS[(i + term) % len(OPERATORS)], operand]
+    return ' '.join(parts) + '\n'
+
+def chain(i: int, length: int) -> str:
+    return f'node{i % 97}.' + '.'.join(f'child{link % 10}' for link in range(1, length)) + f'({i}, x{i % 13})\n'
+
+def statements(shape: str, depth: int = DEPTH, terms: int = TERMS, length: int = CHAIN) -> Iterator[str]:
+    builders: dict[str, Callable[[int], str]] = {
+        'flat': flat,
+        'nested': lambda i: nested(i, depth),
+        'expression': lambda i: expression(i, terms),
+        'chain': lambda i: chain(i, length),
+    }
+    build = builders[shape]
+    for i in count(): yield build(i)
+
+def generate(shape: str, size: int, depth: int = DEPTH, terms: int = TERMS, length: int = CHAIN) -> str:
+    if shape not in SHAPES: raise ValueError(f'unknown shape: {shape!r}')
+    chunks: list[str] = []
+    total = 0
+    for stmt in statements(shape, depth, terms, length):
+        if total >= size: break
+        chunks.append(stmt)
+        total += len(stmt)
+    return ''.join(chunks)
+
+def getArgs() -> Namespace:
+    argParser = ArgumentParser(prog='generate', description='write a syntactically valid Viper program of roughly SIZE bytes')
+    argParser.add_argument('shape', choices=SHAPES)
+    argParser.add_argument('size', type=parseSize, help='target size, e.g. 10KB, 2.5MB or 100MB')
+    argParser.add_argument('--out', '-o', metavar='FILE', help='write to FILE instead of stdout')
+    argParser.add_argument('--depth', type=int, default=DEPTH, help='block nesting depth for the nested shape (default: %(default)s)')
+    argParser.add_argument('--terms', type=int, default=TERMS, help='operands per expression for the expression shape (default: %(default)s)')
+    argParser.add_argument('--chain', type=int, default=CHAIN, help='identifiers per dot-chain for the chain shape (default: %(default)s)')
+    return argParser.parse_args()
+
+if __name__ == '__main__':
+    args = getArgs()
+    srcCode = generate(args.shape, args.size, args.depth, args.terms, args.chain)
+    if args.out == None: sys.stdout.write(srcCode)
+    else:
+        with open(args.out, 'w') as outFile: outFile.write(srcCode)
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import gc
+import sys
+import tracemalloc
+from argparse import ArgumentParser, Namespace
+from json import dump
+from math import log
+from time import perf_counter
+
+from bench import countNodes
+from generate import CHAIN, DEPTH, SHAPES, TERMS, formatSize, generate, parseSize
+
+from errors import Error
+from lexer import Lexer
+from parser import Parser
+from position import SourceMap
+
+SIZES = ('10KB', '100KB', '1MB', '10MB')
+TOLERANCE = 0.15
+MINTIME = 0.05
+
+class FrontEndError(Exception):
+    pass
+
+def frontEnd(srcCode: str) -> tuple[float, float, list, list]:
+    srcMap = SourceMap(srcCode)
+    start = perf_counter()
+    tokens = Lexer(srcMap).yieldTokens()
+    lexTime = perf_counter() - start
+    if isinstance(tokens, Error): raise FrontEndError(str(tokens))
+
+    start = perf_counter()
+    try: nodes = Parser(tokens, srcMap).parse()
+    except RecursionError: raise FrontEndError('RecursionError: the parser ran out of Python stack')
+    parseTime = perf_counter() - start
+    if isinstance(nodes, Error): raise FrontEndError(str(nodes))
+    return lexTime, parseTime, tokens, nodes
+
+def peakMemory(srcCode: str) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        frontEnd(srcCode)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def measure(srcCode: str, repeat: int, memory: bool) -> dict:
+    lexTimes: list[float] = []
+    parseTimes: list[float] = []
+    for _ in range(repeat):
+        gc.collect()
+        lexTime, parseTime, tokens, nodes = frontEnd(srcCode)
+        lexTimes.append(lexTime)
+        parseTimes.append(parseTime)
+
+    result = {
+        'bytes': len(srcCode),
+        'tokens': len(tokens),
+        'nodes': countNodes(nodes),
+        'lex': min(lexTimes),
+        'parse': min(parseTimes),
+    }
+    del tokens, nodes
+    result['tokensPerSec'] = result['tokens'] / result['lex']
+    result['nodesPerSec'] = result['nodes'] / result['parse']
+    result['peak'] = peakMemory(srcCode) if memory else None
+    return result
+
+def exponent(old: float, new: float, oldSize: int, newSize: int) -> float:
+    return log(new / old) / log(newSize / oldSize)
+
+def growth(previous: dict, current: dict) -> dict[str, float]:
+    exponents: dict[str, float] = {}
+    for metric in ('lex', 'parse', 'peak'):
+        old, new = previous.get(metric), current.get(metric)
+        if not old or not new or current['bytes'] == previous['bytes']: continue
+        if metric != 'peak' and min(old, new) < MINTIME: continue
+        exponents[metric] = exponent(old, new, previous['bytes'], current['bytes'])
+    return exponents
+
+def getArgs() -> Namespace:
+    argParser = ArgumentParser(prog='scaling', description='measure how the Viper lexer and parser scale with generated input size')
+    argParser.add_argument('--shape', action='append', choices=SHAPES, help='source shape to generate; repeat for several (default: all)')
+    argParser.add_argument('--sizes', nargs='+', type=parseSize, default=[parseSize(size) for size in SIZES], metavar='SIZE', help='input sizes, e.g. 10KB 1MB 100MB (default: %s)' % ' '.join(SIZES))
+    argParser.add_argument('--repeat', type=int, default=1, help='timed runs per size; the fastest is kept (default: %(default)s)')
+    argParser.add_argument('--tolerance', type=float, default=TOLERANCE, help='growth exponent above 1 + TOLERANCE is flagged as superlinear (default: %(default)s)')
+    argParser.add_argument('--no-memory', dest='memory', action='store_false', help='skip the tracemalloc pass that measures peak memory')
+    argParser.add_argument('--depth', type=int, default=DEPTH, help='block nesting depth for the nested shape (default: %(default)s)')
+    argParser.add_argument('--terms', type=int, default=TERMS, help='operands per expression for the expression shape (default: %(default)s)')
+    argParser.add_argument('--chain', type=int, default=CHAIN, help='identifiers per dot-chain for the chain shape (default: %(default)s)')
+    argParser.add_argument('--out', metavar='FILE', help='also write the results to FILE as JSON')
+    args = argParser.parse_args()
+    if args.repeat < 1: argParser.error('--repeat must be at least 1')
+    return args
+
+def main() -> int:
+    args = getArgs()
+    results: dict[str, list[dict]] = {}
+    flagged: list[str] = []
+    failed = False
+
+    print(f"{'shape':<11} {'size':>6} {'tokens':>10} {'nodes':>10} {'tokens/s':>10} {'nodes/s':>10} {'peak MB':>9}  growth (lex/parse/peak)")
+    for shape in args.shape or SHAPES:
+        results[shape] = []
+        previous: dict | None = None
+        for size in sorted(args.sizes):
+            srcCode = generate(shape, size, args.depth, args.terms, args.chain)
+            try: result = measure(srcCode, args.repeat, args.memory)
+            except FrontEndError as e:
+                print(f'{shape:<11} {formatSize(size):>6}  error: {e}')
+                results[shape].append({'size': size, 'bytes': len(srcCode), 'error': str(e)})
+                failed = True
+                break
+            finally: del srcCode
+
+            result['size'] = size
+            exponents = growth(previous, result) if previous != None else {}
+            result['growth'] = exponents
+            results[shape].append(result)
+            for metric, value in exponents.items():
+                if value > 1 + args.tolerance: flagged.append(f'{shape} {metric}: {formatSize(previous["size"])} -> {formatSize(size)} grew with exponent {value:.2f}') # type: ignore
+            previous = result
+
+            marks = ' '.join(f'{metric}^{value:.2f}' + ('!' if value > 1 + args.tolerance else '') for metric, value in exponents.items())
+            peak = f"{result['peak'] / 1e6:>9.1f}" if result['peak'] != None else f"{'-':>9}"
+            print(f"{shape:<11} {formatSize(size):>6} {result['tokens']:>10} {result['nodes']:>10} {result['tokensPerSec']:>10.0f} {result['nodesPerSec']:>10.0f} {peak}  {marks}")
+
+    if args.out != None:
+        with open(args.out, 'w') as outFile: dump(results, outFile, indent=2)
+    for flag in flagged: print(f'superlinear: {flag}', file=sys.stderr)
+    return 1 if flagged or failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
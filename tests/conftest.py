@@ -0,0 +1,4 @@
+import sys
+from os.path import abspath, dirname, join
+
+sys.path.insert(0, join(dirname(dirname(abspath(__file__))), 'viper'))
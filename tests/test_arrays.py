@@ -0,0 +1,135 @@
+from array import array
+from operator import add, lt, mul, truediv
+
+import pytest
+
+import inbuilt
+from inbuilt import FALSE, TRUE, Array, Number, String, vectorized
+
+NONUMPY = pytest.mark.skipif(inbuilt.numpy is None, reason='NumPy is not installed')
+
+def nums(*values: int | float) -> list:
+    return [Number(value) for value in values]
+
+def testIntsArePackedAsInt64():
+    arr = Array.of('num', nums(1, 2, 3))
+    assert isinstance(arr.items, array) and arr.items.typecode == 'q'
+    assert arr.get(Number(-1)) == Number(3)
+
+def testFloatLiteralPromotesToDoubles():
+    arr = Array.of('num', nums(1, 2.5))
+    assert isinstance(arr.items, array) and arr.items.typecode == 'd'
+    assert list(arr.values()) == [1.0, 2.5]
+
+def testAppendingAFloatPromotesToDoubles():
+    arr = Array.of('num', nums(1, 2))
+    arr.append(Number(2.5))
+    assert isinstance(arr.items, array) and arr.items.typecode == 'd'
+    assert list(arr.values()) == [1.0, 2.0, 2.5]
+    assert arr.get(Number(1)).value == 2.0
+
+def testSettingAFloatPromotesToDoubles():
+    arr = Array.of('num', nums(1, 2))
+    arr.set(Number(0), Number(0.5))
+    assert isinstance(arr.items, array) and arr.items.typecode == 'd'
+    assert list(arr.values()) == [0.5, 2.0]
+
+def testHugeIntsFallBackToAList():
+    arr = Array.of('num', nums(1, 2))
+    arr.append(Number(2 ** 70 + 1))
+    assert isinstance(arr.items, list)
+    assert arr.get(Number(2)).value == 2 ** 70 + 1
+    assert isinstance(Array.of('num', nums(1, 2 ** 70)).items, list)
+
+def testBoolsArePackedOnePerByte():
+    arr = Array.of('bool', [TRUE, FALSE])
+    arr.append(TRUE)
+    assert isinstance(arr.items, bytearray) and len(arr) == 3
+    assert arr.get(Number(0)) is TRUE and arr.get(Number(1)) is FALSE
+    assert list(arr.values()) == [True, False, True]
+
+def testElementTypesAreChecked():
+    with pytest.raises(TypeError): Array.of('num', [Number(1), String('a')])
+    arr = Array.of('String', [String('a')])
+    with pytest.raises(TypeError): arr.append(Number(1))
+    with pytest.raises(TypeError): arr.set(Number(0), TRUE)
+    assert list(arr.values()) == ['a']
+
+def testIndicesAreChecked():
+    arr = Array.of('num', nums(1, 2))
+    with pytest.raises(IndexError): arr.get(Number(2))
+    with pytest.raises(IndexError): arr.get(Number(-3))
+    with pytest.raises(TypeError): arr.get(Number(0.5))
+    with pytest.raises(TypeError): arr.get(String('0'))
+    assert arr.get(Number(1.0)) == Number(2)
+
+@pytest.fixture(params=['python', pytest.param('numpy', marks=NONUMPY)])
+def kernels(request, monkeypatch):
+    if request.param == 'python': monkeypatch.setattr(inbuilt, 'numpy', None)
+    return request.param
+
+def testArithmeticIsElementwise(kernels):
+    a, b = Array.of('num', nums(1, 2, 3)), Array.of('num', nums(4, 5, 6))
+    assert list((a + b).values()) == [5, 7, 9]
+    assert list((a * Number(2)).values()) == [2, 4, 6]
+    assert list((Number(10) - a).values()) == [9, 8, 7]
+    assert list((a / Number(2)).values()) == [0.5, 1.0, 1.5]
+    assert list((Number(2) ** a).values()) == [2, 4, 8]
+    assert list((-a).values()) == [-1, -2, -3]
+
+def testIntsAndDoublesMix(kernels):
+    result = Array.of('num', nums(1, 2)) + Array.of('num', nums(0.5, 0.25))
+    assert result.dataType == 'num[]' and list(result.values()) == [1.5, 2.25]
+
+def testComparisonsAndLogicalOpsGiveBools(kernels):
+    a = Array.of('num', nums(1, 2, 3))
+    assert (a < Number(2)).dataType == 'bool[]'
+    assert list((a < Number(2)).values()) == [True, False, False]
+    assert list((a == Array.of('num', nums(1, 0, 3))).values()) == [True, False, True]
+    assert list((Array.of('bool', [TRUE, FALSE]) & TRUE).values()) == [True, False]
+    assert list((Array.of('String', [String('a'), String('b')]) == String('b')).values()) == [False, True]
+
+def testOverflowStaysExact(kernels):
+    big = Array.of('num', nums(2 ** 62, -2 ** 62))
+    assert list((big * Number(4)).values()) == [2 ** 64, -2 ** 64]
+    assert list((big + big).values()) == [2 ** 63, -2 ** 63]
+    assert list((Array.of('num', nums(3, 7)) ** Number(40)).values()) == [3 ** 40, 7 ** 40]
+    assert list((Array.of('num', nums(2 ** 53 + 1)) == Number(float(2 ** 53))).values()) == [False]
+
+def testDivisionByZeroRaises(kernels):
+    with pytest.raises(ZeroDivisionError): Array.of('num', nums(1, 2)) / Number(0)
+
+def testLengthMismatchRaises(kernels):
+    with pytest.raises(TypeError, match='length 2 .* length 3'): Array.of('num', nums(1, 2)) + Array.of('num', nums(1, 2, 3))
+    with pytest.raises(TypeError): Array.of('num', nums(1, 2)) < Array.of('num', nums(1))
+
+def testTypeMismatchRaises(kernels):
+    with pytest.raises(TypeError): Array.of('num', nums(1, 2)) + String('a')
+    with pytest.raises(TypeError): Array.of('String', [String('a')]) * Number(2)
+    with pytest.raises(TypeError): Array.of('bool', [TRUE]) + Array.of('num', nums(1))
+    with pytest.raises(TypeError): Array.of('String', [String('a')]) < Array.of('num', nums(1))
+    with pytest.raises(TypeError): Array.of('num', nums(1)) == Array.of('String', [String('a')])
+
+def testPythonLoopWithoutNumPy(monkeypatch):
+    monkeypatch.setattr(inbuilt, 'numpy', None)
+    a = Array.of('num', nums(1, 2))
+    assert a.vector() is None and vectorized(add, a, a, False) is None
+    result = a + a
+    assert isinstance(result.items, array) and result.items.typecode == 'q'
+
+@NONUMPY
+def testNumPyKernelsRunWhenExact():
+    a, b = Array.of('num', nums(1, 2, 3)), Array.of('num', nums(0.5, 1, 2))
+    for op, right in [(add, a), (mul, 3), (truediv, b), (lt, b)]:
+        assert vectorized(op, a, right, False) is not None
+    assert vectorized(mul, Array.of('num', nums(2 ** 62)), 4, False) is None
+    assert vectorized(add, a, 'a', False) is None
+    assert vectorized(add, Array.of('num', nums(1, 2 ** 70)), 1, False) is None
+
+@NONUMPY
+def testNumPyKernelsMatchPythonLoop(monkeypatch):
+    a, b = Array.of('num', nums(-3, 0, 7, 2 ** 40)), Array.of('num', nums(1.5, -2, 0.25, 3))
+    ops = [lambda x, y: x + y, lambda x, y: x - y, lambda x, y: x * y, lambda x, y: x / y, lambda x, y: x < y, lambda x, y: x == y]
+    fast = [(op(a, b).dataType, list(op(a, b).values())) for op in ops]
+    monkeypatch.setattr(inbuilt, 'numpy', None)
+    assert fast == [(op(a, b).dataType, list(op(a, b).values())) for op in ops]
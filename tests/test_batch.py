@@ -0,0 +1,41 @@
+import os
+
+import batch
+from batch import Batch
+
+SCRIPTS = {
+    'a_slow.vip': 'num i = 0\nwhile (i >= 0) { i += 1 }',
+    'b_ok.vip': "print('hello')",
+    'c_error.vip': 'print(zz)',
+    'd_ok.vip': 'num x = 2\nprint(x * 21)',
+}
+
+def writeScripts(tmp_path, scripts: dict[str, str]) -> str:
+    for name, srcCode in scripts.items(): (tmp_path / name).write_text(srcCode)
+    return str(tmp_path)
+
+def testPassFailAndTimeout(tmp_path):
+    reported: list[str] = []
+    results = Batch(writeScripts(tmp_path, SCRIPTS), jobs=2, timeout=1).run(lambda result: reported.append(os.path.basename(result.path)))
+
+    assert [(os.path.basename(result.path), result.status) for result in results] == [
+        ('a_slow.vip', 'timeout'), ('b_ok.vip', 'ok'), ('c_error.vip', 'error'), ('d_ok.vip', 'ok'),
+    ]
+    assert results[1].stdout == 'hello\n' and results[3].stdout == '42\n'
+    assert results[2].summary() == 'UndefinedNameError: Name zz is undefined | column 7 line 1'
+    assert reported[-1] == 'a_slow.vip'
+
+def crashOnDie(path: str):
+    if path.endswith('die.vip'): os._exit(1)
+    return runScript(path)
+
+runScript = batch.runScript
+
+def testDeadWorkerBecomesCrashResults(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch, 'runScript', crashOnDie)
+    run = Batch(writeScripts(tmp_path, {'die.vip': "print('x')", 'ok.vip': "print('y')"}), jobs=1, timeout=5)
+    results = run.run()
+
+    assert len(results) == 2
+    assert results[0].status == 'crash' and 'worker process died' in results[0].stderr
+    assert run.counts()['crash'] + run.counts()['ok'] == 2
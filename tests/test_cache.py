@@ -0,0 +1,101 @@
+import os
+import pickle
+from time import time
+
+import cache
+from cache import FRONTEND, ProgramCache
+from lexer import Lexer
+from parser import Parser
+
+SOURCE = 'num x = 1 + 2\nprint(x)'
+
+def parse(srcCode: str) -> list:
+    return Parser(Lexer(srcCode).yieldTokens(), srcCode).parse() # type: ignore
+
+def files(cacheDir) -> list[str]:
+    return sorted(os.listdir(cacheDir))
+
+def testRoundTrip(tmp_path):
+    programCache = ProgramCache(str(tmp_path))
+    key = programCache.key(SOURCE)
+    assert programCache.load(key) is None
+    programCache.store(key, parse(SOURCE))
+
+    nodes = programCache.load(key)
+    assert nodes != None and repr(nodes) == repr(parse(SOURCE))
+    assert (programCache.hits, programCache.misses) == (1, 1)
+
+def testSourceChangeMisses(tmp_path):
+    programCache = ProgramCache(str(tmp_path))
+    programCache.store(programCache.key(SOURCE), parse(SOURCE))
+    changed = SOURCE.replace('2', '3')
+    assert programCache.key(changed) != programCache.key(SOURCE)
+    assert programCache.load(programCache.key(changed)) is None
+
+def testOptimizedProgramsHaveTheirOwnEntry(tmp_path):
+    programCache = ProgramCache(str(tmp_path))
+    plainKey, optimizedKey = programCache.key(SOURCE), programCache.key(SOURCE, optimize=True)
+    assert plainKey != optimizedKey
+    programCache.store(plainKey, parse(SOURCE))
+    assert programCache.load(optimizedKey) is None
+    programCache.store(optimizedKey, [])
+    assert programCache.load(optimizedKey) == [] and programCache.load(plainKey) != []
+
+def testFrontEndChangeInvalidates(tmp_path, monkeypatch):
+    module = tmp_path / 'frontend.py'
+    module.write_text('A = 1\n')
+    monkeypatch.setattr(cache, 'FRONTEND', FRONTEND + [str(module)])
+    before = ProgramCache(str(tmp_path / 'cache'))
+    key = before.key(SOURCE)
+    before.store(key, parse(SOURCE))
+
+    module.write_text('A = 2\n')
+    after = ProgramCache(str(tmp_path / 'cache'))
+    assert after.version != before.version and after.key(SOURCE) != key
+    assert after.load(after.key(SOURCE)) is None
+
+def testStaleVersionIsDiscarded(tmp_path):
+    programCache = ProgramCache(str(tmp_path))
+    key = programCache.key(SOURCE)
+    programCache.store(key, parse(SOURCE))
+    programCache.version = 'another'
+    assert programCache.load(key) is None
+    assert files(tmp_path) == []
+
+def testFailedWriteLeavesOldEntry(tmp_path, monkeypatch):
+    programCache = ProgramCache(str(tmp_path))
+    key = programCache.key(SOURCE)
+    programCache.store(key, parse(SOURCE))
+
+    def partialDump(obj, file, protocol=None):
+        file.write(b'partial')
+        raise pickle.PicklingError('boom')
+    monkeypatch.setattr(pickle, 'dump', partialDump)
+    programCache.store(key, [])
+    monkeypatch.undo()
+
+    assert files(tmp_path) == [key + '.vipc']
+    assert repr(programCache.load(key)) == repr(parse(SOURCE))
+
+def testOldEntriesAreEvicted(tmp_path):
+    programCache = ProgramCache(str(tmp_path), maxAge=60)
+    oldKey, newKey = programCache.key('print(1)'), programCache.key('print(2)')
+    programCache.store(oldKey, parse('print(1)'))
+    past = time() - 120
+    os.utime(programCache.path(oldKey), (past, past))
+
+    programCache.store(newKey, parse('print(2)'))
+    assert files(tmp_path) == [newKey + '.vipc']
+
+def testLeastRecentlyUsedEntriesAreEvictedOverSize(tmp_path):
+    programCache = ProgramCache(str(tmp_path))
+    keys = [programCache.key(f'print({idx})') for idx in range(3)]
+    for idx, key in enumerate(keys):
+        programCache.store(key, parse(f'print({idx})'))
+        stamp = time() - 100 + idx
+        os.utime(programCache.path(key), (stamp, stamp))
+    size = os.path.getsize(programCache.path(keys[0]))
+
+    programCache.maxBytes = 2 * size + size // 2
+    programCache.evict()
+    assert files(tmp_path) == sorted(key + '.vipc' for key in keys[1:])
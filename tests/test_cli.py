@@ -0,0 +1,19 @@
+import subprocess
+import sys
+from os.path import abspath, dirname, join
+
+import pytest
+
+VIPER = join(dirname(dirname(abspath(__file__))), 'viper')
+
+NESTEDERROR = 'num f(num n) { if (n > 0) { for (num i = 0; i < 2; i += 1) { while (n > 0) { print(zz) } } } return 0 }\nprint(f(1))\n'
+
+def runMain(tmp_path, srcCode: str, *args: str) -> subprocess.CompletedProcess:
+    path = tmp_path / 'script.vip'
+    path.write_text(srcCode)
+    return subprocess.run([sys.executable, 'main.py', '--no-cache', *args, str(path)], cwd=VIPER, capture_output=True, text=True, timeout=60)
+
+@pytest.mark.parametrize('args', ([], ['--stream'], ['--engine=vm'], ['--engine=closure']))
+def testNestedErrorIsPrintedOnce(tmp_path, args: list[str]):
+    stdout = runMain(tmp_path, NESTEDERROR, *args).stdout
+    assert [line for line in stdout.splitlines() if line.startswith('UndefinedNameError')] == ['UndefinedNameError: Name zz is undefined | column 84 line 1']
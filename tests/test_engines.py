@@ -0,0 +1,52 @@
+import pytest
+
+from errors import Error
+from program import ENGINES, compile
+
+SCRIPTS = {
+    'earlyReturn': ('num f(num n) { if (n < 2) { return n } return 100 }\nprint(f(1), f(5))', '1 100\n', None),
+    'fibWithoutElse': ('num fib(num n) { if (n < 2) { return n } return fib(n - 1) + fib(n - 2) }\nprint(fib(18))', '2584\n', None),
+    'returnFromFor': ('num f(num n) { for (num i = 0; i < 10; i += 1) { if (i == n) { return i * 10 } } return 0 - 1 }\nprint(f(3), f(20))', '30 -1\n', None),
+    'returnFromWhile': ('num f(num n) { while (n > 0) { n -= 1; if (n == 4) { return n } } return 99 }\nprint(f(10), f(2))', '4 99\n', None),
+    'returnFromElif': ("String f(num n) { if (n == 0) { return 'zero' } elif (n == 1) { return 'one' } else { return 'many' } return 'none' }\nprint(f(0), f(1), f(2))", 'zero one many\n', None),
+    'statementValueIsNotReturned': ('num g(num n) { return n }\nnum f(num n) { if (n > 0) { g(n) } return 0 }\nprint(f(5))', '0\n', None),
+    'topLevelReturn': ("print('before')\nreturn 7\nprint('after')", 'before\n', 7),
+    'loops': ('num total = 0\nfor (num i = 0; i < 10; i += 1) { total += i }\nwhile (total > 0) { total -= 10 }\nprint(total)', '-5\n', None),
+}
+
+def outcome(srcCode: str, engine: str) -> tuple:
+    program = compile(srcCode, engine, memoSize=0)
+    assert not isinstance(program, Error), program
+    result = program.run()
+    assert result.ok, result.error
+    return result.output, result.value
+
+@pytest.mark.parametrize('name', SCRIPTS)
+@pytest.mark.parametrize('engine', ENGINES)
+def testEnginesAgree(engine: str, name: str):
+    srcCode, output, value = SCRIPTS[name]
+    assert outcome(srcCode, engine) == (output, value)
+
+def testDeepRecursionIsAViperError():
+    srcCode = 'num count(num n) { if (n == 0) { return 0 } return 1 + count(n - 1) }\nprint(count(5000))'
+    closure = compile(srcCode, 'closure', memoSize=0).run() # type: ignore
+    vm = compile(srcCode, 'vm', memoSize=0, maxDepth=100).run() # type: ignore
+    assert closure.error != None and vm.error != None
+    assert closure.error.errorName == vm.error.errorName == 'RecursionError'
+    assert (closure.error.beginPos, closure.error.endPos) == (vm.error.beginPos, vm.error.endPos)
+
+@pytest.mark.parametrize('engine', ENGINES)
+def testMissingArgumentToMemoizedFunction(engine: str):
+    program = compile('num add(num a, num b) { return a + b }\nnum r = add(1)\nprint(r)', engine)
+    assert not isinstance(program, Error), program
+    assert program.nodes[0].memo != None # type: ignore
+    result = program.run()
+    assert result.error != None and result.error.errorName == 'UndefinedNameError'
+
+@pytest.mark.parametrize('engine', ENGINES)
+def testNestedErrorIsNotPrinted(engine: str):
+    program = compile('num f(num n) { if (n > 0) { for (num i = 0; i < 2; i += 1) { print(zz) } } return 0 }\nprint(f(1))', engine)
+    assert not isinstance(program, Error), program
+    result = program.run()
+    assert result.output == ''
+    assert result.error != None and (result.error.errorName, result.error.details) == ('UndefinedNameError', 'Name zz is undefined')
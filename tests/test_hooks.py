@@ -0,0 +1,59 @@
+from errors import Error
+from hooks import Hook, LatencyHistogram
+from interpreter import Interpreter
+from lexer import Lexer
+from memo import Memoizer
+from parser import Parser
+from position import SourceMap
+from resolver import Frame, Resolver
+
+class Recorder(Hook):
+    def __init__(self) -> None:
+        self.events: list[tuple] = []
+
+    def onCall(self, func, args) -> None:
+        self.events.append(('call', func.funcName.value))
+
+    def onReturn(self, func, value, elapsed) -> None:
+        self.events.append(('return', func.funcName.value))
+
+    def onError(self, func, error, elapsed) -> None:
+        self.events.append(('error', func.funcName.value if func != None else None, error.errorName))
+
+def run(srcCode: str, hook: Hook, resolve: bool = True) -> object:
+    srcMap = SourceMap(srcCode)
+    nodes = Parser(Lexer(srcMap).yieldTokens(), srcMap).parse() # type: ignore
+    Memoizer().attach(nodes) # type: ignore
+    if not resolve: return Interpreter(nodes, srcMap, hooks=[hook]).evaluate() # type: ignore
+    resolver = Resolver()
+    resolver.resolve(nodes) # type: ignore
+    return Interpreter(nodes, srcMap, frame=Frame(resolver.frameSize), hooks=[hook]).evaluate() # type: ignore
+
+def testErrorInNestedBlocksIsReportedOnce():
+    recorder = Recorder()
+    returnVal = run('num x = 1\nif (x == 1) { for (num i = 0; i < 2; i += 1) { print(zz) } }', recorder)
+    assert isinstance(returnVal, Error)
+    assert recorder.events == [('error', None, 'UndefinedNameError')]
+
+def testErrorPassesThroughEveryFunction():
+    recorder = Recorder()
+    run('num inner(num n) { if (n > 0) { return n + zz } return 0 }\nnum outer(num n) { return inner(n) }\nprint(outer(1))', recorder)
+    assert recorder.events == [
+        ('call', 'outer'), ('call', 'inner'),
+        ('error', 'inner', 'UndefinedNameError'), ('error', 'outer', 'UndefinedNameError'),
+        ('error', None, 'UndefinedNameError'),
+    ]
+
+SQUARES = 'num square(num n) { return n * n }\nnum total = 0\nfor (num i = 0; i < 5; i += 1) { total += square(3) }\nprint(total)'
+
+def testMemoHitsAreReported():
+    histogram = LatencyHistogram()
+    run(SQUARES, histogram)
+    [(func, latency)] = histogram.functions.items()
+    assert func.memo != None and func.memo.hits == 4
+    assert latency.calls == 5
+
+def testSymbolTableCallsAreReported():
+    recorder = Recorder()
+    run(SQUARES, recorder, resolve=False)
+    assert recorder.events == [('call', 'square'), ('return', 'square')] * 5
@@ -0,0 +1,34 @@
+import subprocess
+import sys
+from os.path import abspath, dirname, join
+
+from errors import Error
+from lexer import Lexer
+from nodes import BinOpNode, NumberNode, StringNode
+from optimizer import Optimizer
+from parser import Parser
+
+VIPER = join(dirname(dirname(abspath(__file__))), 'viper')
+
+def optimize(srcCode: str) -> list:
+    tokens = Lexer(srcCode).yieldTokens()
+    assert not isinstance(tokens, Error), tokens
+    nodes = Parser(tokens, srcCode).parse()
+    assert not isinstance(nodes, Error), nodes
+    return Optimizer().optimize(nodes)
+
+def testSmallConstantsAreFolded():
+    power, repeated = [node.value for node in optimize("num a = 2 ** 10\nString b = 'ab' * 3")]
+    assert isinstance(power, NumberNode) and power.num == 1024
+    assert isinstance(repeated, StringNode) and repeated.primitive.value == 'ababab'
+
+def testHugeConstantsAreNotFolded():
+    power, repeated = [node.value for node in optimize("num a = 9 ** 9 ** 9\nString b = 'ab' * 1000000")]
+    assert isinstance(power, BinOpNode) and isinstance(power.rightElem, NumberNode) and power.rightElem.num == 9 ** 9
+    assert isinstance(repeated, BinOpNode)
+
+def testUnreachableHugePowerDoesNotHang(tmp_path):
+    path = tmp_path / 'power.vip'
+    path.write_text("num x = 1\nif (x > 5) { print(9 ** 9 ** 9) }\nprint('done')\n")
+    result = subprocess.run([sys.executable, 'main.py', '-O', '--no-cache', str(path)], cwd=VIPER, capture_output=True, text=True, timeout=60)
+    assert result.stdout == 'done\n'
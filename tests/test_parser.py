@@ -0,0 +1,88 @@
+import pytest
+
+from errors import Error
+from lexer import Lexer
+from nodes import BinOpNode, CompOpNode, IdentifierNode, NumberNode, UnaryOpNode
+from parser import Parser
+from tokens import TokenStream
+
+def parse(srcCode: str) -> list:
+    tokens = Lexer(srcCode).yieldTokens()
+    assert not isinstance(tokens, Error), tokens
+    nodes = Parser(tokens, srcCode).parse()
+    assert not isinstance(nodes, Error), nodes
+    return nodes
+
+def testElifKeepsIfBranch():
+    ifElse = parse("num x = 1\nif (x == 1) { print('a') } elif (x == 2) { print('b') } elif (x == 3) { print('c') }")[1]
+    assert ifElse.ifNode.condition.rightElem.num == 1
+    assert [elifNode.condition.rightElem.num for elifNode in ifElse.elifNodes] == [2, 3]
+
+def shape(node) -> str:
+    match node:
+        case BinOpNode() | CompOpNode():
+            return f'({shape(node.leftElem)} {node.operator.value} {shape(node.rightElem)})'
+        case UnaryOpNode():
+            return f'({node.operator.value} {shape(node.elem)})'
+        case NumberNode():
+            return f'{node.num}'
+        case IdentifierNode():
+            return node.identifier
+    raise TypeError(node)
+
+def expression(srcCode: str) -> str:
+    return shape(parse(f'bool r = {srcCode}')[0].value)
+
+@pytest.mark.parametrize('srcCode, expected', (
+    ('10 - 2 - 3', '((10 - 2) - 3)'),
+    ('100 / 10 / 5', '((100 / 10) / 5)'),
+    ('2 ** 3 ** 2', '(2 ** (3 ** 2))'),
+    ('1 + 2 * 3 ** 2', '(1 + (2 * (3 ** 2)))'),
+    ('(1 + 2) * 3', '((1 + 2) * 3)'),
+    ('-2 ** 2', '((- 2) ** 2)'),
+))
+def testArithmeticPrecedenceAndAssociativity(srcCode: str, expected: str):
+    assert expression(srcCode) == expected
+
+@pytest.mark.parametrize('srcCode, expected', (
+    ('a + 1 < b * 2', '((a + 1) < (b * 2))'),
+    ('a < b == c', '((a < b) == c)'),
+    ('a < 1 and b > 2', '((a < 1) and (b > 2))'),
+    ('a or b and c', '(a or (b and c))'),
+    ('a and b or c and d', '((a and b) or (c and d))'),
+    ('a == 1 or b != 2 and c >= 3', '((a == 1) or ((b != 2) and (c >= 3)))'),
+    ('not a and b', '((not a) and b)'),
+))
+def testComparisonAndLogicalPrecedence(srcCode: str, expected: str):
+    assert expression(srcCode) == expected
+
+def testLongDotChain():
+    links = 2000
+    call = parse('node.' + '.'.join(f'child{link}' for link in range(1, links)) + '(1)')[0]
+    identifier, count = call.callableName, 0
+    while identifier != None: identifier, count = identifier.chainedIdentifier, count + 1
+    assert count == links
+
+def nested(depth: int) -> str:
+    blocks = ''.join(f'for (num i{level} = 0; i{level} < 2; num i{level} = i{level} + 1) {{ ' if level % 2 else f'if (x < {level}) {{ ' for level in range(depth))
+    return 'num x = 0\n' + blocks + 'x += 1 ' + '} ' * depth
+
+@pytest.mark.parametrize('memoize', (False, True))
+def testNestedBlocksParseInLinearTime(monkeypatch, memoize: bool):
+    getitem = TokenStream.__getitem__
+    def countingGetitem(self, idx: int):
+        self.reads += 1
+        return getitem(self, idx)
+    monkeypatch.setattr(TokenStream, '__getitem__', countingGetitem)
+
+    readsPerToken: list[float] = []
+    for depth in (40, 80):
+        srcCode = nested(depth)
+        tokens = Lexer(srcCode).yieldTokens()
+        assert not isinstance(tokens, Error), tokens
+        stream = TokenStream.of(tokens)
+        stream.reads = 0 # type: ignore
+        nodes = Parser(stream, srcCode, memoize).parse()
+        assert not isinstance(nodes, Error), nodes
+        readsPerToken.append(stream.reads / len(tokens)) # type: ignore
+    assert readsPerToken[1] < readsPerToken[0] * 1.25, readsPerToken
@@ -0,0 +1,37 @@
+import pstats
+
+from lexer import Lexer
+from memo import Memoizer
+from parser import Parser
+from position import SourceMap
+from profiler import Profiler, ProfilingInterpreter
+from resolver import Frame, Resolver
+
+FIB = 'num fib(num n) { if (n < 2) { return n } return fib(n - 1) + fib(n - 2) }\nprint(fib(10))'
+
+def profile(srcCode: str, outPath: str | None = None, memoize: bool = False) -> Profiler:
+    srcMap = SourceMap(srcCode)
+    nodes = Parser(Lexer(srcMap).yieldTokens(), srcMap).parse() # type: ignore
+    if memoize: Memoizer().attach(nodes) # type: ignore
+    resolver = Resolver()
+    resolver.resolve(nodes) # type: ignore
+    profiler = Profiler('fib.vip', outPath)
+    interpreter = ProfilingInterpreter(nodes, srcMap, profiler, frame=Frame(resolver.frameSize)) # type: ignore
+    profiler.profile(interpreter.traverse)
+    return profiler
+
+def testCallerEdgesUsePstatsOrder(tmp_path):
+    outPath = str(tmp_path / 'fib.prof')
+    profile(FIB, outPath).finish()
+    stats = pstats.Stats(outPath).stats # type: ignore
+    fib, module = ('fib.vip', 1, 'fib'), ('fib.vip', 0, '<module>')
+
+    primitiveCalls, totalCalls, _, _, callers = stats[fib]
+    assert (primitiveCalls, totalCalls) == (1, 177)
+    assert callers[module][:2] == (1, 1)
+    assert callers[fib][:2] == (176, 0)
+
+def testMemoHitsCountAsCalls():
+    stat = profile(FIB, memoize=True).functionStats[('fib.vip', 1, 'fib')]
+    assert (stat.calls, stat.primitiveCalls) == (19, 1)
+    assert stat.callers[('fib.vip', 1, 'fib')][:2] == [18, 0]
@@ -0,0 +1,56 @@
+import pickle
+
+import pytest
+
+from errors import Error
+from inbuilt import ROPEMIN, InbuiltFunctions, Rope, String
+from program import ENGINES, compile
+
+def testShortConcatenationStaysAString():
+    joined = String('ab') + String('cd')
+    assert joined.__class__ is String and joined.value == 'abcd'
+
+def testConcatenationPastThresholdBuildsARope():
+    half = 'x' * (ROPEMIN // 2)
+    below = String(half) + String(half[1:])
+    rope = String(half) + String(half)
+    assert below.__class__ is String
+    assert rope.__class__ is Rope and rope.value == half * 2
+
+def testRepeatedConcatenation():
+    text = String('')
+    for i in range(1000): text = text + String(str(i % 10))
+    expected = ''.join(str(i % 10) for i in range(1000))
+    assert text.__class__ is Rope
+    assert InbuiltFunctions.len(text).value == len(expected)
+    assert text.value == expected
+    assert text == String(expected)
+
+def testIndexingAndMethods():
+    text = String('a' * ROPEMIN) + String('bcd')
+    assert text.value[ROPEMIN] == 'b' and text.value[-1] == 'd'
+    assert text.value[ROPEMIN - 1:ROPEMIN + 2] == 'abc'
+    assert text.endswith('bcd') and text.count('a') == ROPEMIN
+
+def testBranchesFromASharedRopeStayIndependent():
+    base = String('x' * ROPEMIN) + String('y')
+    left = base + String('L')
+    right = base + String('R')
+    assert base.value.endswith('y') and left.value.endswith('yL') and right.value.endswith('yR')
+    again = base + String('A')
+    assert again.value.endswith('yA') and left.value.endswith('yL')
+    assert len(again.value) == len(left.value) == ROPEMIN + 2
+
+def testRopePickles():
+    rope = String('z' * ROPEMIN) + String('!')
+    copy = pickle.loads(pickle.dumps(rope))
+    assert copy.value == rope.value
+
+@pytest.mark.parametrize('engine', ENGINES)
+def testLongStringsInViper(engine: str):
+    srcCode = "String s = ''\nfor (num i = 0; i < 300; i += 1) { s = s + 'ab' }\nString t = s + '!'\nString u = s + '?'\nprint(len(s), len(t), len(u), t == u, s + '' == s)"
+    program = compile(srcCode, engine, memoSize=0)
+    assert not isinstance(program, Error), program
+    result = program.run()
+    assert result.ok, result.error
+    assert result.output == '600 601 601 False True\n'
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import os
+import re
+import signal
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
+from os.path import isfile, join, relpath
+from time import perf_counter
+from traceback import format_exc
+from typing import Callable
+
+from cache import ProgramCache
+from memo import MEMOSIZE, Memoizer
+from vm import MAXDEPTH
+
+SLOWEST = 10
+ERRORLINE = re.compile(r'^\w+: .* \| column \d+ line \d+$')
+
+class ScriptTimeout(BaseException):
+    pass
+
+class ScriptResult:
+    __slots__ = ('path', 'status', 'elapsed', 'stdout', 'stderr')
+
+    def __init__(self, path: str, status: str, elapsed: float, stdout: str, stderr: str) -> None:
+        self.path = path
+        self.status = status
+        self.elapsed = elapsed
+        self.stdout = stdout
+        self.stderr = stderr
+
+    def summary(self) -> str:
+        if self.status == 'error':
+            for line in reversed(self.stdout.splitlines()):
+                if ERRORLINE.match(line): return line
+        lines = [line for line in (self.stderr or self.stdout).splitlines() if line.strip()]
+        return lines[-1].strip() if lines else ''
+
+    def __repr__(self) -> str:
+        return f'<{self.status} {self.path} | {self.elapsed:.3f}s>'
+
+def findScripts(path: str) -> list[str]:
+    if isfile(path): return [path]
+    scripts: list[str] = []
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        scripts += [join(root, fileName) for fileName in sorted(files) if fileName.endswith('.vip')]
+    return scripts
+
+# --------x--------x--------x--------
+# $ Worker process
+settings: dict = {}
+
+def warm(options: dict) -> None:
+    import main
+
+    settings.update(options)
+    settings['main'] = main
+    settings['cache'] = ProgramCache(options['cacheDir']) if options['cacheDir'] != None else None
+    sys.stdin = StringIO()
+    if hasattr(signal, 'setitimer'): signal.signal(signal.SIGALRM, expire)
+
+def expire(signum, frame):
+    raise ScriptTimeout()
+
+def runScript(path: str) -> ScriptResult:
+    main = settings['main']
+    timeout = settings['timeout'] if hasattr(signal, 'setitimer') else None
+    stdout, stderr = StringIO(), StringIO()
+    status = 'error'
+    start = perf_counter()
+    try:
+        with open(path, 'r') as srcFile: srcCode = srcFile.read()
+        main.reset()
+        memoizer = Memoizer(settings['memoSize'], settings['memo'], settings['noMemo'])
+        if timeout: signal.setitimer(signal.ITIMER_REAL, timeout)
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            if main.execute(srcCode, settings['engine'], settings['optimize'], settings['stats'], settings['packrat'], settings['cache'], settings['maxDepth'], memoizer): status = 'ok'
+    except ScriptTimeout:
+        status = 'timeout'
+        stderr.write(f'timed out after {timeout}s\n')
+    except Exception:
+        status = 'crash'
+        stderr.write(format_exc())
+    finally:
+        if timeout: signal.setitimer(signal.ITIMER_REAL, 0)
+    return ScriptResult(path, status, perf_counter() - start, stdout.getvalue(), stderr.getvalue())
+# --------x--------x--------x--------
+
+class Batch:
+    def __init__(self, path: str, jobs: int | None = None, timeout: float | None = None, **options) -> None:
+        self.path = path
+        self.jobs = jobs or os.cpu_count() or 1
+        self.options = {
+            'engine': 'tree', 'optimize': False, 'stats': False, 'packrat': False, 'cacheDir': None,
+            'maxDepth': MAXDEPTH, 'memoSize': MEMOSIZE, 'memo': None, 'noMemo': None, **options, 'timeout': timeout,
+        }
+        self.results: list[ScriptResult] = []
+        self.elapsed = 0.0
+
+    def run(self, onResult: Callable[[ScriptResult], object] | None = None) -> list[ScriptResult]:
+        scripts = findScripts(self.path)
+        start = perf_counter()
+        with ProcessPoolExecutor(self.jobs, initializer=warm, initargs=(self.options,)) as executor:
+            futures = {executor.submit(runScript, path): path for path in scripts}
+            for future in as_completed(futures):
+                try: result = future.result()
+                except BrokenProcessPool as e: result = ScriptResult(futures[future], 'crash', 0.0, '', f'worker process died: {e}\n')
+                self.results.append(result)
+                if onResult != None: onResult(result)
+        self.elapsed = perf_counter() - start
+        order = {path: idx for idx, path in enumerate(scripts)}
+        self.results.sort(key=lambda result: order[result.path])
+        return self.results
+
+    def counts(self) -> dict[str, int]:
+        counts = {'ok': 0, 'error': 0, 'timeout': 0, 'crash': 0}
+        for result in self.results: counts[result.status] += 1
+        return counts
+
+    def report(self, slowest: int = SLOWEST) -> str:
+        scriptTime = sum(result.elapsed for result in self.results)
+        lines = [f'batch: {len(self.results)} scripts in {self.elapsed:.2f}s with {self.jobs} jobs ({scriptTime:.2f}s of script time)']
+        lines.append('  ' + ', '.join(f'{status} {count}' for status, count in self.counts().items()))
+        if self.results: lines.append('slowest:')
+        for result in sorted(self.results, key=lambda result: result.elapsed, reverse=True)[:slowest]:
+            lines.append(f'  {result.elapsed:>8.3f}s  {self.relative(result.path)}')
+        return '\n'.join(lines)
+
+    def relative(self, path: str) -> str:
+        return path if isfile(self.path) else relpath(path, self.path)
+
+    def toJSON(self) -> dict:
+        return {
+            'path': self.path,
+            'jobs': self.jobs,
+            'elapsed': self.elapsed,
+            'counts': self.counts(),
+            'scripts': [{slot: getattr(result, slot) for slot in ScriptResult.__slots__} for result in self.results],
+        }
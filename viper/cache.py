@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import gc
+import os
+import pickle
+import sys
+from hashlib import sha256
+from os.path import dirname, expanduser, join
+from tempfile import NamedTemporaryFile
+from time import time
+
+from nodes import Node
+
+# --------x--------x--------x--------
+# $ Cache settings
+CACHEDIR = join(os.environ.get('XDG_CACHE_HOME', expanduser('~/.cache')), 'viper')
+MAXBYTES = 64 << 20
+MAXAGE = 30 * 24 * 60 * 60
+FRONTEND = ['lexer.py', 'parser.py', 'nodes.py', 'tokens.py', 'optimizer.py', 'inbuilt.py', 'cache.py']
+# --------x--------x--------x--------
+
+def interpreterVersion() -> str:
+    digest = sha256(f'{sys.version_info.major}.{sys.version_info.minor}:{pickle.HIGHEST_PROTOCOL}'.encode())
+    for module in FRONTEND:
+        with open(join(dirname(__file__), module), 'rb') as moduleFile: digest.update(moduleFile.read())
+    return digest.hexdigest()[:16]
+
+class ProgramCache:
+    def __init__(self, cacheDir: str = CACHEDIR, maxBytes: int = MAXBYTES, maxAge: float = MAXAGE) -> None:
+        self.cacheDir = cacheDir
+        self.maxBytes = maxBytes
+        self.maxAge = maxAge
+        self.version = interpreterVersion()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, srcCode: str, optimize: bool = False) -> str:
+        return sha256(f'{self.version}:{int(optimize)}:{srcCode}'.encode()).hexdigest()
+
+    def path(self, key: str) -> str:
+        return join(self.cacheDir, key + '.vipc')
+
+    def load(self, key: str) -> list[Node] | None:
+        path = self.path(key)
+        gcEnabled = gc.isenabled()
+        gc.disable()
+        try:
+            with open(path, 'rb') as cacheFile: version, storedKey, nodes = pickle.load(cacheFile)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception:
+            self.discard(path)
+            self.misses += 1
+            return None
+        finally:
+            if gcEnabled: gc.enable()
+
+        if version != self.version or storedKey != key:
+            self.discard(path)
+            self.misses += 1
+            return None
+
+        try: os.utime(path)
+        except OSError: pass
+        self.hits += 1
+        return nodes
+
+    def store(self, key: str, nodes: list[Node]) -> None:
+        tmpPath: str | None = None
+        try:
+            os.makedirs(self.cacheDir, exist_ok=True)
+            with NamedTemporaryFile('wb', dir=self.cacheDir, suffix='.tmp', delete=False) as cacheFile:
+                tmpPath = cacheFile.name
+                pickle.dump((self.version, key, nodes), cacheFile, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmpPath, self.path(key))
+        except (OSError, RecursionError, pickle.PicklingError):
+            self.discard(tmpPath)
+            return
+        self.evict()
+
+    def evict(self) -> None:
+        try: names = os.listdir(self.cacheDir)
+        except OSError: return
+
+        now = time()
+        entries: list[tuple[float, int, str]] = []
+        for name in names:
+            if not name.endswith('.vipc'): continue
+            path = join(self.cacheDir, name)
+            try: stat = os.stat(path)
+            except OSError: continue
+            if now - stat.st_mtime > self.maxAge: self.discard(path)
+            else: entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.maxBytes: break
+            self.discard(path)
+            total -= size
+
+    def clear(self) -> None:
+        try: names = os.listdir(self.cacheDir)
+        except OSError: return
+        for name in names:
+            if name.endswith('.vipc') or name.endswith('.tmp'): self.discard(join(self.cacheDir, name))
+
+    def discard(self, path: str | None) -> None:
+        if path == None: return
+        try: os.remove(path)
+        except OSError: pass
+
+    def report(self) -> str:
+        return f'cache: {self.hits} hits, {self.misses} misses ({self.cacheDir})'
+
+    def __repr__(self) -> str:
+        return f'<cache {self.cacheDir} | version {self.version}>'
@@ -0,0 +1,497 @@
+from __future__ import annotations
+
+from operator import and_, or_
+from typing import Callable
+
+from compiler import AUGOPS, BINOPS, COMPOPS
+from errors import Error, InvalidAssignmentError, InvalidIndexError, InvalidSyntaxError, InvalidTypeError, UndefinedNameError
+from inbuilt import INBUILTTYPES, Array, Bool, Number, Primitive, String
+from memo import MISS, memoKey
+from nodes import ArrayNode, AssignNode, BinOpNode, BoolNode, CallableNode, CompOpNode, ForLoopNode, FunctionNode, IdentifierNode, IfElseNode, IndexAssignNode, IndexNode, Node, NumberNode, ReturnNode, StringNode, UnaryOpNode, WhileLoopNode
+from position import SourceMap
+from resolver import countedLoop, declaredNames
+from tokens import LogicalOp
+from vm import BUILTINS, Builtin, truthy
+
+Expr = Callable[[list], object]
+Stmt = Callable[[list], tuple | None]
+
+class ViperError(Exception):
+    def __init__(self, error: Error) -> None:
+        self.error = error
+
+class ClosureFunction:
+    dataType = 'func'
+    def __init__(self, name: str, argTypes: tuple[str, ...], nLocals: int) -> None:
+        self.name = name
+        self.argTypes = argTypes
+        self.nLocals = nLocals
+        self.body: Stmt = lambda frame: None
+        self.memo = None
+
+    def __repr__(self) -> str:
+        return f'<function {self.name}>'
+
+class ClosureCompiler:
+    def __init__(self, nodes: list[Node], srcCode: str | SourceMap, globals: dict[str, object] | None = None) -> None:
+        self.nodes = nodes
+        self.srcMap = SourceMap.of(srcCode)
+        self.globals: dict[str, object] = globals if globals != None else {}
+        for name in BUILTINS: self.globals.setdefault(name, Builtin(name))
+        self.localNames: list[str] | None = None
+
+    def compile(self) -> Stmt | Error:
+        try: return self.block(self.nodes)
+        except ViperError as e: return e.error
+
+    def run(self):
+        program = self.compile()
+        if isinstance(program, Error): return program
+        return self.execute(program)
+
+    def execute(self, program: Stmt):
+        try: result = program([])
+        except ViperError as e: return e.error
+        if result != None: return result[0]
+
+    def block(self, nodes: list[Node]) -> Stmt:
+        stmts = tuple(self.statement(node) for node in nodes)
+
+        if len(stmts) == 1: return stmts[0]
+
+        def block(frame: list):
+            for stmt in stmts:
+                result = stmt(frame)
+                if result is not None: return result
+        return block
+
+    def statement(self, node: Node) -> Stmt:
+        match node:
+            case AssignNode():
+                return self.assign(node)
+            case IfElseNode():
+                return self.ifElse(node)
+            case ForLoopNode():
+                return self.forLoop(node)
+            case WhileLoopNode():
+                return self.whileLoop(node)
+            case IndexAssignNode():
+                return self.indexAssign(node)
+            case FunctionNode():
+                return self.function(node)
+            case ReturnNode():
+                value = self.expression(node.value) if node.value != None else lambda frame: None
+                return lambda frame: (value(frame),)
+            case _:
+                expr = self.expression(node)
+                def exprStmt(frame: list):
+                    expr(frame)
+                return exprStmt
+
+    def expression(self, node: Node) -> Expr:
+        match node:
+            case NumberNode():
+                number = Number(node)
+                return lambda frame: number
+            case StringNode():
+                string = String(node)
+                return lambda frame: string
+            case BoolNode():
+                boolean = Bool(node)
+                return lambda frame: boolean
+            case IdentifierNode():
+                return self.load(node.identifier, node)
+            case BinOpNode() if node.operator.tokenType == LogicalOp.AND:
+                return self.logicalAnd(node)
+            case BinOpNode() if node.operator.tokenType == LogicalOp.OR:
+                return self.logicalOr(node)
+            case BinOpNode():
+                return self.binOp(node, BINOPS[node.operator.tokenType])
+            case CompOpNode():
+                return self.binOp(node, COMPOPS[node.operator.tokenType])
+            case UnaryOpNode():
+                return self.unaryOp(node)
+            case CallableNode():
+                return self.call(node)
+            case ArrayNode():
+                return self.array(node)
+            case IndexNode():
+                return self.index(node)
+            case _:
+                raise ViperError(InvalidSyntaxError(f'{node.__class__.__name__} is not an expression', self.srcMap, node.beginPos, node.endPos))
+
+    def binOp(self, node: BinOpNode | CompOpNode, op: Callable) -> Expr:
+        leftFn = self.expression(node.leftElem)
+        rightFn = self.expression(node.rightElem)
+        unsupported = self.unsupportedOperands
+
+        def binOp(frame: list):
+            left = leftFn(frame)
+            right = rightFn(frame)
+            try: return op(left, right)
+            except Exception: raise ViperError(unsupported(node, left, right))
+        return binOp
+
+    def logicalAnd(self, node: BinOpNode) -> Expr:
+        leftFn = self.expression(node.leftElem)
+        rightFn = self.expression(node.rightElem)
+
+        def logicalAnd(frame: list):
+            left = leftFn(frame)
+            if left.__class__ is Array: return self.elementwise(node, left, rightFn(frame), and_)
+            if not truthy(left): return left
+            return rightFn(frame)
+        return logicalAnd
+
+    def logicalOr(self, node: BinOpNode) -> Expr:
+        leftFn = self.expression(node.leftElem)
+        rightFn = self.expression(node.rightElem)
+
+        def logicalOr(frame: list):
+            left = leftFn(frame)
+            if left.__class__ is Array: return self.elementwise(node, left, rightFn(frame), or_)
+            if truthy(left): return left
+            return rightFn(frame)
+        return logicalOr
+
+    def unaryOp(self, node: UnaryOpNode) -> Expr:
+        elemFn = self.expression(node.elem)
+        unsupported = self.unsupportedOperand
+
+        if node.operator.tokenType == LogicalOp.NOT:
+            def unaryNot(frame: list):
+                elem = elemFn(frame)
+                try: return elem.__not__()
+                except Exception: raise ViperError(unsupported(node, elem))
+            return unaryNot
+
+        def unaryNeg(frame: list):
+            elem = elemFn(frame)
+            try: return -elem
+            except Exception: raise ViperError(unsupported(node, elem))
+        return unaryNeg
+
+    def load(self, identifier: str, node: Node) -> Expr:
+        undefined = self.undefinedName
+
+        if self.localNames != None and identifier in self.localNames:
+            slot = self.localNames.index(identifier)
+            def loadLocal(frame: list):
+                value = frame[slot]
+                if value is None: raise ViperError(undefined(node, identifier))
+                return value
+            return loadLocal
+
+        globals = self.globals
+        def loadGlobal(frame: list):
+            try: return globals[identifier]
+            except KeyError: raise ViperError(undefined(node, identifier))
+        return loadGlobal
+
+    def assign(self, node: AssignNode) -> Stmt:
+        valueFn = self.expression(node.value)
+        identifier = node.varName.identifier
+        globals = self.globals
+        isLocal = self.localNames != None and identifier in self.localNames
+        slot = self.localNames.index(identifier) if isLocal else -1 # type: ignore
+
+        if node.dataType != None:
+            typeName = node.dataType.value
+            if typeName not in INBUILTTYPES:
+                error = UndefinedNameError(f"Type {typeName} is not defined", self.srcMap, node.dataType.beginPos, node.dataType.endPos)
+                def undefinedType(frame: list):
+                    raise ViperError(error)
+                return undefinedType
+            invalidAssignment = self.invalidAssignment
+
+            if isLocal:
+                def declareLocal(frame: list):
+                    value = valueFn(frame)
+                    if getattr(value, 'dataType', None) != typeName: raise ViperError(invalidAssignment(node, value, typeName))
+                    frame[slot] = value
+                return declareLocal
+
+            def declareGlobal(frame: list):
+                value = valueFn(frame)
+                if getattr(value, 'dataType', None) != typeName: raise ViperError(invalidAssignment(node, value, typeName))
+                globals[identifier] = value
+            return declareGlobal
+
+        augOp = AUGOPS.get(node.assignOp)
+        reassign = self.reassign
+
+        if isLocal:
+            def storeLocal(frame: list):
+                frame[slot] = reassign(node, identifier, frame[slot], valueFn(frame), augOp)
+            return storeLocal
+
+        def storeGlobal(frame: list):
+            globals[identifier] = reassign(node, identifier, globals.get(identifier), valueFn(frame), augOp)
+        return storeGlobal
+
+    def reassign(self, node: AssignNode, identifier: str, currentVal: object, value: object, augOp: Callable | None):
+        if currentVal is None: raise ViperError(self.undefinedName(node, identifier))
+        if getattr(value, 'dataType', None) != getattr(currentVal, 'dataType', None):
+            raise ViperError(self.invalidAssignment(node, value, getattr(currentVal, 'dataType', None)))
+        if augOp == None: return value
+
+        try: return augOp(currentVal, value)
+        except Exception: raise ViperError(self.unsupportedOperands(node, currentVal, value))
+
+    def ifElse(self, node: IfElseNode) -> Stmt:
+        branches = tuple((self.expression(ifNode.condition), self.block(ifNode.body)) for ifNode in [node.ifNode] + node.elifNodes)
+        elseBody = self.block(node.elseNode.body) if node.elseNode != None else None
+
+        if len(branches) == 1:
+            (conditionFn, bodyFn), = branches
+            def ifElse(frame: list):
+                if truthy(conditionFn(frame)): return bodyFn(frame)
+                if elseBody is not None: return elseBody(frame)
+            return ifElse
+
+        def ifElifElse(frame: list):
+            for conditionFn, bodyFn in branches:
+                if truthy(conditionFn(frame)): return bodyFn(frame)
+            if elseBody is not None: return elseBody(frame)
+        return ifElifElse
+
+    def forLoop(self, node: ForLoopNode) -> Stmt:
+        initFn = self.statement(node.init)
+        conditionFn = self.expression(node.condition)
+        bodyFn = self.block(node.body)
+        reAssignFn = self.statement(node.reAssign)
+
+        def loop(frame: list):
+            while truthy(conditionFn(frame)):
+                result = bodyFn(frame)
+                if result is not None: return result
+                reAssignFn(frame)
+
+        def forLoop(frame: list):
+            initFn(frame)
+            return loop(frame)
+
+        counter = countedLoop(node)
+        if len(counter) == 0: return forLoop
+
+        compare, step, observed = counter
+        identifier = node.init.varName.identifier
+        bound = node.condition.rightElem # type: ignore
+        boundFn = self.expression(bound) if isinstance(bound, IdentifierNode) else None
+        isLocal = self.localNames != None and identifier in self.localNames
+        key = self.localNames.index(identifier) if isLocal else identifier # type: ignore
+        globals = self.globals
+
+        def countedForLoop(frame: list):
+            initFn(frame)
+            store = frame if isLocal else globals
+            counter = store[key]
+            if counter.__class__ is not Number: return loop(frame)
+
+            i = counter.value
+            limit = None if boundFn != None else bound.num
+            while True:
+                if boundFn != None:
+                    limit = boundFn(frame)
+                    if limit.__class__ is not Number: store[key] = Number(i); return loop(frame)
+                    limit = limit.value
+                if not compare(i, limit): break
+
+                if observed: store[key] = counter = Number(i)
+                result = bodyFn(frame)
+                if result is not None:
+                    if not observed: store[key] = Number(i)
+                    return result
+
+                if observed and store[key] is not counter:
+                    if store[key].__class__ is not Number: reAssignFn(frame); return loop(frame)
+                    i = store[key].value
+                i += step
+
+            store[key] = Number(i)
+        return countedForLoop
+
+    def whileLoop(self, node: WhileLoopNode) -> Stmt:
+        conditionFn = self.expression(node.condition)
+        bodyFn = self.block(node.body)
+
+        def whileLoop(frame: list):
+            while truthy(conditionFn(frame)):
+                result = bodyFn(frame)
+                if result is not None: return result
+        return whileLoop
+
+    def function(self, node: FunctionNode) -> Stmt:
+        for dataType, _ in node.args:
+            if dataType.identifier not in INBUILTTYPES:
+                error = UndefinedNameError(f"Name '{dataType.identifier}' is undefined", self.srcMap, dataType.beginPos, dataType.endPos)
+                def undefinedArgType(frame: list):
+                    raise ViperError(error)
+                return undefinedArgType
+
+        localNames = [varName.identifier for _, varName in node.args]
+        for identifier in declaredNames(node.body):
+            if identifier not in localNames: localNames.append(identifier)
+
+        func = ClosureFunction(node.funcName.value, tuple(dataType.identifier for dataType, _ in node.args), len(localNames))
+        func.memo = node.memo
+
+        enclosingLocals = self.localNames
+        self.localNames = localNames
+        func.body = self.block(node.body)
+        self.localNames = enclosingLocals
+
+        identifier = node.funcName.value
+        if self.localNames != None and identifier in self.localNames:
+            slot = self.localNames.index(identifier)
+            def defineLocal(frame: list):
+                frame[slot] = func
+            return defineLocal
+
+        globals = self.globals
+        def defineGlobal(frame: list):
+            globals[identifier] = func
+        return defineGlobal
+
+    def call(self, node: CallableNode) -> Expr:
+        paramFns = tuple(self.expression(param) for param in node.params)
+        callableName = node.callableName
+
+        if callableName.chainedIdentifier != None:
+            baseFn = self.load(callableName.identifier, node)
+            methodName = callableName.chainedIdentifier.identifier
+            def callMethod(frame: list):
+                value = baseFn(frame)
+                if isinstance(value, Array) and methodName in Array.methods:
+                    try: return getattr(value, methodName)(*[paramFn(frame) for paramFn in paramFns])
+                    except Exception as e: raise ViperError(self.subscriptError(node, e))
+                args = [paramFn(frame).value for paramFn in paramFns] # type: ignore
+                if not isinstance(value, Primitive): raise ViperError(self.notCallable(node, value))
+                try: return value.deepCopy(getattr(value, methodName)(*args))
+                except Exception as e: raise ViperError(Error('Error', f'{e}', self.srcMap, node.beginPos, node.endPos))
+            return callMethod
+
+        calleeFn = self.load(callableName.identifier, node)
+        params = node.params
+        callFunction = self.callFunction
+
+        def call(frame: list):
+            func = calleeFn(frame)
+            args = [paramFn(frame) for paramFn in paramFns]
+            if func.__class__ is ClosureFunction: return callFunction(node, params, func, args) # type: ignore
+            if func.__class__ is Builtin:
+                try: return func.func(*args) # type: ignore
+                except Exception as e: raise ViperError(Error('Error', f'{e}', self.srcMap, node.beginPos, node.endPos))
+            raise ViperError(self.notCallable(node, func))
+        return call
+
+    def callFunction(self, node: CallableNode, params: list[Node], func: ClosureFunction, args: list):
+        argTypes = func.argTypes
+        for idx, expectedType in enumerate(argTypes[:len(args)]):
+            if getattr(args[idx], 'dataType', None) != expectedType:
+                param = params[idx]
+                raise ViperError(InvalidAssignmentError(
+                        f"Type {getattr(args[idx], 'dataType', None)} can't be assigned to parameter of type {expectedType}",
+                        self.srcMap,
+                        param.beginPos, param.endPos
+                    ))
+
+        frame = args[:len(argTypes)]
+        memo = func.memo
+        if memo is not None:
+            key = memoKey(frame)
+            value = memo.get(key)
+            if value is not MISS: return value
+
+        frame += [None] * (func.nLocals - len(frame))
+        try: result = func.body(frame)
+        except RecursionError: raise ViperError(self.recursionError(node))
+        value = result[0] if result is not None else None
+        if memo is not None: memo.put(key, value)
+        return value
+
+    def array(self, node: ArrayNode) -> Expr:
+        elementFns = tuple(self.expression(element) for element in node.elements)
+        elementType = node.elementType
+
+        def array(frame: list):
+            try: return Array.of(elementType, [elementFn(frame) for elementFn in elementFns])
+            except TypeError as e: raise ViperError(self.subscriptError(node, e))
+        return array
+
+    def index(self, node: IndexNode) -> Expr:
+        targetFn = self.expression(node.target)
+        indexFn = self.expression(node.index)
+
+        def index(frame: list):
+            target = targetFn(frame)
+            idx = indexFn(frame)
+            if target.__class__ is not Array: raise ViperError(self.notSubscriptable(node, target))
+            try: return target.get(idx)
+            except Exception as e: raise ViperError(self.subscriptError(node, e))
+        return index
+
+    def indexAssign(self, node: IndexAssignNode) -> Stmt:
+        targetFn = self.expression(node.target.target)
+        indexFn = self.expression(node.target.index)
+        valueFn = self.expression(node.value)
+        augOp = AUGOPS.get(node.assignOp)
+
+        def indexAssign(frame: list):
+            target = targetFn(frame)
+            idx = indexFn(frame)
+            value = valueFn(frame)
+            if target.__class__ is not Array: raise ViperError(self.notSubscriptable(node.target, target))
+            if getattr(value, 'dataType', None) != target.elementType:
+                raise ViperError(InvalidAssignmentError(f"Type {getattr(value, 'dataType', None)} can't be assigned to element of type {target.elementType}", self.srcMap, node.beginPos, node.endPos))
+            try:
+                if augOp != None: value = augOp(target.get(idx), value)
+                target.set(idx, value)
+            except Exception as e: raise ViperError(self.subscriptError(node, e))
+        return indexAssign
+
+    def elementwise(self, node: BinOpNode, left: Array, right: object, op: Callable):
+        try: return op(left, right)
+        except Exception: raise ViperError(self.unsupportedOperands(node, left, right))
+
+    def subscriptError(self, node: Node, e: Exception):
+        if isinstance(e, IndexError): return InvalidIndexError(f'{e}', self.srcMap, node.beginPos, node.endPos)
+        return InvalidTypeError(f'{e}' or 'Unsupported operand types', self.srcMap, node.beginPos, node.endPos)
+
+    def notSubscriptable(self, node: Node, target: object):
+        return InvalidTypeError(f"Type {getattr(target, 'dataType', None)} is not subscriptable", self.srcMap, node.beginPos, node.endPos)
+
+    def undefinedName(self, node: Node, identifier: str):
+        if isinstance(node, CallableNode):
+            return UndefinedNameError(f"Name '{node.callableName}' is undefined", self.srcMap, node.beginPos, node.callableName.endPos)
+        return UndefinedNameError(f"Name {identifier} is undefined", self.srcMap, node.beginPos, node.endPos)
+
+    def invalidAssignment(self, node: Node, value: object, expectedType: str | None):
+        return InvalidAssignmentError(
+                f"Type {getattr(value, 'dataType', None)} can't be assigned to declared type {expectedType}",
+                self.srcMap,
+                node.beginPos, node.endPos
+            )
+
+    def recursionError(self, node: Node):
+        return Error('RecursionError', 'Maximum call depth exceeded', self.srcMap, node.beginPos, node.endPos)
+
+    def notCallable(self, node: Node, value: object):
+        return InvalidTypeError(f"Type {getattr(value, 'dataType', None)} is not callable", self.srcMap, node.beginPos, node.endPos)
+
+    def unsupportedOperands(self, node: Node, left: object, right: object):
+        operator = node.operator.tokenType.value if isinstance(node, (BinOpNode, CompOpNode)) else node.assignOp.value # type: ignore
+        return InvalidTypeError(
+            f"Unsopported operand types for '{operator}': {getattr(left, 'dataType', None)} and {getattr(right, 'dataType', None)}",
+            self.srcMap,
+            node.beginPos,
+            node.endPos
+        )
+
+    def unsupportedOperand(self, node: UnaryOpNode, value: object):
+        return InvalidTypeError(
+            f"Unsupported operand type for '{node.operator.value}': {getattr(value, 'dataType', None)}",
+            self.srcMap,
+            node.beginPos,
+            node.endPos
+        )
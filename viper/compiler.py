@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+from operator import add, and_, eq, ge, gt, le, lt, mul, ne, or_, pow, sub, truediv
+
+from errors import Error, InvalidSyntaxError
+from inbuilt import Bool, Number, String
+from nodes import ArrayNode, AssignNode, BinOpNode, BoolNode, CallableNode, CompOpNode, ForLoopNode, FunctionNode, IdentifierNode, IfElseNode, IndexAssignNode, IndexNode, Node, NumberNode, ReturnNode, StringNode, UnaryOpNode, WhileLoopNode
+from position import SourceMap
+from resolver import declaredNames
+from tokens import ArithmeticOp, AssignOp, CompOp, LogicalOp
+
+# --------x--------x--------x--------
+# $ Opcodes
+LOAD_CONST = 0
+LOAD_LOCAL = 1
+LOAD_GLOBAL = 2
+DECLARE_LOCAL = 3
+DECLARE_GLOBAL = 4
+STORE_LOCAL = 5
+STORE_GLOBAL = 6
+CHECK_TYPE = 7
+BINARY = 8
+COMPARE = 9
+UNARY_NEG = 10
+UNARY_NOT = 11
+JUMP = 12
+JUMP_IF_FALSE = 13
+JUMP_IF_FALSE_OR_CLEAR = 14
+JUMP_IF_TRUE_OR_CLEAR = 15
+CALL = 16
+CALL_METHOD = 17
+MAKE_FUNCTION = 18
+RETURN = 19
+POP = 20
+TAIL_CALL = 21
+BUILD_ARRAY = 22
+LOAD_INDEX = 23
+STORE_INDEX = 24
+LOGICAL = 25
+
+OPNAMES = {value: name for name, value in list(globals().items()) if name.isupper() and isinstance(value, int)}
+
+BINOPS = {
+    ArithmeticOp.PLUS: add,
+    ArithmeticOp.MINUS: sub,
+    ArithmeticOp.STAR: mul,
+    ArithmeticOp.SLASH: truediv,
+    ArithmeticOp.DOUBLESTAR: pow,
+}
+
+COMPOPS = {
+    CompOp.LESS: lt,
+    CompOp.GREATER: gt,
+    CompOp.LESSEQUAL: le,
+    CompOp.GREATEREQUAL: ge,
+    CompOp.EQEQUAL: eq,
+    CompOp.NOTEQUAL: ne,
+}
+
+AUGOPS = {
+    AssignOp.PLUSEQUAL: add,
+    AssignOp.MINUSEQUAL: sub,
+    AssignOp.STAREQUAL: mul,
+    AssignOp.SLASHEQUAL: truediv,
+    AssignOp.DOUBLESTAREQUAL: pow,
+}
+# --------x--------x--------x--------
+
+class CodeObject:
+    def __init__(self, name: str, argNames: list[str] | None = None, argTypes: list[str] | None = None) -> None:
+        self.name = name
+        self.code: list = []
+        self.nodes: list[Node | None] = []
+        self.consts: list = []
+        self.names: list[str] = []
+        self.localNames: list[str] = list(argNames) if argNames != None else []
+        self.argTypes: tuple[str, ...] = tuple(argTypes) if argTypes != None else ()
+        self.memo = None
+
+    @property
+    def nLocals(self) -> int:
+        return len(self.localNames)
+
+    def emit(self, op: int, arg: object = 0, node: Node | None = None) -> int:
+        self.code += [op, arg]
+        self.nodes += [node, node]
+        return len(self.code) - 1
+
+    def patch(self, argIdx: int, target: int | None = None) -> None:
+        self.code[argIdx] = len(self.code) if target == None else target
+
+    def const(self, value: object) -> int:
+        for idx, const in enumerate(self.consts):
+            if const is value: return idx
+        self.consts.append(value)
+        return len(self.consts) - 1
+
+    def nameIdx(self, identifier: str) -> int:
+        if identifier not in self.names: self.names.append(identifier)
+        return self.names.index(identifier)
+
+    def disassemble(self) -> str:
+        lines: list[str] = [f'<code {self.name}>']
+        for pc in range(0, len(self.code), 2):
+            lines.append(f'{pc:>6} {OPNAMES[self.code[pc]]:<22} {self.code[pc + 1]!r}')
+        for const in self.consts:
+            if isinstance(const, CodeObject): lines.append(const.disassemble())
+        return '\n'.join(lines)
+
+    def __repr__(self) -> str:
+        return f'<code {self.name} | {len(self.code) // 2} instructions>'
+
+class Compiler:
+    def __init__(self, nodes: list[Node], srcCode: str | SourceMap) -> None:
+        self.nodes = nodes
+        self.srcMap = SourceMap.of(srcCode)
+        self.codeObj = CodeObject('<module>')
+        self.isFunction = False
+
+    def compile(self) -> CodeObject | Error:
+        try:
+            self.block(self.nodes)
+        except CompileError as e:
+            return e.error
+        self.codeObj.emit(LOAD_CONST, self.codeObj.const(None))
+        self.codeObj.emit(RETURN)
+        return self.codeObj
+
+    def compileFunction(self, node: FunctionNode) -> CodeObject:
+        argNames = [varName.identifier for _, varName in node.args]
+        argTypes = [dataType.identifier for dataType, _ in node.args]
+
+        compiler = Compiler(node.body, self.srcMap)
+        compiler.codeObj = CodeObject(node.funcName.value, argNames, argTypes)
+        compiler.codeObj.memo = node.memo
+        compiler.isFunction = True
+        for identifier in declaredNames(node.body):
+            if identifier not in compiler.codeObj.localNames: compiler.codeObj.localNames.append(identifier)
+
+        compiler.block(node.body)
+        compiler.codeObj.emit(LOAD_CONST, compiler.codeObj.const(None))
+        compiler.codeObj.emit(RETURN)
+        return compiler.codeObj
+
+    def block(self, nodes: list[Node]) -> None:
+        for node in nodes:
+            self.statement(node)
+
+    def statement(self, node: Node) -> None:
+        match node:
+            case AssignNode():
+                self.assign(node)
+            case IfElseNode():
+                self.ifElse(node)
+            case ForLoopNode():
+                self.forLoop(node)
+            case WhileLoopNode():
+                self.whileLoop(node)
+            case IndexAssignNode():
+                self.expression(node.target.target)
+                self.expression(node.target.index)
+                self.expression(node.value)
+                self.codeObj.emit(STORE_INDEX, AUGOPS.get(node.assignOp), node)
+            case FunctionNode():
+                self.codeObj.emit(MAKE_FUNCTION, self.codeObj.const(self.compileFunction(node)), node)
+                self.declare(node.funcName.value, node)
+            case ReturnNode(value=CallableNode()) if self.isFunction and node.value.callableName.chainedIdentifier == None:
+                self.call(node.value, True)
+                self.codeObj.emit(RETURN, 0, node)
+            case ReturnNode():
+                if node.value != None: self.expression(node.value)
+                else: self.codeObj.emit(LOAD_CONST, self.codeObj.const(None))
+                self.codeObj.emit(RETURN, 0, node)
+            case _:
+                self.expression(node)
+                self.codeObj.emit(POP)
+
+    def expression(self, node: Node) -> None:
+        codeObj = self.codeObj
+        match node:
+            case NumberNode():
+                codeObj.emit(LOAD_CONST, codeObj.const(Number(node)), node)
+            case StringNode():
+                codeObj.emit(LOAD_CONST, codeObj.const(String(node)), node)
+            case BoolNode():
+                codeObj.emit(LOAD_CONST, codeObj.const(Bool(node)), node)
+            case IdentifierNode():
+                self.load(node.identifier, node)
+            case BinOpNode(operator=operator) if operator.tokenType in (LogicalOp.AND, LogicalOp.OR):
+                self.expression(node.leftElem)
+                jump = codeObj.emit(JUMP_IF_FALSE_OR_CLEAR if operator.tokenType == LogicalOp.AND else JUMP_IF_TRUE_OR_CLEAR, 0, node)
+                self.expression(node.rightElem)
+                codeObj.emit(LOGICAL, and_ if operator.tokenType == LogicalOp.AND else or_, node)
+                codeObj.patch(jump)
+            case BinOpNode():
+                self.expression(node.leftElem)
+                self.expression(node.rightElem)
+                codeObj.emit(BINARY, BINOPS[node.operator.tokenType], node)
+            case CompOpNode():
+                self.expression(node.leftElem)
+                self.expression(node.rightElem)
+                codeObj.emit(COMPARE, COMPOPS[node.operator.tokenType], node)
+            case UnaryOpNode():
+                self.expression(node.elem)
+                codeObj.emit(UNARY_NOT if node.operator.tokenType == LogicalOp.NOT else UNARY_NEG, 0, node)
+            case CallableNode():
+                self.call(node)
+            case ArrayNode():
+                for element in node.elements: self.expression(element)
+                codeObj.emit(BUILD_ARRAY, (len(node.elements), node.elementType), node)
+            case IndexNode():
+                self.expression(node.target)
+                self.expression(node.index)
+                codeObj.emit(LOAD_INDEX, 0, node)
+            case _:
+                raise CompileError(InvalidSyntaxError(f'{node.__class__.__name__} is not an expression', self.srcMap, node.beginPos, node.endPos))
+
+    def assign(self, node: AssignNode) -> None:
+        codeObj = self.codeObj
+        identifier = node.varName.identifier
+
+        if node.dataType != None:
+            self.expression(node.value)
+            codeObj.emit(CHECK_TYPE, node.dataType.value, node)
+            self.declare(identifier, node)
+            return
+
+        self.expression(node.value)
+        self.store(identifier, AUGOPS.get(node.assignOp), node)
+
+    def ifElse(self, node: IfElseNode) -> None:
+        codeObj = self.codeObj
+        exitJumps: list[int] = []
+
+        for ifNode in [node.ifNode] + node.elifNodes:
+            self.expression(ifNode.condition)
+            skipJump = codeObj.emit(JUMP_IF_FALSE, 0, ifNode.condition)
+            self.block(ifNode.body)
+            exitJumps.append(codeObj.emit(JUMP))
+            codeObj.patch(skipJump)
+
+        if node.elseNode != None: self.block(node.elseNode.body)
+        for jump in exitJumps: codeObj.patch(jump)
+
+    def forLoop(self, node: ForLoopNode) -> None:
+        codeObj = self.codeObj
+
+        self.statement(node.init)
+        loopStart = len(codeObj.code)
+        self.expression(node.condition)
+        exitJump = codeObj.emit(JUMP_IF_FALSE, 0, node.condition)
+        self.block(node.body)
+        self.statement(node.reAssign)
+        codeObj.emit(JUMP, loopStart)
+        codeObj.patch(exitJump)
+
+    def whileLoop(self, node: WhileLoopNode) -> None:
+        codeObj = self.codeObj
+
+        loopStart = len(codeObj.code)
+        self.expression(node.condition)
+        exitJump = codeObj.emit(JUMP_IF_FALSE, 0, node.condition)
+        self.block(node.body)
+        codeObj.emit(JUMP, loopStart)
+        codeObj.patch(exitJump)
+
+    def call(self, node: CallableNode, tail: bool = False) -> None:
+        codeObj = self.codeObj
+        callableName = node.callableName
+
+        if callableName.chainedIdentifier != None:
+            self.load(callableName.identifier, node)
+            for param in node.params: self.expression(param)
+            codeObj.emit(CALL_METHOD, (callableName.chainedIdentifier.identifier, len(node.params)), node)
+            return
+
+        self.load(callableName.identifier, node)
+        for param in node.params: self.expression(param)
+        codeObj.emit(TAIL_CALL if tail else CALL, len(node.params), node)
+
+    def load(self, identifier: str, node: Node) -> None:
+        if self.isFunction and identifier in self.codeObj.localNames:
+            self.codeObj.emit(LOAD_LOCAL, self.codeObj.localNames.index(identifier), node)
+        else:
+            self.codeObj.emit(LOAD_GLOBAL, self.codeObj.nameIdx(identifier), node)
+
+    def declare(self, identifier: str, node: Node) -> None:
+        if self.isFunction:
+            self.codeObj.emit(DECLARE_LOCAL, self.codeObj.localNames.index(identifier), node)
+        else:
+            self.codeObj.emit(DECLARE_GLOBAL, self.codeObj.nameIdx(identifier), node)
+
+    def store(self, identifier: str, augOp: object, node: Node) -> None:
+        if self.isFunction and identifier in self.codeObj.localNames:
+            self.codeObj.emit(STORE_LOCAL, (self.codeObj.localNames.index(identifier), augOp), node)
+        else:
+            self.codeObj.emit(STORE_GLOBAL, (self.codeObj.nameIdx(identifier), augOp), node)
+
+class CompileError(Exception):
+    def __init__(self, error: Error) -> None:
+        self.error = error
@@ -1,69 +1,78 @@
-from position import Position
+from position import SourceMap
 
 class Error:
     def __init__(
         self,
         errorName: str,
         details: str,
-        errorLine: str,
-        beginPos: Position,
-        endPos: Position | None = None
+        srcMap: SourceMap,
+        beginPos: int,
+        endPos: int | None = None
     ) -> None:
         self.errorName = errorName
         self.details = details
-        self.errorLine = errorLine
+        self.srcMap = srcMap
         self.beginPos = beginPos
         if endPos == None: self.endPos = beginPos
         else: self.endPos = endPos
-    
+
+    @property
+    def errorLine(self) -> str:
+        return self.srcMap.lineAt(self.beginPos)
+
     def __repr__(self) -> str:
-        errorDetails: str = f"{self.errorName}: {self.details} | column {self.beginPos.columnNoInFile} line {self.beginPos.lineNoInFile}"
+        beginColumn = self.srcMap.columnNo(self.beginPos)
+        errorDetails: str = f"{self.errorName}: {self.details} | column {beginColumn + 1} line {self.srcMap.lineNo(self.beginPos) + 1}"
 
         if '\n' in self.errorLine:
             return errorDetails + '\n\n' + self.errorLine
-        elif self.beginPos is self.endPos:
-            errorPosition = f'{self.errorLine}\n' + ' '*self.beginPos.columnNo + '^'
+        elif self.beginPos == self.endPos:
+            errorPosition = f'{self.errorLine}\n' + ' '*beginColumn + '^'
         else:
-            errorPosition: str = f'{self.errorLine}\n' + ' '*self.beginPos.columnNo + '^'*(self.endPos.columnNo + 1 - self.beginPos.columnNo)
+            errorPosition: str = f'{self.errorLine}\n' + ' '*beginColumn + '^'*(self.srcMap.columnNo(self.endPos) + 1 - beginColumn)
 
         error: str = errorDetails + '\n\n' + errorPosition
         return error
     
-    def setEndPos(self, endPos: Position) -> None:
+    def setEndPos(self, endPos: int) -> None:
         self.endPos = endPos
 
 class InvalidLiteralError(Error):
-    def __init__(self, details: str, errorLine: str, beginPos: Position, endPos: Position | None = None) -> None:
-        super().__init__('InvalidLiteralError', details, errorLine, beginPos, endPos)
+    def __init__(self, details: str, srcMap: SourceMap, beginPos: int, endPos: int | None = None) -> None:
+        super().__init__('InvalidLiteralError', details, srcMap, beginPos, endPos)
 
 class InvalidCharError(Error):
-    def __init__(self, details: str, errorLine: str, beginPos: Position, endPos: Position | None = None) -> None:
-        super().__init__('InvalidCharError', details, errorLine, beginPos, endPos)
+    def __init__(self, details: str, srcMap: SourceMap, beginPos: int, endPos: int | None = None) -> None:
+        super().__init__('InvalidCharError', details, srcMap, beginPos, endPos)
 
 class MissingTokenError(Error):
-    def __init__(self, errorName: str, details: str, errorLine: str, beginPos: Position, endPos: Position | None = None) -> None:
-        super().__init__(errorName, details, errorLine, beginPos, endPos)
+    def __init__(self, errorName: str, details: str, srcMap: SourceMap, beginPos: int, endPos: int | None = None) -> None:
+        super().__init__(errorName, details, srcMap, beginPos, endPos)
 
 class MissingExprError(Error):
-    def __init__(self, details: str, errorLine: str, beginPos: Position, endPos: Position | None = None) -> None:
-        super().__init__('MissingExprError', details, errorLine, beginPos, endPos)
+    def __init__(self, details: str, srcMap: SourceMap, beginPos: int, endPos: int | None = None) -> None:
+        super().__init__('MissingExprError', details, srcMap, beginPos, endPos)
 
 class UnexpectedTokenError(Error):
-    def __init__(self, details: str, errorLine: str, beginPos: Position, endPos: Position | None = None) -> None:
-        super().__init__('UnexpectedTokenError', details, errorLine, beginPos, endPos)
+    def __init__(self, details: str, srcMap: SourceMap, beginPos: int, endPos: int | None = None) -> None:
+        super().__init__('UnexpectedTokenError', details, srcMap, beginPos, endPos)
 
 class InvalidSyntaxError(Error):
-    def __init__(self, details: str, errorLine: str, beginPos: Position, endPos: Position | None = None) -> None:
-        super().__init__('InvalidSyntaxError', details, errorLine, beginPos, endPos)
+    def __init__(self, details: str, srcMap: SourceMap, beginPos: int, endPos: int | None = None) -> None:
+        super().__init__('InvalidSyntaxError', details, srcMap, beginPos, endPos)
 
 class InvalidAssignmentError(Error):
-    def __init__(self, details: str, errorLine: str, beginPos: Position, endPos: Position | None = None) -> None:
-        super().__init__('IvalidAssignmentError', details, errorLine, beginPos, endPos)
+    def __init__(self, details: str, srcMap: SourceMap, beginPos: int, endPos: int | None = None) -> None:
+        super().__init__('IvalidAssignmentError', details, srcMap, beginPos, endPos)
 
 class InvalidTypeError(Error):
-    def __init__(self, details: str, errorLine: str, beginPos: Position, endPos: Position | None = None) -> None:
-        super().__init__('InvalidTypeError', details, errorLine, beginPos, endPos)
+    def __init__(self, details: str, srcMap: SourceMap, beginPos: int, endPos: int | None = None) -> None:
+        super().__init__('InvalidTypeError', details, srcMap, beginPos, endPos)
 
 class UndefinedNameError(Error):
-    def __init__(self, details: str, errorLine: str, beginPos: Position, endPos: Position | None = None) -> None:
-        super().__init__('UndefinedNameError', details, errorLine, beginPos, endPos)
\ No newline at end of file
+    def __init__(self, details: str, srcMap: SourceMap, beginPos: int, endPos: int | None = None) -> None:
+        super().__init__('UndefinedNameError', details, srcMap, beginPos, endPos)
+
+class InvalidIndexError(Error):
+    def __init__(self, details: str, srcMap: SourceMap, beginPos: int, endPos: int | None = None) -> None:
+        super().__init__('InvalidIndexError', details, srcMap, beginPos, endPos)
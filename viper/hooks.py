@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from errors import Error
+from nodes import FunctionNode, Node
+
+BUCKETS = 24
+
+class Hook:
+    nodes = False
+
+    def onCall(self, func: FunctionNode, args: list) -> None:
+        pass
+
+    def onReturn(self, func: FunctionNode, value: object, elapsed: float) -> None:
+        pass
+
+    def onError(self, func: FunctionNode | None, error: Error, elapsed: float) -> None:
+        pass
+
+    def onNode(self, node: Node) -> None:
+        pass
+
+class Latency:
+    __slots__ = ('name', 'calls', 'errors', 'total', 'max', 'buckets')
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * BUCKETS
+
+    def add(self, elapsed: float) -> None:
+        self.calls += 1
+        self.total += elapsed
+        if elapsed > self.max: self.max = elapsed
+        self.buckets[min(int(elapsed * 1e6).bit_length(), BUCKETS - 1)] += 1
+
+    def percentile(self, fraction: float) -> float:
+        target = fraction * self.calls
+        seen = 0
+        for idx, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= target: return bucketLimit(idx)
+        return 0.0
+
+    def __repr__(self) -> str:
+        mean = self.total / self.calls if self.calls else 0.0
+        return f'{self.name}: {self.calls} calls, {self.errors} errors, mean {formatTime(mean)}, p50 <{formatTime(self.percentile(0.5))}, p99 <{formatTime(self.percentile(0.99))}, max {formatTime(self.max)}'
+
+class LatencyHistogram(Hook):
+    def __init__(self) -> None:
+        self.functions: dict[FunctionNode, Latency] = {}
+
+    def latency(self, func: FunctionNode) -> Latency:
+        latency = self.functions.get(func)
+        if latency is None: latency = self.functions[func] = Latency(func.funcName.value)
+        return latency
+
+    def onReturn(self, func: FunctionNode, value: object, elapsed: float) -> None:
+        self.latency(func).add(elapsed)
+
+    def onError(self, func: FunctionNode | None, error: Error, elapsed: float) -> None:
+        if func is None: return
+        latency = self.latency(func)
+        latency.add(elapsed)
+        latency.errors += 1
+
+    def report(self) -> str:
+        lines: list[str] = []
+        for latency in sorted(self.functions.values(), key=lambda latency: latency.total, reverse=True):
+            lines.append(repr(latency))
+            for idx, count in enumerate(latency.buckets):
+                if count: lines.append(f'    <{formatTime(bucketLimit(idx)):>8} {count:>10}')
+        return '\n'.join(lines)
+
+def bucketLimit(idx: int) -> float:
+    return (1 << idx) / 1e6
+
+def formatTime(seconds: float) -> str:
+    if seconds >= 1: return f'{seconds:.2f}s'
+    if seconds >= 1e-3: return f'{seconds * 1e3:.2f}ms'
+    return f'{seconds * 1e6:.0f}µs'
@@ -1,165 +1,398 @@
 from __future__ import annotations
+
+from array import array
+from itertools import repeat
+from operator import add, eq, ge, gt, le, lt, mul, ne, pow, sub, truediv
+from typing import Callable, Iterable
+
 from nodes import BoolNode, NumberNode, StringNode
 
+try: import numpy
+except ImportError: numpy = None
+
+SMALLINTMIN = -128
+SMALLINTMAX = 1024
+ROPEMIN = 256
+
 class Primitive:
-    def __init__(self, value: int | float | str | bool) -> None:
-        self.value = value
-        self.rectifyDataType()
+    __slots__ = ('value',)
+    dataType: str
+
+    def __new__(cls, value: int | float | str | bool):
+        return makePrimitive(value)
 
     def deepCopy(self, value: int | float | str | bool | None = None) -> String | Number | Bool | Primitive:
-        if value == None: value = self.value
-        if isinstance(value, str):
-            return String(value)
-        if isinstance(value, bool):
-            return Bool(value)
-        if isinstance(value, int) or isinstance(value, float): # type: ignore
-            return Number(value)
-        copy = Primitive(value)
-        copy.rectifyDataType()
-        return copy
-
-    def rectifyDataType(self):
-        if isinstance(self.value, str):
-            self.dataType = 'String'
-        if isinstance(self.value, int) or isinstance(self.value, float): # type: ignore
-            self.dataType = 'num'
-        if isinstance(self.value, bool):
-            self.dataType = 'bool'
+        if value == None: return self
+        return makePrimitive(value)
+
+    def __reduce__(self):
+        return (makePrimitive, (self.value,))
 
     def __add__(self, other: Primitive):
-        try:
-            deepCopy = self.deepCopy()
-            deepCopy.value += other.value # type: ignore
-            deepCopy.rectifyDataType()
-            return deepCopy
-        except: raise TypeError
+        try: return makePrimitive(self.value + other.value) # type: ignore
+        except Exception: return NotImplemented
 
     def __sub__(self, other: Primitive):
-        try:
-            deepCopy = self.deepCopy()
-            deepCopy.value -= other.value # type: ignore
-            deepCopy.rectifyDataType()
-            return deepCopy
-        except: raise TypeError
+        try: return makePrimitive(self.value - other.value) # type: ignore
+        except Exception: return NotImplemented
 
     def __mul__(self, other: Primitive):
-        try:
-            deepCopy = self.deepCopy()
-            deepCopy.value *= other.value # type: ignore
-            deepCopy.rectifyDataType()
-            return deepCopy
-        except: raise TypeError
+        try: return makePrimitive(self.value * other.value) # type: ignore
+        except Exception: return NotImplemented
 
     def __truediv__(self, other: Primitive):
-        try:
-            deepCopy = self.deepCopy()
-            deepCopy.value /= other.value # type: ignore
-            deepCopy.rectifyDataType()
-            return deepCopy
-        except: raise TypeError
+        try: return makePrimitive(self.value / other.value) # type: ignore
+        except Exception: return NotImplemented
 
     def __pow__(self, other: Primitive):
-        try:
-            deepCopy = self.deepCopy()
-            deepCopy.value **= other.value # type: ignore
-            deepCopy.rectifyDataType()
-            return deepCopy
-        except: raise TypeError
+        try: return makePrimitive(self.value ** other.value) # type: ignore
+        except Exception: return NotImplemented
     
     def __and__(self, other: Primitive):
-        try:
-            deepCopy = self.deepCopy()
-            deepCopy.value &= other.value # type: ignore
-            deepCopy.rectifyDataType()
-            return deepCopy
-        except: raise TypeError
+        try: return makePrimitive(self.value & other.value) # type: ignore
+        except Exception: raise TypeError
 
     def __or__(self, other: Primitive):
-        try:
-            deepCopy = self.deepCopy()
-            deepCopy.value |= other.value # type: ignore
-            deepCopy.rectifyDataType()
-            return deepCopy
-        except: raise TypeError
+        try: return makePrimitive(self.value | other.value) # type: ignore
+        except Exception: raise TypeError
 
     def __neg__(self):
-        try:
-            deepCopy = self.deepCopy()
-            deepCopy.value = - deepCopy.value # type: ignore
-            deepCopy.rectifyDataType()
-            return deepCopy
-        except: raise TypeError
+        try: return makePrimitive(- self.value) # type: ignore
+        except Exception: raise TypeError
 
     def __not__(self):
-        try:
-            deepCopy = self.deepCopy()
-            deepCopy.value = not deepCopy.value
-            deepCopy.rectifyDataType()
-            return deepCopy
-        except: raise TypeError
+        return FALSE if self.value else TRUE
     
     def __lt__(self, other: Primitive):
-        try:
-            return Bool(self.value < other.value) # type: ignore
-        except: raise TypeError
+        try: return TRUE if self.value < other.value else FALSE # type: ignore
+        except Exception: return NotImplemented
     
     def __gt__(self, other: Primitive):
-        try:
-            return Bool(self.value > other.value) # type: ignore
-        except: raise TypeError
+        try: return TRUE if self.value > other.value else FALSE # type: ignore
+        except Exception: return NotImplemented
     
     def __le__(self, other: Primitive):
-        try:
-            return Bool(self.value <= other.value) # type: ignore
-        except: raise TypeError
+        try: return TRUE if self.value <= other.value else FALSE # type: ignore
+        except Exception: return NotImplemented
     
     def __ge__(self, other: Primitive):
-        try:
-            return Bool(self.value >= other.value) # type: ignore
-        except: raise TypeError
+        try: return TRUE if self.value >= other.value else FALSE # type: ignore
+        except Exception: return NotImplemented
     
     def __eq__(self, other: Primitive | None): # type: ignore
         if other == None: return False
 
-        try:
-            return Bool(self.value == other.value) # type: ignore
-        except: raise TypeError
+        try: return TRUE if self.value == other.value else FALSE # type: ignore
+        except Exception:
+            if isinstance(other, Array): return NotImplemented
+            raise TypeError
 
     def __ne__(self, other: Primitive | None): # type: ignore
         if other == None: return True
 
-        try:
-            return Bool(self.value != other.value) # type: ignore
-        except: raise TypeError
+        try: return TRUE if self.value != other.value else FALSE # type: ignore
+        except Exception:
+            if isinstance(other, Array): return NotImplemented
+            raise TypeError
 
     def __bool__(self):
-        return self.value
+        return bool(self.value)
 
     def __getattr__(self, item: str):
+        if item == 'value': raise AttributeError(item)
         return getattr(self.value, item)
 
+    def __setattr__(self, item: str, value: object):
+        if hasattr(self, 'value'): raise AttributeError(f'{self.dataType} values are immutable')
+        object.__setattr__(self, item, value)
+
     def __repr__(self) -> str:
         return f'{self.value}'
 
 class String(Primitive):
+    __slots__ = ()
     dataType = 'String'
-    def __init__(self, value: StringNode | str) -> None:
-        if isinstance(value, str): super().__init__(value)
-        else: super().__init__(value.str)
+    def __new__(cls, value: StringNode | str):
+        self = object.__new__(cls)
+        object.__setattr__(self, 'value', value if isinstance(value, str) else value.str)
+        return self
+
+    def __add__(self, other: Primitive):
+        if not isinstance(other, String): return Primitive.__add__(self, other)
+        if self.__class__ is Rope or len(self.value) + len(other.value) >= ROPEMIN: return Rope(self, other)
+        return String(self.value + other.value)
+
+class Rope(String):
+    __slots__ = ('chunks', 'used', 'length')
+
+    def __new__(cls, left: String, right: String):
+        self = object.__new__(cls)
+        if left.__class__ is Rope:
+            chunks = left.chunks if left.used == len(left.chunks) else left.chunks[:left.used] # type: ignore
+            length = left.length # type: ignore
+        else:
+            chunks = [left.value]
+            length = len(left.value)
+        chunks.append(right.value)
+        object.__setattr__(self, 'chunks', chunks)
+        object.__setattr__(self, 'used', len(chunks))
+        object.__setattr__(self, 'length', length + len(right.value))
+        return self
+
+    def __getattr__(self, item: str):
+        if item != 'value': return getattr(self.value, item)
+        value = ''.join(self.chunks[:self.used])
+        object.__setattr__(self, 'value', value)
+        object.__setattr__(self, 'chunks', [value])
+        object.__setattr__(self, 'used', 1)
+        return value
+
+    def __bool__(self):
+        return self.length > 0
 
 class Number(Primitive):
+    __slots__ = ()
     dataType = 'num'
-    def __init__(self, value: NumberNode | int | float) -> None:
-        if isinstance(value, int) or isinstance(value, float): super().__init__(value)
-        else: super().__init__(value.num)
+    def __new__(cls, value: NumberNode | int | float):
+        if not (isinstance(value, int) or isinstance(value, float)): value = value.num
+        if value.__class__ is int and SMALLINTMIN <= value <= SMALLINTMAX and SMALLINTS: # type: ignore
+            return SMALLINTS[value - SMALLINTMIN] # type: ignore
+        self = object.__new__(cls)
+        object.__setattr__(self, 'value', value)
+        return self
 
 class Bool(Primitive):
+    __slots__ = ()
     dataType = 'bool'
-    def __init__(self, value: BoolNode | bool) -> None:
-        if isinstance(value, bool): super().__init__(value)
-        else: super().__init__(value.bool)
+    def __new__(cls, value: BoolNode | bool):
+        if not isinstance(value, bool): value = value.bool
+        if TRUE != None: return TRUE if value else FALSE
+        self = object.__new__(cls)
+        object.__setattr__(self, 'value', value)
+        return self
+
+SMALLINTS: list[Number] = []
+SMALLINTS += [Number(value) for value in range(SMALLINTMIN, SMALLINTMAX + 1)]
+TRUE: Bool | None = None
+FALSE: Bool | None = None
+TRUE, FALSE = Bool(True), Bool(False)
+
+def makePrimitive(value: int | float | str | bool) -> String | Number | Bool:
+    valueType = value.__class__
+    if valueType is bool: return TRUE if value else FALSE # type: ignore
+    if valueType is int or valueType is float: return Number(value) # type: ignore
+    if valueType is str: return String(value) # type: ignore
+    if isinstance(value, bool): return TRUE if value else FALSE # type: ignore
+    if isinstance(value, int) or isinstance(value, float): return Number(value)
+    if isinstance(value, str): return String(value)
+    raise TypeError(f'{valueType.__name__} is not a Viper type')
+
+class Array:
+    __slots__ = ('elementType', 'dataType', 'items')
+    methods = ('append',)
+
+    def __init__(self, elementType: str, values: Iterable[int | float | str | bool] = ()) -> None:
+        self.elementType = elementType
+        self.dataType = elementType + '[]'
+        values = list(values)
+        self.items: array | bytearray | list
+        if elementType == 'num':
+            try: self.items = array('q', values)
+            except TypeError: self.items = array('d', values)
+            except OverflowError: self.items = values
+        elif elementType == 'bool': self.items = bytearray(values)
+        else: self.items = values
+
+    @staticmethod
+    def of(elementType: str | None, values: list) -> Array:
+        if elementType == None: elementType = getattr(values[0], 'dataType', None) if len(values) else 'num'
+        if elementType not in ELEMENTTYPES: raise TypeError(f"Arrays can't hold values of type {elementType}")
+        for value in values:
+            if getattr(value, 'dataType', None) != elementType: raise TypeError(f"Type {getattr(value, 'dataType', None)} can't be stored in {elementType}[]")
+        return Array(elementType, [value.value for value in values])
+
+    @staticmethod
+    def wrap(elementType: str, items: array | bytearray | list) -> Array:
+        self = object.__new__(Array)
+        self.elementType = elementType
+        self.dataType = elementType + '[]'
+        self.items = items
+        return self
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def values(self) -> Iterable:
+        if self.elementType == 'bool': return map(bool, self.items)
+        return self.items
+
+    def numbers(self) -> array | list:
+        if self.elementType != 'num': raise TypeError(f'{self.dataType} is not numeric')
+        return self.items
+
+    def vector(self):
+        if numpy is None or isinstance(self.items, list): return None
+        if isinstance(self.items, bytearray): return numpy.frombuffer(self.items, dtype=numpy.bool_)
+        return numpy.frombuffer(self.items, dtype=self.items.typecode)
+
+    def elementwise(self, other: object, op: Callable, reflected: bool = False) -> Array:
+        if isinstance(other, Array):
+            if len(other.items) != len(self.items): raise TypeError(f"Can't combine {self.dataType} of length {len(self.items)} with {other.dataType} of length {len(other.items)}")
+            otherType = other.elementType
+        else: otherType = getattr(other, 'dataType', None)
+
+        if op in ARITHMETICOPS: valid = self.elementType == 'num' and otherType == 'num'
+        elif op in LOGICALOPS: valid = otherType in ELEMENTTYPES
+        else: valid = otherType in ELEMENTTYPES and (self.elementType == 'String') == (otherType == 'String')
+        if not valid: raise TypeError(f"Unsupported operand types: {self.dataType} and {getattr(other, 'dataType', None)}")
+
+        right = other if isinstance(other, Array) else other.value # type: ignore
+        result = vectorized(op, self, right, reflected)
+        if result is not None: return result
+
+        left = self.values()
+        right = right.values() if isinstance(right, Array) else repeat(right)
+        return Array('num' if op in ARITHMETICOPS else 'bool', map(op, right, left) if reflected else map(op, left, right))
+
+    def __add__(self, other: object): return self.elementwise(other, add)
+    def __radd__(self, other: object): return self.elementwise(other, add, True)
+    def __sub__(self, other: object): return self.elementwise(other, sub)
+    def __rsub__(self, other: object): return self.elementwise(other, sub, True)
+    def __mul__(self, other: object): return self.elementwise(other, mul)
+    def __rmul__(self, other: object): return self.elementwise(other, mul, True)
+    def __truediv__(self, other: object): return self.elementwise(other, truediv)
+    def __rtruediv__(self, other: object): return self.elementwise(other, truediv, True)
+    def __pow__(self, other: object): return self.elementwise(other, pow)
+    def __rpow__(self, other: object): return self.elementwise(other, pow, True)
+    def __and__(self, other: object): return self.elementwise(other, logicalAnd)
+    def __or__(self, other: object): return self.elementwise(other, logicalOr)
+    def __lt__(self, other: object): return self.elementwise(other, lt)
+    def __gt__(self, other: object): return self.elementwise(other, gt)
+    def __le__(self, other: object): return self.elementwise(other, le)
+    def __ge__(self, other: object): return self.elementwise(other, ge)
+
+    def __eq__(self, other: object): # type: ignore
+        if other is None: return False
+        return self.elementwise(other, eq)
 
-INBUILTTYPES = ['String', 'num', 'bool']
+    def __ne__(self, other: object): # type: ignore
+        if other is None: return True
+        return self.elementwise(other, ne)
+
+    def __neg__(self):
+        return self.elementwise(Number(-1), mul)
+
+    def __not__(self):
+        vector = self.vector()
+        if vector is not None: return fromVector(numpy.logical_not(vector)) # type: ignore
+        return Array('bool', [not value for value in self.values()])
+
+    def index(self, index: object) -> int:
+        value = getattr(index, 'value', None)
+        if not isinstance(index, Number) or not (isinstance(value, int) or value.is_integer()): # type: ignore
+            raise TypeError(f"Array indices must be whole numbers, not {getattr(index, 'dataType', None)}")
+        idx = int(value) # type: ignore
+        if not -len(self.items) <= idx < len(self.items): raise IndexError(f'Index {idx} is out of range for {self.dataType} of length {len(self.items)}')
+        return idx
+
+    def check(self, value: object) -> None:
+        if getattr(value, 'dataType', None) != self.elementType:
+            raise TypeError(f"Type {getattr(value, 'dataType', None)} can't be stored in {self.dataType}")
+
+    def get(self, index: object) -> Primitive:
+        value = self.items[self.index(index)]
+        if self.elementType == 'bool': return TRUE if value else FALSE # type: ignore
+        return makePrimitive(value)
+
+    def set(self, index: object, value: Primitive) -> None:
+        idx = self.index(index)
+        self.check(value)
+        try: self.items[idx] = value.value # type: ignore
+        except (TypeError, OverflowError):
+            self.widen(value.value)
+            self.items[idx] = value.value # type: ignore
+
+    def append(self, value: Primitive) -> None:
+        self.check(value)
+        try: self.items.append(value.value) # type: ignore
+        except (TypeError, OverflowError):
+            self.widen(value.value)
+            self.items.append(value.value) # type: ignore
+
+    def widen(self, value: int | float | str | bool) -> None:
+        if isinstance(self.items, array) and self.items.typecode == 'q' and isinstance(value, float): self.items = array('d', self.items)
+        else: self.items = list(self.items)
+
+    def __repr__(self) -> str:
+        if self.elementType == 'bool': return '[' + ', '.join(str(bool(value)) for value in self.items) + ']'
+        return '[' + ', '.join(str(value) for value in self.items) + ']'
+
+def logicalAnd(left: object, right: object) -> bool:
+    return bool(left) and bool(right)
+
+def logicalOr(left: object, right: object) -> bool:
+    return bool(left) or bool(right)
+
+ELEMENTTYPES = ('num', 'bool', 'String')
+ARITHMETICOPS = (add, sub, mul, truediv, pow)
+LOGICALOPS = (logicalAnd, logicalOr)
+INT64MAX = 2 ** 63
+EXACTFLOAT = 2 ** 53
+
+# --------x--------x--------x--------
+# $ NumPy kernels
+# Each kernel runs only when NumPy's result is exactly what the pure Python loop in
+# Array.elementwise would produce; otherwise it returns None and the loop takes over.
+def vectorized(op: Callable, left: Array, right: Array | int | float | str | bool, reflected: bool) -> Array | None:
+    if numpy is None: return None
+    a = left.vector()
+    b = right.vector() if isinstance(right, Array) else right
+    if a is None or b is None or isinstance(b, str): return None
+    if reflected: a, b = b, a
+    if not exact(op, a, b): return None
+
+    try:
+        with numpy.errstate(over='raise', divide='raise', invalid='raise'):
+            if op is logicalAnd: return fromVector(numpy.logical_and(a, b))
+            if op is logicalOr: return fromVector(numpy.logical_or(a, b))
+            return fromVector(op(a, b))
+    except (ArithmeticError, ValueError, TypeError): return None
+
+def exact(op: Callable, a, b) -> bool:
+    kinds = kind(a) + kind(b)
+    if op in LOGICALOPS: return True
+    if op not in ARITHMETICOPS: return 'f' not in kinds or 'i' not in kinds or max(magnitude(a), magnitude(b)) <= EXACTFLOAT
+    if kinds != 'ii': return True
+
+    ma, mb = magnitude(a), magnitude(b)
+    if op is add or op is sub: return ma + mb < INT64MAX
+    if op is mul: return ma * mb < INT64MAX
+    if op is truediv: return ma <= EXACTFLOAT and mb <= EXACTFLOAT
+    return minimum(b) >= 0 and (ma <= 1 or (mb < 64 and ma ** mb < INT64MAX))
+
+def kind(value) -> str:
+    if isinstance(value, bool): return 'b'
+    if isinstance(value, int): return 'i'
+    if isinstance(value, float): return 'f'
+    return value.dtype.kind
+
+def magnitude(value) -> int | float:
+    if not hasattr(value, 'dtype'): return abs(value)
+    if value.size == 0 or value.dtype.kind == 'b': return 0
+    return max(int(value.max()), -int(value.min())) if value.dtype.kind == 'i' else max(float(value.max()), -float(value.min()))
+
+def minimum(value) -> int:
+    if not hasattr(value, 'dtype'): return value
+    return int(value.min()) if value.size else 0
+
+def fromVector(vector) -> Array:
+    if vector.dtype.kind == 'b': return Array.wrap('bool', bytearray(vector.tobytes()))
+    if vector.dtype.kind == 'f': return Array.wrap('num', array('d', vector.astype(numpy.float64, copy=False).tobytes())) # type: ignore
+    return Array.wrap('num', array('q', vector.astype(numpy.int64, copy=False).tobytes())) # type: ignore
+# --------x--------x--------x--------
+
+ARRAYTYPES = ['num[]', 'bool[]', 'String[]']
+INBUILTTYPES = ['String', 'num', 'bool'] + ARRAYTYPES
 
 class InbuiltFunctions:
     printArgs = ['String']
@@ -171,11 +404,33 @@ class InbuiltFunctions:
     
     @staticmethod
     def sum(*args: list[Number]):
+        if len(args) == 1 and isinstance(args[0], Array): return makePrimitive(sum(args[0].numbers()))
         SUM = args[0]
         for num in args[1:]:
             SUM += num # type: ignore
         return SUM
     
+    @staticmethod
+    def len(value: Array | String):
+        if isinstance(value, Array): return Number(len(value.items))
+        return Number(len(value.value))
+
+    @staticmethod
+    def min(*args: Primitive | Array):
+        if len(args) == 1 and isinstance(args[0], Array): return makePrimitive(min(args[0].values()))
+        return min(args)
+
+    @staticmethod
+    def max(*args: Primitive | Array):
+        if len(args) == 1 and isinstance(args[0], Array): return makePrimitive(max(args[0].values()))
+        return max(args)
+
+    @staticmethod
+    def mean(*args: Number | Array):
+        values = args[0].numbers() if len(args) == 1 and isinstance(args[0], Array) else [arg.value for arg in args]
+        if len(values) == 0: raise ValueError('mean of an empty sequence')
+        return makePrimitive(sum(values) / len(values))
+
     @staticmethod
     def inputExpr(out: str = ''):
         expr = input(out)
@@ -1,21 +1,45 @@
-from errors import Error, InvalidAssignmentError, InvalidTypeError, UndefinedNameError
-from inbuilt import INBUILTTYPES, Bool, InbuiltFunctions, Primitive, String, Number
+from time import perf_counter
+from typing import Callable
+
+from compiler import AUGOPS
+from errors import Error, InvalidAssignmentError, InvalidIndexError, InvalidTypeError, UndefinedNameError
+from hooks import Hook
+from inbuilt import INBUILTTYPES, Array, Bool, InbuiltFunctions, Primitive, String, Number
+from memo import MISS, memoKey
+from position import SourceMap
+from resolver import Frame, countedLoop
 from symbolTable import SymbolTable
-from nodes import AssignNode, BinOpNode, BoolNode, CallableNode, CompOpNode, ForLoopNode, FunctionNode, IdentifierNode, IfElseNode, Node, NumberNode, ReturnNode, StringNode, UnaryOpNode
+from nodes import ArrayNode, AssignNode, BinOpNode, BoolNode, CallableNode, CompOpNode, ForLoopNode, FunctionNode, IdentifierNode, IfElseNode, IndexAssignNode, IndexNode, Node, NumberNode, ReturnNode, StringNode, UnaryOpNode, WhileLoopNode
 from tokens import ArithmeticOp, AssignOp, CompOp, Identifier, LogicalOp
 
+UNCOUNTED = object()
+
 class Interpreter:
-    def __init__(self, nodes: list[Node], srcCode: str, symbolTable: SymbolTable = SymbolTable()) -> None:
+    def __init__(self, nodes: list[Node], srcCode: str | SourceMap, symbolTable: SymbolTable = SymbolTable(), frame: Frame | None = None, hooks: list[Hook] | None = None) -> None:
         self.nodes = nodes
-        self.srcCode = srcCode
+        self.srcMap = SourceMap.of(srcCode)
         self.symbolTable = symbolTable
+        self.frame = frame if frame != None else Frame(0)
+        self.hooks: list[Hook] = []
+        for hook in hooks or (): self.addHook(hook)
     
     def traverse(self, trees: list[Node] | None = None):
-        if trees == None: trees = self.nodes
+        returnVal = self.evaluate(trees)
+        if isinstance(returnVal, Error): print(returnVal)
+        return returnVal
+
+    def evaluate(self, trees: list[Node] | None = None):
+        topLevel = trees == None
+        if topLevel: trees = self.nodes
         returnVal = None
-        for node in trees:
+        for node in trees: # type: ignore
             returnVal = potentialError = self.handleNode(node)
-            if isinstance(potentialError, Error): print(potentialError); break
+            if isinstance(potentialError, Error):
+                if topLevel:
+                    for hook in self.hooks: hook.onError(None, potentialError, 0.0)
+                break
+            if returnVal.__class__ is tuple: break
+        else: returnVal = None
         
         return returnVal
 
@@ -25,47 +49,84 @@ class Interpreter:
         handler = 'handle' + node.__class__.__name__
         return getattr(self, handler)(node)
 
+    def addHook(self, hook: Hook) -> None:
+        self.hooks.append(hook)
+        self.dispatch()
+
+    def removeHook(self, hook: Hook) -> None:
+        self.hooks.remove(hook)
+        self.dispatch()
+
+    def dispatch(self) -> None:
+        self.__dict__.pop('invoke', None)
+        self.__dict__.pop('memoHit', None)
+        self.__dict__.pop('handleNode', None)
+        if self.hooks:
+            self.invoke = self.hookedInvoke
+            self.memoHit = self.hookedMemoHit
+        if any(hook.nodes for hook in self.hooks): self.handleNode = self.hookedHandleNode
+
+    def hookedInvoke(self, func: FunctionNode, frame: Frame, key: tuple | None):
+        return self.observe(func, frame.slots[:len(func.argTypes)], type(self).invoke, self, func, frame, key)
+
+    def hookedMemoHit(self, func: FunctionNode, slots: list, returnVal: object):
+        return self.observe(func, slots[:len(func.argTypes)], type(self).memoHit, self, func, slots, returnVal)
+
+    def observe(self, func: FunctionNode, args: list, run: Callable, *runArgs):
+        hooks = self.hooks
+        for hook in hooks: hook.onCall(func, args)
+
+        start = perf_counter()
+        returnVal = run(*runArgs)
+        elapsed = perf_counter() - start
+
+        if isinstance(returnVal, Error):
+            for hook in hooks: hook.onError(func, returnVal, elapsed)
+        else:
+            for hook in hooks: hook.onReturn(func, returnVal, elapsed)
+        return returnVal
+
+    def hookedHandleNode(self, node: Node):
+        for hook in self.hooks:
+            if hook.nodes: hook.onNode(node)
+        return type(self).handleNode(self, node)
+
     def handleAssignNode(self, node: AssignNode):
         dataType = node.dataType
         value = self.handleNode(node.value)
         if isinstance(value, Error): return value
 
         if dataType == None:
-            if node.varName.identifier not in self.symbolTable:
+            try: currentVal = self.lookup(node.varName)
+            except KeyError:
                 return UndefinedNameError(
                         f"Name {node.varName} is undefined",
-                        self.errorLine(node),
+                        self.srcMap,
                         node.varName.beginPos,
                         node.varName.endPos
                     )
 
-            assignedDataType = self.symbolTable.get(node.varName.identifier)
-            if assignedDataType is None: return
-            if value.dataType != assignedDataType.dataType:
+            if currentVal is None: return
+            if value.dataType != currentVal.dataType:
                 return InvalidAssignmentError(
-                        f"Type {value.dataType} can't be assigned to declared type {assignedDataType.dataType}",
-                        self.errorLine(node),
+                        f"Type {value.dataType} can't be assigned to declared type {currentVal.dataType}",
+                        self.srcMap,
                         node.beginPos, node.endPos
                     )
 
             match node:
                 case AssignNode(assignOp=AssignOp.EQUAL):
-                    self.symbolTable.update(node.varName.identifier, value)
+                    self.store(node.varName, value)
                 case AssignNode(assignOp=AssignOp.PLUSEQUAL):
-                    currentVal = self.symbolTable.get(node.varName.identifier)
-                    self.symbolTable.update(node.varName.identifier, currentVal + value)
+                    self.store(node.varName, currentVal + value)
                 case AssignNode(assignOp=AssignOp.MINUSEQUAL):
-                    currentVal = self.symbolTable.get(node.varName.identifier)
-                    self.symbolTable.update(node.varName.identifier, currentVal - value)
-                case AssignNode(assignOp=AssignOp.STAREQUAL):
-                    currentVal = self.symbolTable.get(node.varName.identifier)
-                    self.symbolTable.update(node.varName.identifier, currentVal * value)
+                    self.store(node.varName, currentVal - value)
                 case AssignNode(assignOp=AssignOp.STAREQUAL):
-                    currentVal = self.symbolTable.get(node.varName.identifier)
-                    self.symbolTable.update(node.varName.identifier, currentVal / value)
+                    self.store(node.varName, currentVal * value)
+                case AssignNode(assignOp=AssignOp.SLASHEQUAL):
+                    self.store(node.varName, currentVal / value)
                 case AssignNode(assignOp=AssignOp.DOUBLESTAREQUAL):
-                    currentVal = self.symbolTable.get(node.varName.identifier)
-                    self.symbolTable.update(node.varName.identifier, currentVal ** value)
+                    self.store(node.varName, currentVal ** value)
                 case _:
                     return
 
@@ -74,7 +135,7 @@ class Interpreter:
             if dataType.value not in self.symbolTable:
                 return UndefinedNameError(
                         f"Type {dataType.value} is not defined",
-                        self.errorLine(node),
+                        self.srcMap,
                         dataType.beginPos,
                         dataType.endPos
                     )
@@ -82,11 +143,12 @@ class Interpreter:
         if value.dataType != dataType.value:
             return InvalidAssignmentError(
                     f"Type {value.dataType} can't be assigned to declared type {dataType.value}",
-                    self.errorLine(node),
+                    self.srcMap,
                     node.beginPos, node.endPos
                 )
         
-        self.symbolTable.add(node.varName.identifier, Identifier.VARIABLE, value)
+        if node.varName.slot != None: self.frame.slots[node.varName.slot] = value
+        else: self.symbolTable.add(node.varName.identifier, Identifier.VARIABLE, value)
 
     def handleBinOpNode(self, node: BinOpNode):
         leftElem = self.handleNode(node.leftElem)
@@ -107,13 +169,13 @@ class Interpreter:
             elif node.operator.tokenType == ArithmeticOp.SLASH:
                 return leftElem / rightElem
             elif node.operator.tokenType == LogicalOp.AND:
-                return leftElem and rightElem
+                return leftElem & rightElem if isinstance(leftElem, Array) else leftElem and rightElem
             elif node.operator.tokenType == LogicalOp.OR:
-                return leftElem or rightElem
-        except:
+                return leftElem | rightElem if isinstance(leftElem, Array) else leftElem or rightElem
+        except Exception:
             return InvalidTypeError(
                 f"Unsopported operand types for '{node.operator.tokenType.value}': {leftElem.dataType} and {rightElem.dataType}",
-                self.errorLine(node),
+                self.srcMap,
                 node.beginPos,
                 node.endPos
             )
@@ -127,10 +189,10 @@ class Interpreter:
                 return elem.__not__()
             elif node.operator.tokenType == ArithmeticOp.MINUS:
                 return -elem
-        except:
+        except Exception:
             return InvalidTypeError(
                 f"Unsupported operand type for '{node.operator.value}': {elem.dataType}",
-                self.errorLine(node),
+                self.srcMap,
                 node.beginPos,
                 node.endPos
             )
@@ -155,10 +217,10 @@ class Interpreter:
                 return leftElem == rightElem
             elif node.operator.tokenType == CompOp.NOTEQUAL:
                 return leftElem != rightElem
-        except:
+        except Exception:
             return InvalidTypeError(
                 f"Unsopported operand types for '{node.operator.tokenType.value}': {leftElem.dataType} and {rightElem.dataType}",
-                self.errorLine(node),
+                self.srcMap,
                 node.beginPos,
                 node.endPos
             )
@@ -168,7 +230,7 @@ class Interpreter:
         if isinstance(condition, Error): return Error
 
         if condition:
-            potentialReturnVal = self.traverse(node.ifNode.body)
+            potentialReturnVal = self.evaluate(node.ifNode.body)
             if potentialReturnVal != None: return potentialReturnVal
         else:
             for elifNode in node.elifNodes:
@@ -176,12 +238,12 @@ class Interpreter:
                 if isinstance(condition, Error): return condition
 
                 if condition:
-                    potentialReturnVal = self.traverse(elifNode.body)
+                    potentialReturnVal = self.evaluate(elifNode.body)
                     if potentialReturnVal != None: return potentialReturnVal
 
         if not condition:
             if node.elseNode != None:
-                potentialReturnVal = self.traverse(node.elseNode.body)
+                potentialReturnVal = self.evaluate(node.elseNode.body)
                 if potentialReturnVal != None: return potentialReturnVal
 
     def handleFunctionNode(self, node: FunctionNode):
@@ -189,16 +251,22 @@ class Interpreter:
             if dataType.identifier in self.symbolTable: pass
             else: return UndefinedNameError(
                 f"Name '{dataType.identifier}' is undefined",
-                self.errorLine(dataType),
+                self.srcMap,
                 dataType.beginPos, dataType.endPos
             )
-        self.symbolTable.add(node.funcName.value, Identifier.FUNCDEF, node)
+        if node.slot != None: self.frame.slots[node.slot] = node
+        else: self.symbolTable.add(node.funcName.value, Identifier.FUNCDEF, node)
 
     def handleCallableNode(self, node: CallableNode):
-        if node.callableName.identifier not in self.symbolTable: # type: ignore
-            return UndefinedNameError(f"Name '{node.callableName}' is undefined", self.errorLine(node), node.beginPos, node.callableName.endPos)
+        callableName = node.callableName
+        if callableName.slot != None:
+            func = self.frame.get(callableName.depth, callableName.slot) # type: ignore
+            if func is node.callee and func is not None: return self.call(func, node)
+
+        try: func = self.lookup(callableName)
+        except KeyError:
+            return UndefinedNameError(f"Name '{callableName}' is undefined", self.srcMap, node.beginPos, callableName.endPos)
 
-        func = self.symbolTable.get(node.callableName.identifier)
         if func == None:
             try:
                 # TODO properly declare args and remove type: ignore on args.append()
@@ -208,66 +276,226 @@ class Interpreter:
                     arg = self.handleNode(param)
                     if isinstance(arg, Error): return arg
                     args.append(arg)
-                return getattr(InbuiltFunctions, node.callableName.identifier)(*args)
+                return getattr(InbuiltFunctions, callableName.identifier)(*args)
             except Exception as e:
-                return Error('Error', f'{e}', self.errorLine(node), node.beginPos, node.endPos)
+                return Error('Error', f'{e}', self.srcMap, node.beginPos, node.endPos)
+        elif isinstance(func, Array):
+            return self.arrayMethod(func, node)
         elif func.dataType in INBUILTTYPES and not isinstance(func, FunctionNode):
-            if node.callableName.chainedIdentifier != None:
-                return func.deepCopy(getattr(func, node.callableName.chainedIdentifier.identifier)())
-            return InvalidTypeError(f"Type {func.dataType} is not callable", self.errorLine(node), node.beginPos, node.endPos)
+            if callableName.chainedIdentifier != None:
+                return func.deepCopy(getattr(func, callableName.chainedIdentifier.identifier)())
+            return InvalidTypeError(f"Type {func.dataType} is not callable", self.srcMap, node.beginPos, node.endPos)
         elif not isinstance(func, FunctionNode):
-            return InvalidTypeError(f"Type {func.dataType} is not callable", self.errorLine(node), node.beginPos, node.endPos) # type: ignore
+            return InvalidTypeError(f"Type {func.dataType} is not callable", self.srcMap, node.beginPos, node.endPos) # type: ignore
 
-        symbols = {}
+        if callableName.slot != None:
+            node.callee = func
+            return self.call(func, node)
 
-        for param, (expectedType, varName) in zip(node.params, func.args):
+        symbols = {}
+        for idx, (param, varName) in enumerate(zip(node.params, func.args)):
             arg = self.handleNode(param)
             if isinstance(arg, Error): return arg
+            if arg.dataType != func.argTypes[idx]: return self.argTypeError(func, idx, arg, param)
+            symbols[varName[1].identifier] = (Identifier.VARIABLE, arg)
 
-            if arg.dataType != expectedType.identifier:
-                return InvalidAssignmentError(
-                        f"Type {arg.dataType} can't be assigned to parameter of type {expectedType}",
-                        self.errorLine(param),
-                        param.beginPos, param.endPos
-                    )
+        callerSymbols = self.symbolTable
+        self.symbolTable = SymbolTable(symbols, callerSymbols)
+        try:
+            if self.hooks: return self.observe(func, [arg for _, arg in symbols.values()], self.run, func.body)
+            return self.run(func.body)
+        finally: self.symbolTable = callerSymbols
+
+    def call(self, func: FunctionNode, node: CallableNode):
+        pool = func.framePool
+        frame = pool.pop() if len(pool) else Frame(0)
+        frame.slots = slots = [None] * func.frameSize # type: ignore
+        frame.parent = self.frame.ancestor(node.callableName.depth) # type: ignore
 
-            symbols[varName.identifier] = (Identifier.VARIABLE, arg)
+        for idx, (param, argType) in enumerate(zip(node.params, func.argTypes)):
+            arg = self.handleNode(param)
+            if isinstance(arg, Error): pool.append(frame); return arg
+            if arg.dataType != argType: pool.append(frame); return self.argTypeError(func, idx, arg, param)
+            slots[idx] = arg
+
+        key = None
+        memo = func.memo
+        if memo is not None and len(node.params) >= len(func.argTypes):
+            key = memoKey(slots[:len(func.argTypes)])
+            returnVal = memo.get(key)
+            if returnVal is not MISS: pool.append(frame); return self.memoHit(func, slots, returnVal)
 
-        functionInterpreter = Interpreter(func.body, self.srcCode, SymbolTable(symbols, self.symbolTable))
-        return functionInterpreter.traverse()
+        return self.invoke(func, frame, key)
+
+    def memoHit(self, func: FunctionNode, slots: list, returnVal: object):
+        return returnVal
+
+    def invoke(self, func: FunctionNode, frame: Frame, key: tuple | None):
+        callerFrame = self.frame
+        self.frame = frame
+        try:
+            returnVal = self.run(func.body)
+            if key is not None and not isinstance(returnVal, Error): func.memo.put(key, returnVal) # type: ignore
+            return returnVal
+        finally:
+            self.frame = callerFrame
+            frame.parent = None
+            func.framePool.append(frame)
+
+    def run(self, body: list[Node]):
+        for stmt in body:
+            returnVal = self.handleNode(stmt)
+            if isinstance(returnVal, Error): return returnVal
+            if returnVal.__class__ is tuple: return returnVal[0]
+
+    def argTypeError(self, func: FunctionNode, idx: int, arg: Primitive, param: Node) -> Error:
+        return InvalidAssignmentError(
+                f"Type {arg.dataType} can't be assigned to parameter of type {func.argTypes[idx]}",
+                self.srcMap,
+                param.beginPos, param.endPos
+            )
 
     def handleForLoopNode(self, node: ForLoopNode):
         self.handleAssignNode(node.init)
 
+        if node.counter == None: node.counter = countedLoop(node)
+        if len(node.counter) and node.init.varName.depth == 0:
+            returnVal = self.countedLoop(node, *node.counter)
+            if returnVal is not UNCOUNTED: return returnVal
+
         while True:
             conditionNode = self.handleNode(node.condition)
+            if isinstance(conditionNode, Error): return conditionNode
 
             if conditionNode:
-                potentialReturnVal = self.traverse(node.body)
+                potentialReturnVal = self.evaluate(node.body)
                 if potentialReturnVal != None: return potentialReturnVal
                 self.handleAssignNode(node.reAssign)
             else: break
 
+    def countedLoop(self, node: ForLoopNode, compare, step: int | float, observed: bool):
+        slots = self.frame.slots
+        slot: int = node.init.varName.slot # type: ignore
+        counter = slots[slot]
+        if counter.__class__ is not Number: return UNCOUNTED
+
+        bound = node.condition.rightElem # type: ignore
+        dynamic = isinstance(bound, IdentifierNode)
+        limit = None if dynamic else bound.num
+        i = counter.value
+        body = node.body
+        while True:
+            if dynamic:
+                limit = self.handleNode(bound)
+                if limit.__class__ is not Number: slots[slot] = Number(i); return UNCOUNTED
+                limit = limit.value
+            if not compare(i, limit): break
+
+            if observed: slots[slot] = counter = Number(i)
+            potentialReturnVal = self.evaluate(body)
+            if potentialReturnVal != None:
+                if not observed: slots[slot] = Number(i)
+                return potentialReturnVal
+
+            if observed and slots[slot] is not counter:
+                if slots[slot].__class__ is not Number: self.handleAssignNode(node.reAssign); return UNCOUNTED
+                i = slots[slot].value
+            i += step
+
+        slots[slot] = Number(i)
+
+    def handleWhileLoopNode(self, node: WhileLoopNode):
+        while True:
+            condition = self.handleNode(node.condition)
+            if isinstance(condition, Error): return condition
+            if not condition: break
+
+            potentialReturnVal = self.evaluate(node.body)
+            if potentialReturnVal != None: return potentialReturnVal
+
+    def handleArrayNode(self, node: ArrayNode):
+        elements: list[Primitive] = []
+        for element in node.elements:
+            value = self.handleNode(element)
+            if isinstance(value, Error): return value
+            elements.append(value)
+
+        try: return Array.of(node.elementType, elements)
+        except TypeError as e: return InvalidTypeError(f'{e}', self.srcMap, node.beginPos, node.endPos)
+
+    def handleIndexNode(self, node: IndexNode):
+        target = self.handleNode(node.target)
+        if isinstance(target, Error): return target
+        index = self.handleNode(node.index)
+        if isinstance(index, Error): return index
+        if not isinstance(target, Array): return InvalidTypeError(f"Type {target.dataType} is not subscriptable", self.srcMap, node.beginPos, node.endPos)
+
+        try: return target.get(index)
+        except Exception as e: return self.subscriptError(e, node)
+
+    def handleIndexAssignNode(self, node: IndexAssignNode):
+        target = self.handleNode(node.target.target)
+        if isinstance(target, Error): return target
+        index = self.handleNode(node.target.index)
+        if isinstance(index, Error): return index
+        value = self.handleNode(node.value)
+        if isinstance(value, Error): return value
+        if not isinstance(target, Array): return InvalidTypeError(f"Type {target.dataType} is not subscriptable", self.srcMap, node.target.beginPos, node.target.endPos)
+
+        if value.dataType != target.elementType:
+            return InvalidAssignmentError(f"Type {value.dataType} can't be assigned to element of type {target.elementType}", self.srcMap, node.beginPos, node.endPos)
+        try:
+            if node.assignOp != AssignOp.EQUAL: value = AUGOPS[node.assignOp](target.get(index), value)
+            target.set(index, value)
+        except Exception as e: return self.subscriptError(e, node)
+
+    def arrayMethod(self, array: Array, node: CallableNode):
+        chainedIdentifier = node.callableName.chainedIdentifier
+        if chainedIdentifier == None or chainedIdentifier.identifier not in Array.methods:
+            return InvalidTypeError(f"Type {array.dataType} is not callable", self.srcMap, node.beginPos, node.endPos)
+
+        args: list[Primitive] = []
+        for param in node.params:
+            arg = self.handleNode(param)
+            if isinstance(arg, Error): return arg
+            args.append(arg)
+
+        try: return getattr(array, chainedIdentifier.identifier)(*args)
+        except Exception as e: return self.subscriptError(e, node)
+
+    def subscriptError(self, e: Exception, node: Node) -> Error:
+        if isinstance(e, IndexError): return InvalidIndexError(f'{e}', self.srcMap, node.beginPos, node.endPos)
+        return InvalidTypeError(f'{e}' or 'Unsupported operand types', self.srcMap, node.beginPos, node.endPos)
+
     def handleStringNode(self, node: StringNode):
-        return String(node)
+        if node.primitive is None: node.primitive = String(node)
+        return node.primitive
 
     def handleNumberNode(self, node: NumberNode):
-        return Number(node)
+        if node.primitive is None: node.primitive = Number(node)
+        return node.primitive
     
     def handleBoolNode(self, node: BoolNode):
-        return Bool(node)
+        if node.primitive is None: node.primitive = Bool(node)
+        return node.primitive
 
     def handleIdentifierNode(self, node: IdentifierNode):
-        try: return self.symbolTable.get(node.identifier)
-        except: return UndefinedNameError(f"Name {node.identifier} is undefined", self.errorLine(node), node.beginPos, node.endPos)
+        try: return self.lookup(node)
+        except KeyError: return UndefinedNameError(f"Name {node.identifier} is undefined", self.srcMap, node.beginPos, node.endPos)
 
     def handleReturnNode(self, node: ReturnNode):
-        if node.value != None:
-            returnVal = self.handleNode(node.value)
-            return returnVal
-
-    def errorLine(self, node: Node):
-        beginPos = node.beginPos.idx - node.beginPos.columnNo
-        try: endPos = node.beginPos.idx + self.srcCode[node.beginPos.idx:].index('\n')
-        except: return self.srcCode[beginPos:]
-        return self.srcCode[beginPos : endPos]
+        if node.value == None: return (None,)
+        returnVal = self.handleNode(node.value)
+        if isinstance(returnVal, Error): return returnVal
+        return (returnVal,)
+
+    def lookup(self, node: IdentifierNode):
+        if node.slot != None:
+            value = self.frame.get(node.depth, node.slot) # type: ignore
+            if value is None: raise KeyError(node.identifier)
+            return value
+        return self.symbolTable.get(node.identifier)
+
+    def store(self, node: IdentifierNode, value: Primitive):
+        if node.slot != None: self.frame.set(node.depth, node.slot, value) # type: ignore
+        else: self.symbolTable.update(node.identifier, value)
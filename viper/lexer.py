@@ -1,139 +1,106 @@
-from errors import Error, InvalidLiteralError
-from position import Position
-from tokens import DIGITS, KEYWORDS, LETTERS, BOOLS, OPERATORFIRSTCHAR, OPERATORS, PUNCTUATORS, SEPARATORS, ArithmeticOp, AssignOp, CompOp, Keyword, Literal, LogicalOp, Punctuator, Token, TokenFamily
+import re
+
+from typing import Iterator
+
+from errors import Error, InvalidCharError, InvalidLiteralError
+from position import SourceMap
+from tokens import KEYWORDS, BOOLS, OPERATORS, PUNCTUATORS, SEPARATORS, Keyword, Literal, Punctuator, Token, TokenFamily
+
+# --------x--------x--------x--------
+# $ Token tables
+TOKENPATTERN = re.compile(r'''
+    (?P<SPACE>[ \t\r\n]+)
+    |(?P<NUM>[0-9][0-9.]*)
+    |(?P<STRING>'[^']*'?|"[^"]*"?)
+    |(?P<WORD>[A-Za-z][A-Za-z0-9_]*)
+    |(?P<OPERATOR>\*\*|<=|>=|==|!=|\+=|-=|\*=|/=|\^=|&&|[-+*/^<>=|!])
+    |(?P<PUNCTUATOR>[;.(){}\[\],])
+''', re.VERBOSE)
+
+WORDS: dict[str, tuple[TokenFamily, Keyword | Literal | TokenFamily | object]] = {}
+for boolStr in BOOLS[0] + BOOLS[1]: WORDS[boolStr] = (TokenFamily.LITERAL, Literal.BOOL)
+for keyword, keywordType in KEYWORDS.items(): WORDS[keyword] = (TokenFamily.KEYWORD, keywordType)
+for operator, operatorType in OPERATORS.items():
+    if operator.isalpha(): WORDS[operator] = (TokenFamily.getTokenFamily(operatorType), operatorType)
+
+OPTOKENS = {operator: (TokenFamily.getTokenFamily(operatorType), operatorType) for operator, operatorType in OPERATORS.items()}
+IDENTIFIERTOKEN = (TokenFamily.IDENTIFIER, TokenFamily.IDENTIFIER)
+PUNCTOKENS = {char: (TokenFamily.PUNCTUATOR, tokenType) for char, tokenType in list(PUNCTUATORS.items()) + list(SEPARATORS.items())}
+# --------x--------x--------x--------
 
 class Lexer:
-    def __init__(self, src: str) -> None:
-        self.position = Position()
-        self.srcCode = src
-        self.currentChar = self.srcCode[self.position.idx] if len(self.srcCode) > self.position.idx else None
-
-    def advance(self, currentChar: str | None = None) -> None:
-        self.position.advance(currentChar if currentChar != None else self.currentChar)
-        self.currentChar = self.srcCode[self.position.idx] if len(self.srcCode) > self.position.idx else None
+    def __init__(self, src: str | SourceMap) -> None:
+        self.srcMap = SourceMap.of(src)
+        self.srcCode = self.srcMap.srcCode
+        self.position = 0
 
     def yieldTokens(self) -> list[Token] | Error:
         tokens: list[Token] = []
+        end = self.scan(self.srcCode, 0, tokens)
+        if isinstance(end, Error): return end
 
-        while self.currentChar != None:
-            if self.currentChar in ' \n\t':
-                self.advance()
-                continue
-            if self.currentChar in DIGITS:
-                result: Token | InvalidLiteralError = self.makeNumber()
-                if isinstance(result, Error): return result
-                tokens.append(result)
-                continue
-            if self.currentChar in ('\'', '"'):
-                tokens.append(self.makeStr(self.currentChar))
-                continue
-            if self.currentChar in LETTERS:
-                tokens.append(self.makeKeyIdLit())
-                continue
-            if self.currentChar in OPERATORS or self.currentChar in OPERATORFIRSTCHAR:
-                op = self.currentChar
-                beginPos = self.position.copy()
-                self.advance()
-
-                tokenFamily: TokenFamily
-                tokenType: ArithmeticOp | CompOp | AssignOp | LogicalOp | None
-
-                potentialOp = op + self.currentChar
-                if potentialOp in OPERATORS:
-                    endPos = self.position.copy()
-                    self.advance()
-                    tokenType = OPERATORS[potentialOp]
-                    tokenFamily = TokenFamily.getTokenFamily(tokenType)
-                    tokens.append(Token(tokenFamily, tokenType, potentialOp, beginPos, endPos))
-                    continue
-
-                tokenType = OPERATORS[op]
-                tokenFamily = TokenFamily.getTokenFamily(tokenType)
-                tokens.append(Token(tokenFamily, tokenType, op, beginPos))
-                continue
-            if self.currentChar in PUNCTUATORS:
-                tokens.append(Token(TokenFamily.PUNCTUATOR, PUNCTUATORS[self.currentChar], self.currentChar, self.position.copy()))
-                self.advance()
-            if self.currentChar in SEPARATORS:
-                tokens.append(Token(TokenFamily.PUNCTUATOR, SEPARATORS[self.currentChar], self.currentChar, self.position.copy()))
-                self.advance()
-
-        tokens.append(Token(TokenFamily.PUNCTUATOR, Punctuator.EOF, 'EOF', self.position.copy()))
+        self.position = end
+        tokens.append(Token(TokenFamily.PUNCTUATOR, Punctuator.EOF, 'EOF', end))
         return tokens
 
-    def makeNumber(self) -> Token | InvalidLiteralError:
-        numStr: str = ''
-        dotCount: int = 0
-
-        beginPos = self.position.copy()
-
-        error: InvalidLiteralError | type[InvalidLiteralError] | None = None
-        while self.currentChar in DIGITS + ['.']:
-            if self.currentChar == '.':
-                if dotCount == 1:
-                    error = InvalidLiteralError
-                dotCount += 1
-                numStr += self.currentChar
+    def streamTokens(self) -> Iterator[Token | Error]:
+        tokens: list[Token] = []
+        carry = ''
+        base = 0
+
+        for chunk in self.srcMap.chunks():
+            text = carry + chunk
+            end = self.scan(text, base, tokens, False)
+            yield from tokens
+            tokens.clear()
+            if isinstance(end, Error): yield end; return
+            carry = text[end - base:]
+            base = end
+
+        end = self.scan(carry, base, tokens)
+        yield from tokens
+        if isinstance(end, Error): yield end; return
+
+        self.position = end
+        yield Token(TokenFamily.PUNCTUATOR, Punctuator.EOF, 'EOF', end)
+
+    def scan(self, text: str, base: int, tokens: list[Token], final: bool = True) -> int | Error:
+        append = tokens.append
+        textLen = len(text)
+        idx = 0
+
+        for tokenMatch in TOKENPATTERN.finditer(text):
+            begin = tokenMatch.start()
+            if begin != idx: break
+
+            idx = tokenMatch.end()
+            if not final and idx == textLen: return base + begin
+            kind = tokenMatch.lastgroup
+            if kind == 'SPACE': continue
+
+            value = tokenMatch.group()
+            offset = base + begin
+            end = base + idx - 1
+
+            if kind == 'WORD':
+                tokenFamily, tokenType = WORDS.get(value, IDENTIFIERTOKEN)
+                append(Token(tokenFamily, tokenType, value, offset, end)) # type: ignore
+            elif kind == 'PUNCTUATOR':
+                tokenFamily, tokenType = PUNCTOKENS[value]
+                append(Token(tokenFamily, tokenType, value, offset))
+            elif kind == 'OPERATOR':
+                tokenFamily, tokenType = OPTOKENS[value]
+                append(Token(tokenFamily, tokenType, value, offset, end))
+            elif kind == 'NUM':
+                if value.count('.') > 1:
+                    return InvalidLiteralError(value, self.srcMap, offset, end)
+                append(Token(TokenFamily.LITERAL, Literal.NUM, value, offset, end))
             else:
-                numStr += self.currentChar
-            self.advance()
-
-        if error:
-            endPos = self.position.copy()
-            endPos.revert()
-            error = error(numStr, self.errorLine(beginPos.lineNo), beginPos, endPos)
-            return error
-
-        endPos: Position = self.position.copy()
-        endPos.revert()
-
-        token = Token(TokenFamily.LITERAL, Literal.NUM, numStr, beginPos, endPos)
-        return token
-    
-    def makeStr(self, punctuator: str) -> Token:
-        strStr: str = ''
-        beginPos = self.position.copy()
-
-        self.advance()
-        while self.currentChar != punctuator and self.currentChar != None:
-            strStr += self.currentChar
-            self.advance()
-        self.advance()
-
-        endPos = self.position.copy()
-        endPos.revert()
-        
-        tokenFamily = TokenFamily.LITERAL
-        tokenType = Literal.STRING
-
-        return Token(tokenFamily, tokenType, strStr, beginPos, endPos)
-
-    def makeKeyIdLit(self) -> Token:
-        idStr: str = ''
-        beginPos = self.position.copy()
-
-        while self.currentChar in LETTERS + DIGITS + ['_']:
-            idStr += self.currentChar
-            self.advance()
-
-        endPos: Position = self.position.copy()
-        endPos.revert()
-
-        tokenType: Keyword | Literal | ArithmeticOp | CompOp | AssignOp | LogicalOp | TokenFamily | None
-        if idStr in BOOLS[0] or idStr in BOOLS[1]:
-            tokenFamily = TokenFamily.LITERAL
-            tokenType = Literal.BOOL
-        elif idStr in KEYWORDS:
-            tokenFamily = TokenFamily.KEYWORD
-            tokenType = KEYWORDS[idStr]
-        elif idStr in OPERATORS:
-            tokenType = OPERATORS[idStr]
-            tokenFamily = TokenFamily.getTokenFamily(tokenType)
-        else:
-            tokenFamily = TokenFamily.IDENTIFIER
-            tokenType = TokenFamily.IDENTIFIER
-
-        return Token(tokenFamily, tokenType, idStr, beginPos, endPos)
-    
-    def errorLine(self, lineNo: int) -> str:
-        return self.srcCode.split('\n')[lineNo]
+                terminated = len(value) > 1 and value[-1] == value[0]
+                append(Token(TokenFamily.LITERAL, Literal.STRING, value[1:-1] if terminated else value[1:], offset, end if terminated else end + 1))
+                if not terminated: idx += 1
+
+        if idx < textLen:
+            if not final and idx == textLen - 1: return base + idx
+            return InvalidCharError(f"'{text[idx]}'", self.srcMap, base + idx)
+        return base + idx
@@ -1,11 +1,33 @@
-from sys import argv
+from argparse import ArgumentParser, Namespace
+from json import dump
 from os import getcwd
 from os.path import join
+from sys import exit, stderr
 
+from batch import Batch, ScriptResult
+from cache import CACHEDIR, ProgramCache
+from closureCompiler import ClosureCompiler
+from compiler import Compiler
 from interpreter import Interpreter
 from errors import Error
 from lexer import Lexer
+from memo import MEMOSIZE, Memoizer
+from optimizer import Optimizer
+from nodes import Node
 from parser import Parser
+from position import FileSourceMap, SourceMap
+from profiler import Profiler, ProfilingInterpreter
+from resolver import Frame, Resolver
+from tokens import TokenStream
+from vm import MAXDEPTH, VM
+
+resolver = Resolver()
+globalFrame = Frame(0)
+
+def reset() -> None:
+    global resolver, globalFrame
+    resolver = Resolver()
+    globalFrame = Frame(0)
 
 def getCode() -> str:
     line: str = ' '
@@ -18,33 +40,144 @@ def getCode() -> str:
 
     return lines
 
-def getPath():
-    try: return join(getcwd(), argv[1])
-    except: return
+def getArgs() -> Namespace:
+    argParser = ArgumentParser(prog='viper')
+    argParser.add_argument('path', nargs='?')
+    argParser.add_argument('--engine', choices=['tree', 'vm', 'closure'], default='tree')
+    argParser.add_argument('--optimize', '-O', action='store_true', help='fold constant expressions and prune dead branches before running')
+    argParser.add_argument('--stats', action='store_true', help='print front-end statistics to stderr')
+    argParser.add_argument('--max-depth', type=int, default=MAXDEPTH, help='maximum Viper call depth for --engine=vm (default: %(default)s)')
+    argParser.add_argument('--packrat', action='store_true', help='memoize statement builders so the parser never re-scans a token span')
+    argParser.add_argument('--no-cache', dest='cache', action='store_false', help='always lex and parse instead of using the .vipc cache')
+    argParser.add_argument('--cache-dir', default=CACHEDIR, help='directory for cached parsed programs (default: %(default)s)')
+    argParser.add_argument('--stream', action='store_true', help='lex, parse and run the file one top-level statement at a time')
+    argParser.add_argument('--memo-size', type=int, default=MEMOSIZE, help='results kept per memoized pure function; 0 turns memoization off (default: %(default)s)')
+    argParser.add_argument('--memo', action='append', metavar='FUNC', help='always memoize FUNC, even if it is not detected as pure')
+    argParser.add_argument('--no-memo', action='append', metavar='FUNC', help='never memoize FUNC')
+    argParser.add_argument('--profile', action='store_true', help='time user functions, source lines and node types and print a report to stderr (tree engine only)')
+    argParser.add_argument('--profile-out', metavar='FILE', help='also write the per-function timings to FILE in pstats format; implies --profile')
+    argParser.add_argument('--batch', metavar='DIR', help='run every .vip file under DIR in a pool of worker processes and print a summary')
+    argParser.add_argument('--jobs', '-j', type=int, help='worker processes for --batch (default: one per CPU)')
+    argParser.add_argument('--timeout', type=float, help='seconds each --batch script may run before it is stopped')
+    argParser.add_argument('--batch-out', metavar='FILE', help='write every --batch result, including captured output, to FILE as JSON')
+    args = argParser.parse_args()
+    if (args.profile or args.profile_out) and args.engine != 'tree': argParser.error('--profile requires --engine=tree')
+    if args.batch != None and (args.path != None or args.stream or args.profile or args.profile_out): argParser.error('--batch cannot be combined with a path, --stream or --profile')
+    if args.jobs != None and args.jobs < 1: argParser.error('--jobs must be at least 1')
+    return args
+
+def getPath(args: Namespace):
+    if args.path == None: return
+    return join(getcwd(), args.path)
 
-def execute(srcCode: str):
+def execute(srcCode: str, engine: str = 'tree', optimize: bool = False, stats: bool = False, memoize: bool = False, cache: ProgramCache | None = None, maxDepth: int = MAXDEPTH, memoizer: Memoizer | None = None, profiler: Profiler | None = None) -> bool:
     srcCode = srcCode.replace('\t', '    ')
+    srcMap = SourceMap(srcCode)
+
+    key = cache.key(srcCode, optimize) if cache != None else ''
+    nodes = cache.load(key) if cache != None else None
+    if nodes == None:
+        nodes = parse(srcMap, optimize, stats, memoize)
+        if nodes == None: return False
+        if cache != None: cache.store(key, nodes)
+    if stats and cache != None: print(cache.report(), file=stderr)
+
+    success = run(nodes, srcMap, engine, maxDepth=maxDepth, memoizer=memoizer, profiler=profiler)
+    if stats and memoizer != None: print(memoizer.report(), file=stderr)
+    if profiler != None: print(profiler.finish(), file=stderr)
+    return success
 
-    lexer = Lexer(srcCode)
-    tokens = lexer.yieldTokens()
+def parse(srcMap: SourceMap, optimize: bool = False, stats: bool = False, memoize: bool = False) -> list[Node] | None:
+    tokens = Lexer(srcMap).yieldTokens()
     if isinstance(tokens, Error): print(tokens); return
 
-    parser = Parser(tokens, srcCode)
+    parser = Parser(tokens, srcMap, memoize)
     nodes = parser.parse()
+    if stats and memoize: print(f'parser: avoided {parser.rescansAvoided} rescans', file=stderr)
     if isinstance(nodes, Error): print(nodes); return
 
-    interpreter = Interpreter(nodes, srcCode)
-    interpreter.traverse()
+    if optimize:
+        optimizer = Optimizer()
+        nodes = optimizer.optimize(nodes)
+        if stats: print(optimizer.report(), file=stderr)
+    return nodes
+
+def executeStream(path: str, engine: str = 'tree', optimize: bool = False, stats: bool = False, memoize: bool = False, maxDepth: int = MAXDEPTH, memoizer: Memoizer | None = None, profiler: Profiler | None = None):
+    srcMap = FileSourceMap(path)
+    tokens = TokenStream(Lexer(srcMap).streamTokens())
+    parser = Parser(tokens, srcMap, memoize)
+    optimizer = Optimizer()
+    globals: dict[str, object] = {}
+
+    for nodes in parser.statements():
+        if isinstance(nodes, Error): print(nodes); break
+        if optimize: nodes = optimizer.optimize(nodes)
+        if not run(nodes, srcMap, engine, globals, maxDepth, memoizer, profiler): break
+
+    if stats:
+        if memoize: print(f'parser: avoided {parser.rescansAvoided} rescans', file=stderr)
+        if optimize: print(optimizer.report(), file=stderr)
+        print(f'stream: {tokens.offset + len(tokens.buffer)} tokens, peak buffer {tokens.peak} tokens', file=stderr)
+        if memoizer != None: print(memoizer.report(), file=stderr)
+    if profiler != None: print(profiler.finish(), file=stderr)
+
+def run(nodes: list[Node], srcMap: SourceMap, engine: str = 'tree', globals: dict[str, object] | None = None, maxDepth: int = MAXDEPTH, memoizer: Memoizer | None = None, profiler: Profiler | None = None) -> bool:
+    if memoizer != None: memoizer.attach(nodes)
+
+    if engine == 'vm':
+        codeObj = Compiler(nodes, srcMap).compile()
+        if isinstance(codeObj, Error): print(codeObj); return False
+
+        result = VM(codeObj, srcMap, globals, maxDepth).run()
+        if isinstance(result, Error): print(result); return False
+        return True
+
+    if engine == 'closure':
+        result = ClosureCompiler(nodes, srcMap, globals).run()
+        if isinstance(result, Error): print(result); return False
+        return True
+
+    resolver.resolve(nodes)
+    globalFrame.resize(resolver.frameSize)
+    if profiler != None:
+        interpreter = ProfilingInterpreter(nodes, srcMap, profiler, frame=globalFrame)
+        return not isinstance(profiler.profile(interpreter.traverse), Error)
+
+    interpreter = Interpreter(nodes, srcMap, frame=globalFrame)
+    return not isinstance(interpreter.traverse(), Error)
+
+def executeBatch(args: Namespace) -> bool:
+    batch = Batch(
+        join(getcwd(), args.batch), args.jobs, args.timeout,
+        engine=args.engine, optimize=args.optimize, stats=args.stats, packrat=args.packrat, cacheDir=args.cache_dir if args.cache else None,
+        maxDepth=args.max_depth, memoSize=args.memo_size, memo=args.memo, noMemo=args.no_memo,
+    )
+
+    def report(result: ScriptResult):
+        if result.status != 'ok': print(f'{result.status.upper():<8} {batch.relative(result.path)}: {result.summary()}')
+
+    batch.run(report)
+    print(batch.report())
+    if args.batch_out != None:
+        with open(args.batch_out, 'w') as outFile: dump(batch.toJSON(), outFile, indent=2)
+    return all(result.status == 'ok' for result in batch.results)
 
 if __name__ == '__main__':
-    path = getPath()
-    if path != None:
+    args = getArgs()
+    if args.batch != None: exit(0 if executeBatch(args) else 1)
+    path = getPath(args)
+    memoizer = Memoizer(args.memo_size, args.memo, args.no_memo)
+    profiler = Profiler(path or '<stdin>', args.profile_out) if args.profile or args.profile_out else None
+    if path != None and args.stream:
+        executeStream(path, args.engine, args.optimize, args.stats, args.packrat, args.max_depth, memoizer, profiler)
+    elif path != None:
         with open(path, 'r') as srcFile:
             srcCode = srcFile.read()
-        execute(srcCode)
+        cache = ProgramCache(args.cache_dir) if args.cache else None
+        execute(srcCode, args.engine, args.optimize, args.stats, args.packrat, cache, args.max_depth, memoizer, profiler)
     else:
         while True:
             srcCode = getCode()
             if srcCode == 'exit': break
 
-            execute(srcCode)
\ No newline at end of file
+            execute(srcCode, args.engine, args.optimize, args.stats, args.packrat, maxDepth=args.max_depth, memoizer=memoizer, profiler=profiler)
\ No newline at end of file
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from nodes import Node
+from purity import Purity
+
+MEMOSIZE = 256
+MISS = object()
+
+def memoKey(args: list) -> tuple:
+    return tuple([(arg.value.__class__, arg.value) for arg in args])
+
+class Memo:
+    __slots__ = ('name', 'size', 'entries', 'hits', 'misses', 'evictions')
+
+    def __init__(self, name: str, size: int = MEMOSIZE) -> None:
+        self.name = name
+        self.size = size
+        self.entries: dict[tuple, object] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: tuple):
+        entries = self.entries
+        value = entries.pop(key, MISS)
+        if value is MISS:
+            self.misses += 1
+            return MISS
+        entries[key] = value
+        self.hits += 1
+        return value
+
+    def put(self, key: tuple, value: object) -> None:
+        if self.size == 0: return
+        entries = self.entries
+        entries[key] = value
+        if len(entries) > self.size:
+            del entries[next(iter(entries))]
+            self.evictions += 1
+
+    def disable(self) -> None:
+        self.size = 0
+        self.entries.clear()
+
+    def __repr__(self) -> str:
+        return f'{self.name}: {self.hits} hits, {self.misses} misses, {self.evictions} evictions, {len(self.entries)}/{self.size} entries'
+
+class Memoizer:
+    def __init__(self, size: int = MEMOSIZE, force: list[str] | None = None, skip: list[str] | None = None) -> None:
+        self.size = size
+        self.force = set(force) if force != None else set()
+        self.skip = set(skip) if skip != None else set()
+        self.purity = Purity()
+        self.memos: list[Memo] = []
+
+    def attach(self, nodes: list[Node]) -> None:
+        pure = self.purity.analyze(nodes)
+        if self.purity.redefined:
+            for memo in self.memos: memo.entries.clear()
+
+        for name, node in self.purity.functions.items():
+            memoize = self.size > 0 and name not in self.skip and (name in self.force or name in pure) and not any(argType.endswith('[]') for argType in node.argTypes)
+            if memoize and node.memo == None:
+                node.memo = Memo(name, self.size)
+                self.memos.append(node.memo)
+            elif not memoize and node.memo != None:
+                node.memo.disable()
+                node.memo = None
+
+    def report(self) -> str:
+        if len(self.memos) == 0: return 'memo: no functions memoized'
+        return 'memo: ' + '; '.join(repr(memo) for memo in self.memos)
@@ -1,10 +1,9 @@
 from __future__ import annotations
 
-from position import Position
 from tokens import BOOLS, Token
 
 class Node:
-    def __init__(self, beginPos: Position, endPos: Position | None = None) -> None:
+    def __init__(self, beginPos: int, endPos: int | None = None) -> None:
         self.beginPos = beginPos
         if endPos == None: self.endPos = beginPos
         else: self.endPos = endPos
@@ -12,6 +11,7 @@ class Node:
 class NumberNode(Node):
     def __init__(self, num: Token) -> None:
         self.num = int(num.value) if num.value.isdigit() else float(num.value)
+        self.primitive = None
         super().__init__(num.beginPos, num.endPos)
 
     def __repr__(self) -> str:
@@ -20,6 +20,7 @@ class NumberNode(Node):
 class StringNode(Node):
     def __init__(self, string: Token) -> None:
         self.str = string.value
+        self.primitive = None
         super().__init__(string.beginPos, string.endPos)
     
     def __repr__(self) -> str:
@@ -31,7 +32,8 @@ class BoolNode(Node):
             self.bool = True
         elif bool.value in BOOLS[1]:
             self.bool = False
-        
+        self.primitive = None
+
         super().__init__(bool.beginPos, bool.endPos)
     
     def __repr__(self) -> str:
@@ -41,6 +43,8 @@ class IdentifierNode(Node):
     def __init__(self, token: Token, chainedIdentifier: IdentifierNode | None = None) -> None:
         self.identifier = token.value
         self.chainedIdentifier = chainedIdentifier
+        self.depth: int | None = None
+        self.slot: int | None = None
         super().__init__(token.beginPos, token.endPos)
     
     def __repr__(self) -> str:
@@ -135,10 +139,19 @@ class ForLoopNode(Node):
         self.condition = condition
         self.reAssign = reAssign
         self.body = body
+        self.counter: tuple | None = None
 
     def __repr__(self) -> str:
         return f'<init: {self.init} | condition: {self.condition} | reassign: {self.reAssign} | body: {self.body}>'
 
+class WhileLoopNode(Node):
+    def __init__(self, condition: Node, body: list[Node]):
+        self.condition = condition
+        self.body = body
+
+    def __repr__(self) -> str:
+        return f'<condition: {self.condition} | body: {self.body}>'
+
 class FunctionNode(Node):
     dataType = 'func'
     def __init__(self, returnType: Token, funcName: Token, args: list[tuple[IdentifierNode, IdentifierNode]], body: list[Node]):
@@ -146,6 +159,11 @@ class FunctionNode(Node):
         self.funcName = funcName
         self.args = args
         self.body = body
+        self.argTypes: tuple[str, ...] = tuple(dataType.identifier for dataType, _ in args)
+        self.slot: int | None = None
+        self.frameSize: int | None = None
+        self.framePool: list = []
+        self.memo = None
     
     def __repr__(self) -> str:
         return f'<args: {self.args} body: {self.body}>'
@@ -158,12 +176,41 @@ class ReturnNode(Node):
         return f'{self.value}'
 
 class CallableNode(Node):
-    def __init__(self, callableName: Token | IdentifierNode, params: list[Node], beginPos: Position, endPos: Position):
+    def __init__(self, callableName: Token | IdentifierNode, params: list[Node], beginPos: int, endPos: int):
         if isinstance(callableName, Token): self.callableName = IdentifierNode(callableName)
         else: self.callableName = callableName
         self.params = params
+        self.callee: FunctionNode | None = None
         # self.callableToken = callableName
         super().__init__(beginPos, endPos)
     
     def __repr__(self) -> str:
-        return f'<name: {self.callableName} | params: {self.params}>'
\ No newline at end of file
+        return f'<name: {self.callableName} | params: {self.params}>'
+
+class ArrayNode(Node):
+    def __init__(self, elements: list[Node], beginPos: int, endPos: int) -> None:
+        self.elements = elements
+        self.elementType: str | None = None
+        super().__init__(beginPos, endPos)
+
+    def __repr__(self) -> str:
+        return f'{self.elements}'
+
+class IndexNode(Node):
+    def __init__(self, target: Node, index: Node, endPos: int) -> None:
+        self.target = target
+        self.index = index
+        super().__init__(target.beginPos, endPos)
+
+    def __repr__(self) -> str:
+        return f'{self.target}[{self.index}]'
+
+class IndexAssignNode(Node):
+    def __init__(self, target: IndexNode, value: Node, assignOp: Token) -> None:
+        self.target = target
+        self.value = value
+        self.assignOp = assignOp.tokenType
+        super().__init__(target.beginPos, value.endPos)
+
+    def __repr__(self) -> str:
+        return f'<target: {self.target} | value: {self.value} | assignOp: {self.assignOp}>'
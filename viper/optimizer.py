@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+from compiler import BINOPS, COMPOPS
+from inbuilt import Bool, Number, Primitive, String
+from nodes import ArrayNode, AssignNode, BinOpNode, BoolNode, CallableNode, CompOpNode, ElseNode, ForLoopNode, FunctionNode, IfElseNode, IfNode, IndexAssignNode, IndexNode, Node, NumberNode, ReturnNode, StringNode, UnaryOpNode, WhileLoopNode
+from tokens import ArithmeticOp, Literal, LogicalOp, Token, TokenFamily
+
+MAXFOLDBITS = 4096
+MAXFOLDLENGTH = 4096
+
+class Optimizer:
+    def __init__(self) -> None:
+        self.foldedExprs = 0
+        self.prunedBranches = 0
+        self.removedNodes = 0
+
+    def optimize(self, nodes: list[Node]) -> list[Node]:
+        nodeCount = sum(countNodes(node) for node in nodes)
+        nodes = self.block(nodes)
+        self.removedNodes += nodeCount - sum(countNodes(node) for node in nodes)
+        return nodes
+
+    def report(self) -> str:
+        return f'optimizer: folded {self.foldedExprs} expressions, pruned {self.prunedBranches} branches, removed {self.removedNodes} nodes'
+
+    def block(self, nodes: list[Node]) -> list[Node]:
+        optimized: list[Node] = []
+        for node in nodes:
+            if isinstance(node, IfElseNode): optimized += self.ifElse(node)
+            else: optimized.append(self.statement(node))
+        return optimized
+
+    def statement(self, node: Node) -> Node:
+        match node:
+            case AssignNode():
+                node.value = self.expression(node.value)
+            case IndexAssignNode():
+                node.target = self.expression(node.target) # type: ignore
+                node.value = self.expression(node.value)
+            case ForLoopNode():
+                node.init = self.statement(node.init) # type: ignore
+                node.condition = self.expression(node.condition)
+                node.reAssign = self.statement(node.reAssign) # type: ignore
+                node.body = self.block(node.body)
+            case WhileLoopNode():
+                node.condition = self.expression(node.condition)
+                node.body = self.block(node.body)
+            case FunctionNode():
+                node.body = self.block(node.body)
+            case ReturnNode():
+                if node.value != None: node.value = self.expression(node.value)
+            case _:
+                return self.expression(node)
+        return node
+
+    def expression(self, node: Node) -> Node:
+        match node:
+            case BinOpNode() | CompOpNode():
+                node.leftElem = self.expression(node.leftElem)
+                node.rightElem = self.expression(node.rightElem)
+                left = constant(node.leftElem)
+                right = constant(node.rightElem)
+                if left is None or right is None: return node
+                if unbounded(node.operator.tokenType, left, right): return node
+
+                try:
+                    if node.operator.tokenType == LogicalOp.AND: value = left and right
+                    elif node.operator.tokenType == LogicalOp.OR: value = left or right
+                    elif isinstance(node, CompOpNode): value = COMPOPS[node.operator.tokenType](left, right)
+                    else: value = BINOPS[node.operator.tokenType](left, right)
+                except Exception: return node
+                if oversized(value): return node
+                return self.fold(node, value)
+            case UnaryOpNode():
+                node.elem = self.expression(node.elem)
+                elem = constant(node.elem)
+                if elem is None: return node
+
+                try:
+                    if node.operator.tokenType == LogicalOp.NOT: value = elem.__not__()
+                    else: value = -elem
+                except Exception: return node
+                return self.fold(node, value)
+            case CallableNode():
+                node.params = [self.expression(param) for param in node.params]
+            case ArrayNode():
+                node.elements = [self.expression(element) for element in node.elements]
+            case IndexNode():
+                node.target = self.expression(node.target)
+                node.index = self.expression(node.index)
+        return node
+
+    def ifElse(self, node: IfElseNode) -> list[Node]:
+        ifNodes = [node.ifNode] + node.elifNodes
+        branches: list[IfNode] = []
+        elseNode = node.elseNode
+
+        for idx, ifNode in enumerate(ifNodes):
+            ifNode.condition = self.expression(ifNode.condition)
+            condition = constant(ifNode.condition)
+            if condition is None:
+                ifNode.body = self.block(ifNode.body)
+                branches.append(ifNode)
+            elif condition:
+                self.prunedBranches += len(ifNodes) - idx - 1 + (elseNode != None)
+                elseNode = ElseNode(self.block(ifNode.body))
+                break
+            else:
+                self.prunedBranches += 1
+        else:
+            if elseNode != None: elseNode.body = self.block(elseNode.body)
+
+        if len(branches) == 0:
+            return elseNode.body if elseNode != None else []
+
+        node.ifNode = branches[0]
+        node.elifNodes = branches[1:]
+        node.elseNode = elseNode
+        return [node]
+
+    def fold(self, node: Node, value: Primitive) -> Node:
+        literal: Node
+        if isinstance(value, Bool):
+            literal = BoolNode(Token(TokenFamily.LITERAL, Literal.BOOL, 'true' if value.value else 'false', node.beginPos, node.endPos))
+        elif isinstance(value, Number):
+            literal = NumberNode(Token(TokenFamily.LITERAL, Literal.NUM, '0', node.beginPos, node.endPos))
+            literal.num = value.value # type: ignore
+        elif isinstance(value, String):
+            literal = StringNode(Token(TokenFamily.LITERAL, Literal.STRING, value.value, node.beginPos, node.endPos))
+        else:
+            return node
+
+        literal.primitive = value # type: ignore
+        self.foldedExprs += 1
+        return literal
+
+def constant(node: Node) -> Primitive | None:
+    match node:
+        case NumberNode():
+            return node.primitive if node.primitive != None else Number(node)
+        case StringNode():
+            return node.primitive if node.primitive != None else String(node)
+        case BoolNode():
+            return node.primitive if node.primitive != None else Bool(node)
+    return None
+
+def unbounded(operator: object, left: Primitive, right: Primitive) -> bool:
+    leftVal, rightVal = left.value, right.value
+    if operator == ArithmeticOp.DOUBLESTAR and isinstance(leftVal, int) and isinstance(rightVal, int):
+        return abs(rightVal) * abs(leftVal).bit_length() > MAXFOLDBITS
+    if operator == ArithmeticOp.STAR and isinstance(leftVal, str) != isinstance(rightVal, str):
+        text, count = (leftVal, rightVal) if isinstance(leftVal, str) else (rightVal, leftVal)
+        return isinstance(count, int) and len(text) * count > MAXFOLDLENGTH # type: ignore
+    return False
+
+def oversized(value: object) -> bool:
+    value = getattr(value, 'value', None)
+    if isinstance(value, int): return value.bit_length() > MAXFOLDBITS
+    if isinstance(value, str): return len(value) > MAXFOLDLENGTH
+    return False
+
+def countNodes(node: Node | None) -> int:
+    match node:
+        case None:
+            return 0
+        case BinOpNode() | CompOpNode():
+            return 1 + countNodes(node.leftElem) + countNodes(node.rightElem)
+        case UnaryOpNode():
+            return 1 + countNodes(node.elem)
+        case ArrayNode():
+            return 1 + sum(countNodes(element) for element in node.elements)
+        case IndexNode():
+            return 1 + countNodes(node.target) + countNodes(node.index)
+        case IndexAssignNode():
+            return 1 + countNodes(node.target) + countNodes(node.value)
+        case AssignNode():
+            return 1 + countNodes(node.value)
+        case CallableNode():
+            return 1 + sum(countNodes(param) for param in node.params)
+        case ReturnNode():
+            return 1 + countNodes(node.value)
+        case IfNode():
+            return 1 + countNodes(node.condition) + sum(countNodes(stmt) for stmt in node.body)
+        case ElseNode():
+            return 1 + sum(countNodes(stmt) for stmt in node.body)
+        case IfElseNode():
+            return 1 + sum(countNodes(ifNode) for ifNode in [node.ifNode] + node.elifNodes) + countNodes(node.elseNode)
+        case ForLoopNode():
+            return 1 + countNodes(node.init) + countNodes(node.condition) + countNodes(node.reAssign) + sum(countNodes(stmt) for stmt in node.body)
+        case WhileLoopNode():
+            return 1 + countNodes(node.condition) + sum(countNodes(stmt) for stmt in node.body)
+        case FunctionNode():
+            return 1 + sum(countNodes(stmt) for stmt in node.body)
+    return 1
@@ -1,24 +1,49 @@
 from types import MethodType
-from errors import Error, InvalidSyntaxError, MissingTokenError, UnexpectedTokenError
-from nodes import AssignNode, BinOpNode, BoolNode, CallableNode, CompOpNode, ElseNode, ForLoopNode, FunctionNode, IdentifierNode, IfElseNode, IfNode, Node, NumberNode, ReturnNode, StringNode, UnaryOpNode
-from position import Position
-from tokens import ArithmeticOp, CompOp, Keyword, Literal, LogicalOp, Punctuator, Separator, Token, TokenFamily
+from typing import Iterator
+from errors import Error, InvalidSyntaxError, MissingExprError, MissingTokenError, UnexpectedTokenError
+from nodes import ArrayNode, AssignNode, BinOpNode, BoolNode, CallableNode, CompOpNode, ElseNode, ForLoopNode, FunctionNode, IdentifierNode, IfElseNode, IfNode, IndexAssignNode, IndexNode, Node, NumberNode, ReturnNode, StringNode, UnaryOpNode, WhileLoopNode
+from position import SourceMap
+from tokens import OPERATORS, ArithmeticOp, CompOp, Keyword, Literal, LogicalOp, Punctuator, Separator, Token, TokenFamily, TokenStream
+
+# --------x--------x--------x--------
+# $ Binding powers
+PRECEDENCE: list[tuple[ArithmeticOp | CompOp | LogicalOp, ...]] = [
+    (LogicalOp.OR,),
+    (LogicalOp.AND,),
+    tuple(CompOp),
+    (ArithmeticOp.PLUS, ArithmeticOp.MINUS),
+    (ArithmeticOp.STAR, ArithmeticOp.SLASH),
+    (ArithmeticOp.DOUBLESTAR,),
+]
+RIGHTASSOC = (ArithmeticOp.DOUBLESTAR,)
+
+BINDINGPOWERS: dict[object, tuple[int, int]] = {}
+for operatorType in OPERATORS.values():
+    for level, operatorTypes in enumerate(PRECEDENCE):
+        if operatorType not in operatorTypes: continue
+        leftBP = 2 * level + 2
+        BINDINGPOWERS[operatorType] = (leftBP, leftBP - 1 if operatorType in RIGHTASSOC else leftBP + 1)
+
+PREFIXBP = 2 * len(PRECEDENCE) + 2
+# --------x--------x--------x--------
 
 class Parser:
-    def __init__(self, tokens: list[Token], srcCode: str) -> None:
-        self.tokens = tokens
-        self.srcCode = srcCode.split('\n')
+    def __init__(self, tokens: list[Token] | TokenStream, srcCode: str | SourceMap, memoize: bool = False) -> None:
+        self.tokens = TokenStream.of(tokens)
+        self.srcMap = SourceMap.of(srcCode)
         self.idx = 0
-        self.currentTok = self.tokens[self.idx] if len(self.tokens) > self.idx else self.tokens[-1]
+        self.currentTok = self.tokens[self.idx]
+        self.memo: dict[tuple[str, int], tuple[object, int]] | None = {} if memoize else None
+        self.rescansAvoided = 0
     
     def advance(self, n: int = 1):
         self.idx += n
-        self.currentTok = self.tokens[self.idx] if len(self.tokens) > self.idx else self.tokens[-1]
+        self.currentTok = self.tokens[self.idx]
         return self.currentTok
     
     def revert(self, n: int = 1):
         self.idx -= n
-        self.currentTok = self.tokens[self.idx] if len(self.tokens) > self.idx else self.tokens[-1]
+        self.currentTok = self.tokens[self.idx]
         return self.currentTok
 
     def parse(self, n: int | None = None):
@@ -34,12 +59,38 @@ class Parser:
                 node = self.buildNodes()
                 if isinstance(node, Error): return node
                 stmts += node
+                if self.memo != None: self.memo.clear()
         
         return stmts
+
+    def statements(self) -> Iterator[list[Node] | Error]:
+        tokens = self.tokens
+        while self.currentTok.tokenType != Punctuator.EOF:
+            nodes = self.buildNodes()
+            if tokens.error != None: yield tokens.error; return
+            if isinstance(nodes, Error): yield nodes; return
+            tokens.release(self.idx)
+            if self.memo != None: self.memo.clear()
+            yield nodes
+        if tokens.error != None: yield tokens.error
     
+    def memoized(self, builder: MethodType):
+        if self.memo == None: return builder()
+
+        key = (builder.__name__, self.idx)
+        entry = self.memo.get(key)
+        if entry != None:
+            self.rescansAvoided += 1
+            self.advance(entry[1] - self.idx)
+            return entry[0]
+
+        result = builder()
+        self.memo[key] = (result, self.idx)
+        return result
+
     def buildNodes(self) -> list[Node] | Error:
         nodes: list[Node] | Error = []
-        builders: list[MethodType] = [self.ifElseNode, self.functionNode, self.returnNode, self.forLoopNode, self.callableNode, self.assignmentNode, self.reassignmentNode] # type: ignore
+        builders: list[MethodType] = [self.ifElseNode, self.functionNode, self.returnNode, self.forLoopNode, self.whileLoopNode, self.callableNode, self.assignmentNode, self.reassignmentNode] # type: ignore
 
         for builder in builders:
             node = self.buildNodeFromNodeBuilder(builder, nodes)
@@ -50,10 +101,10 @@ class Parser:
             self.advance()
             return nodes
 
-        return UnexpectedTokenError(f"'{self.currentTok.value}'", self.errorLine(self.currentTok.beginPos), self.currentTok.beginPos, self.currentTok.endPos)
+        return UnexpectedTokenError(f"'{self.currentTok.value}'", self.srcMap, self.currentTok.beginPos, self.currentTok.endPos)
 
     def buildNodeFromNodeBuilder(self, nodeBuilder: MethodType, nodes: list[Node]):
-        node = nodeBuilder()
+        node = self.memoized(nodeBuilder)
         if isinstance(node, Error): return node
         if node != None:
             nodes.append(node)
@@ -77,39 +128,44 @@ class Parser:
     #     elif currentToken.familyType == TokenFamily.IDENTIFIER and firstNextToken.familyType == TokenFamily.ASSIGNOP:
     #         dataType = None
     #     elif currentToken.familyType == TokenFamily.LITERAL:
-    #         return InvalidSyntaxError("Invalid identifier: Literal", self.errorLine(currentToken.beginPos), currentToken.beginPos, currentToken.endPos)
+    #         return InvalidSyntaxError("Invalid identifier: Literal", self.srcMap, currentToken.beginPos, currentToken.endPos)
     #     elif firstNextToken.familyType == TokenFamily.LITERAL:
-    #         return InvalidSyntaxError("Invalid identifier: Literal", self.errorLine(firstNextToken.beginPos), firstNextToken.beginPos, firstNextToken.endPos)
+    #         return InvalidSyntaxError("Invalid identifier: Literal", self.srcMap, firstNextToken.beginPos, firstNextToken.endPos)
     #     else: return
 
     #     identifier = self.currentTok
     #     assignOp = self.advance()
     #     self.advance()
-    #     value = self.logicalExpr()
+    #     value = self.expression()
     #     if isinstance(value, Error): return value
 
     #     return AssignNode(identifier, value, assignOp, dataType)
 
     def assignmentNode(self):
-        dataType = self.currentTok
+        beginIdx = self.idx
+        dataType = self.typeName()
         varName = self.advance()
         assignOp = self.advance()
 
         if not(dataType.familyType == TokenFamily.IDENTIFIER and varName.familyType == TokenFamily.IDENTIFIER and assignOp.familyType == TokenFamily.ASSIGNOP):
-            self.revert(2)
+            self.revert(self.idx - beginIdx)
             return
 
         if self.advance().familyType == TokenFamily.KEYWORD:
-            return InvalidSyntaxError(f'Expected {dataType.value}', self.errorLine(self.currentTok.beginPos), assignOp.beginPos.advance())
-        value = self.logicalExpr()
+            return InvalidSyntaxError(f'Expected {dataType.value}', self.srcMap, assignOp.beginPos + 1)
+        value = self.expression()
         if isinstance(value, Error): return value
+        if isinstance(value, ArrayNode) and dataType.value.endswith('[]'): value.elementType = dataType.value[:-2]
 
         return AssignNode(varName, value, assignOp, dataType)
     
     def reassignmentNode(self):
         beginIdx = self.idx
-        varName = self.dotChain()
+        varName = self.memoized(self.dotChain)
         if varName == None: return varName
+        if self.currentTok.tokenType == Separator.LSQB:
+            varName = self.subscript(varName)
+            if isinstance(varName, Error): self.revert(self.idx - beginIdx); return
         assignOp = self.currentTok
         endIdx = self.idx
 
@@ -119,10 +175,11 @@ class Parser:
         
         if self.advance().familyType == TokenFamily.KEYWORD:
             # TODO come up with a better error msg if possible
-            return InvalidSyntaxError(f'', self.errorLine(self.currentTok.beginPos), assignOp.beginPos.advance())
-        value = self.logicalExpr()
+            return InvalidSyntaxError(f'', self.srcMap, assignOp.beginPos + 1)
+        value = self.expression()
         if isinstance(value, Error): return value
 
+        if isinstance(varName, IndexNode): return IndexAssignNode(varName, value, assignOp)
         return AssignNode(varName, value, assignOp)
 
     def ifElseNode(self):
@@ -131,7 +188,7 @@ class Parser:
 
         self.advance()
 
-        ifCondition = self.logicalExpr()
+        ifCondition = self.expression()
         if isinstance(ifCondition, Error): return ifCondition
         ifBody = self.body()
         if isinstance(ifBody, Error): return ifBody
@@ -141,13 +198,12 @@ class Parser:
         elifNodes: list[IfNode] = []
         while self.currentTok.tokenType == Keyword.ELIF: # type: ignore
             self.advance()
-            elifCondition = self.logicalExpr()
+            elifCondition = self.expression()
             if isinstance(elifCondition, Error): return elifCondition
             elifBody = self.body()
             if isinstance(elifBody, Error): return elifBody
 
-            ifNode = IfNode(elifCondition, elifBody)
-            elifNodes.append(ifNode)
+            elifNodes.append(IfNode(elifCondition, elifBody))
 
         elseNode: ElseNode | None = None
         if self.currentTok.tokenType == Keyword.ELSE: # type: ignore
@@ -161,16 +217,14 @@ class Parser:
         return ifElseNode
 
     def functionNode(self):
-        currentToken = self.currentTok
-        firstNextToken = self.advance()
-        secondNextToken = self.advance()
-        self.revert(2)
+        beginIdx = self.idx
+        returnType = self.typeName()
+        funcName = self.advance()
 
-        if not (currentToken.familyType == TokenFamily.IDENTIFIER and firstNextToken.familyType == TokenFamily.IDENTIFIER and secondNextToken.tokenType == Separator.LPAR):
+        if not (returnType.familyType == TokenFamily.IDENTIFIER and funcName.familyType == TokenFamily.IDENTIFIER and self.tokens[self.idx + 1].tokenType == Separator.LPAR):
+            self.revert(self.idx - beginIdx)
             return
-        
-        returnType = self.currentTok
-        funcName = self.advance()
+
         self.advance()
         formalParameters = self.formalParameters()
         if isinstance(formalParameters, Error): return formalParameters
@@ -185,8 +239,8 @@ class Parser:
 
         self.advance()
         returnVal = None
-        if self.currentTok.familyType == TokenFamily.IDENTIFIER or self.currentTok.familyType == TokenFamily.LITERAL:
-            returnVal = self.logicalExpr()
+        if self.currentTok.familyType == TokenFamily.IDENTIFIER or self.currentTok.familyType == TokenFamily.LITERAL or self.currentTok.tokenType == Separator.LSQB:
+            returnVal = self.expression()
             if isinstance(returnVal, Error): return returnVal
         return ReturnNode(returnVal)
     
@@ -196,19 +250,20 @@ class Parser:
         self.advance(2)
         assignOp = self.assignmentNode()
         if assignOp == None:
-            return InvalidSyntaxError('Expected assignment operation', self.errorLine(self.currentTok.beginPos), self.currentTok.beginPos)
+            return InvalidSyntaxError('Expected assignment operation', self.srcMap, self.currentTok.beginPos)
         if isinstance(assignOp, Error): return assignOp
 
         if self.currentTok.tokenType == Punctuator.SEMI: self.advance()
 
-        condition = self.logicalExpr()
+        condition = self.expression()
         if isinstance(condition, Error): return condition
 
         if self.currentTok.tokenType == Punctuator.SEMI: self.advance()
 
-        reAssignOp = self.assignmentNode()
+        reAssignOp = self.reassignmentNode()
+        if reAssignOp == None: reAssignOp = self.assignmentNode()
         if reAssignOp == None:
-            return InvalidSyntaxError('Expected reassignment operation', self.errorLine(self.currentTok.beginPos), self.currentTok.beginPos)
+            return InvalidSyntaxError('Expected reassignment operation', self.srcMap, self.currentTok.beginPos)
         if isinstance(reAssignOp, Error): return reAssignOp
         self.advance()
 
@@ -217,9 +272,21 @@ class Parser:
 
         return ForLoopNode(assignOp, condition, reAssignOp, body)
 
+    def whileLoopNode(self):
+        if self.currentTok.tokenType != Keyword.WHILE: return
+
+        self.advance()
+        condition = self.expression()
+        if isinstance(condition, Error): return condition
+
+        body = self.body()
+        if isinstance(body, Error): return body
+
+        return WhileLoopNode(condition, body)
+
     def callableNode(self):
         beginIdx = self.idx
-        callableName = self.dotChain()
+        callableName = self.memoized(self.dotChain)
         if callableName == None: return
         nextToken = self.currentTok
         endIdx = self.idx
@@ -239,15 +306,15 @@ class Parser:
 
         formalParameters: list[tuple[IdentifierNode, IdentifierNode]] = []
         while self.currentTok.tokenType != Separator.RPAR:
-            datatype = self.currentTok
-            if datatype.tokenType == Punctuator.EOF: return MissingTokenError('MissingParanError', "')'", self.errorLine(datatype.beginPos), datatype.beginPos)
+            datatype = self.typeName()
+            if datatype.tokenType == Punctuator.EOF: return MissingTokenError('MissingParanError', "')'", self.srcMap, datatype.beginPos)
 
             identifier = self.advance()
 
             if datatype.familyType != TokenFamily.IDENTIFIER:
-                return InvalidSyntaxError(f'Invalid identifier: {datatype.familyType.name.title()}', self.errorLine(datatype.beginPos), datatype.beginPos, datatype.endPos)
+                return InvalidSyntaxError(f'Invalid identifier: {datatype.familyType.name.title()}', self.srcMap, datatype.beginPos, datatype.endPos)
             if identifier.familyType != TokenFamily.IDENTIFIER:
-                return InvalidSyntaxError(f'Invalid identifier: {identifier.familyType.name.title()}', self.errorLine(identifier.beginPos), identifier.beginPos, identifier.endPos)
+                return InvalidSyntaxError(f'Invalid identifier: {identifier.familyType.name.title()}', self.srcMap, identifier.beginPos, identifier.endPos)
 
             datatype = IdentifierNode(datatype)
             identifier = IdentifierNode(identifier)
@@ -259,14 +326,13 @@ class Parser:
         self.advance()
         return formalParameters
     
-    def actualParameters(self) -> Error | tuple[list[Node], Position]:
+    def actualParameters(self) -> Error | tuple[list[Node], int]:
         self.advance()
 
         actualParameters: list[Node] = []
         while self.currentTok.tokenType != Separator.RPAR:
-            if self.currentTok.tokenType == Punctuator.EOF: return MissingTokenError('MissingParanError', "')'", self.errorLine(self.currentTok.beginPos), self.currentTok.beginPos)
-            param = self.callableNode()
-            if param == None: param = self.logicalExpr()
+            if self.currentTok.tokenType == Punctuator.EOF: return MissingTokenError('MissingParanError', "')'", self.srcMap, self.currentTok.beginPos)
+            param = self.expression()
             if isinstance(param, Error): return param
             actualParameters.append(param)
             if self.currentTok.tokenType == Separator.COMMA: self.advance()
@@ -275,106 +341,85 @@ class Parser:
         self.advance()
         return actualParameters, endPos
 
-    def term(self) -> Node | Error:
-        if self.currentTok.familyType == TokenFamily.LITERAL:
-            literal: Node
-            if self.currentTok.tokenType == Literal.NUM:
-                literal = NumberNode(self.currentTok)
-                self.advance()
-                return literal
-            if self.currentTok.tokenType == Literal.STRING:
-                literal = StringNode(self.currentTok)
-                self.advance()
-                return literal
-            if self.currentTok.tokenType == Literal.BOOL:
-                literal = BoolNode(self.currentTok)
-                self.advance()
-                return literal
+    def expression(self, minBP: int = 0) -> Node | Error:
+        left = self.prefix()
+        if isinstance(left, Error): return left
 
-        if self.currentTok.tokenType == ArithmeticOp.MINUS:
+        while True:
             operator = self.currentTok
-            self.advance()
-            elem = self.term()
-            if isinstance(elem, Error): return elem
-            return UnaryOpNode(operator, elem)
+            bindingPower = BINDINGPOWERS.get(operator.tokenType)
+            if bindingPower == None or bindingPower[0] <= minBP: return left
 
-        if self.currentTok.tokenType == LogicalOp.NOT:
-            operator = self.currentTok
             self.advance()
-            elem = self.term()
-            if isinstance(elem, Error): return elem
-            return UnaryOpNode(operator, elem)
+            right = self.expression(bindingPower[1])
+            if isinstance(right, Error): return right
 
-        if self.currentTok.tokenType == Separator.LPAR:
-            self.advance()
-            expr = self.logicalExpr()
-            if self.currentTok.tokenType != Separator.RPAR: return MissingTokenError('MissingParanError', "')'", self.errorLine(expr.beginPos), self.currentTok.beginPos) # type: ignore
-            self.advance()
-            return expr
-
-        if self.currentTok.familyType == TokenFamily.IDENTIFIER:
-            identifier = self.callableNode()
-            if isinstance(identifier, Error): return identifier
-            if identifier == None:
-                identifier = self.dotChain()
-                if identifier != None:
-                    return identifier
-                else:
-                    identifier = self.currentTok
-                    self.advance()
-                    return IdentifierNode(identifier)
-            return identifier
-        return NumberNode(self.tokens[-1])
-
-    def factor(self):
-        leftTerm = self.term()
-        if isinstance(leftTerm, Error): return leftTerm
-
-        if self.currentTok.tokenType in (ArithmeticOp.STAR, ArithmeticOp.SLASH, ArithmeticOp.DOUBLESTAR):
-            operator = self.currentTok
-            self.advance()
-            rightTerm: BinOpNode | NumberNode = self.factor()
-            return BinOpNode(leftTerm, operator, rightTerm)
+            if operator.familyType == TokenFamily.COMPOP: left = CompOpNode(left, operator, right)
+            else: left = BinOpNode(left, operator, right)
 
-        return leftTerm
-    
-    def mathExpr(self):
-        leftFactor = self.factor()
-        if isinstance(leftFactor, Error): return leftFactor
+    def prefix(self) -> Node | Error:
+        token = self.currentTok
 
-        if self.currentTok.tokenType in (ArithmeticOp.PLUS, ArithmeticOp.MINUS):
-            operator = self.currentTok
+        if token.familyType == TokenFamily.LITERAL:
             self.advance()
-            rightFactor: BinOpNode | NumberNode = self.mathExpr()
-            return BinOpNode(leftFactor, operator, rightFactor)
+            if token.tokenType == Literal.NUM: return NumberNode(token)
+            if token.tokenType == Literal.STRING: return StringNode(token)
+            return BoolNode(token)
 
-        return leftFactor
+        if token.tokenType in (ArithmeticOp.MINUS, LogicalOp.NOT):
+            self.advance()
+            elem = self.expression(PREFIXBP)
+            if isinstance(elem, Error): return elem
+            return UnaryOpNode(token, elem)
 
-    def compExpr(self):
-        leftExpr = self.mathExpr()
-        if isinstance(leftExpr, Error): return leftExpr
+        if token.tokenType == Separator.LPAR:
+            self.advance()
+            expr = self.expression()
+            if isinstance(expr, Error): return expr
+            if self.currentTok.tokenType != Separator.RPAR: return MissingTokenError('MissingParanError', "')'", self.srcMap, self.currentTok.beginPos)
+            self.advance()
+            return self.subscript(expr)
 
-        if self.currentTok.tokenType in CompOp:
-            operator = self.currentTok
+        if token.tokenType == Separator.LSQB:
+            self.advance()
+            elements: list[Node] = []
+            while self.currentTok.tokenType != Separator.RSQB:
+                if self.currentTok.tokenType == Punctuator.EOF: return MissingTokenError('MissingBracketError', "']'", self.srcMap, self.currentTok.beginPos)
+                element = self.expression()
+                if isinstance(element, Error): return element
+                elements.append(element)
+                if self.currentTok.tokenType == Separator.COMMA: self.advance()
+
+            endPos = self.currentTok.endPos
             self.advance()
-            rightExpr: Node | Error = self.compExpr()
-            if isinstance(rightExpr, Error): return rightExpr
-            return CompOpNode(leftExpr, operator, rightExpr)
+            return self.subscript(ArrayNode(elements, token.beginPos, endPos))
 
-        return leftExpr
+        if token.familyType == TokenFamily.IDENTIFIER:
+            identifier = self.memoized(self.dotChain)
+            if self.currentTok.tokenType != Separator.LPAR: return self.subscript(identifier) # type: ignore
 
-    def logicalExpr(self):
-        leftExpr = self.compExpr()
-        if isinstance(leftExpr, Error): return leftExpr
+            actualParams = self.actualParameters()
+            if isinstance(actualParams, Error): return actualParams
+            return self.subscript(CallableNode(identifier, actualParams[0], identifier.beginPos, actualParams[1])) # type: ignore
 
-        if self.currentTok.tokenType in (LogicalOp.AND, LogicalOp.OR):
-            operator = self.currentTok
-            self.advance()
-            rightExpr: Node | Error = self.logicalExpr()
-            if isinstance(rightExpr, Error): return rightExpr
-            return BinOpNode(leftExpr, operator, rightExpr)
+        return MissingExprError(f"'{token.value}'", self.srcMap, token.beginPos, token.endPos)
 
-        return leftExpr
+    def subscript(self, target: Node) -> Node | Error:
+        while self.currentTok.tokenType == Separator.LSQB:
+            self.advance()
+            index = self.expression()
+            if isinstance(index, Error): return index
+            if self.currentTok.tokenType != Separator.RSQB: return MissingTokenError('MissingBracketError', "']'", self.srcMap, self.currentTok.beginPos)
+            target = IndexNode(target, index, self.currentTok.endPos)
+            self.advance()
+        return target
+
+    def typeName(self) -> Token:
+        token = self.currentTok
+        if token.familyType == TokenFamily.IDENTIFIER and self.tokens[self.idx + 1].tokenType == Separator.LSQB and self.tokens[self.idx + 2].tokenType == Separator.RSQB:
+            closing = self.advance(2)
+            return Token(token.familyType, token.tokenType, token.value + '[]', token.beginPos, closing.endPos)
+        return token
     
     def dotChain(self):
         chainMembers: list[Token] = []
@@ -387,11 +432,9 @@ class Parser:
             else: break
         if len(chainMembers) == 0: return
 
-        def buildChain(i: int = 0) -> IdentifierNode | None:
-            try: return IdentifierNode(chainMembers[i], buildChain(i + 1))
-            except: return
-
-        return buildChain()
+        chain: IdentifierNode | None = None
+        for member in reversed(chainMembers): chain = IdentifierNode(member, chain)
+        return chain
 
     def body(self) -> Error | list[Node]:
         if self.currentTok.tokenType != Separator.LBRACE:
@@ -400,27 +443,12 @@ class Parser:
             body = nodes
             return body
         elif self.currentTok.tokenType == Separator.LBRACE:
-            bodyBegin = self.idx
-            lBraceCount = 0
-            rBraceCount = 0
-            while True:
-                if self.currentTok.tokenType == Separator.LBRACE:
-                    lBraceCount += 1
-                elif self.currentTok.tokenType == Separator.RBRACE: # type: ignore
-                    rBraceCount += 1
-                elif self.currentTok.tokenType == Punctuator.EOF: # type: ignore
-                    bodyEnd = self.idx
-                    MISSINGPARANOFFSET = 1
-                    self.revert(bodyEnd - bodyBegin - MISSINGPARANOFFSET)
-                    return MissingTokenError('MissingBraceError', "'}'", self.errorLine(self.currentTok.beginPos), self.currentTok.beginPos)
-                if lBraceCount == rBraceCount: break
-                self.advance()
-            bodyEnd = self.idx
-            self.revert(bodyEnd - bodyBegin)
-
+            bodyEnd = self.tokens.matchingBrace(self.idx)
             self.advance()
-            body: list[Node] = []
+            if bodyEnd == None:
+                return MissingTokenError('MissingBraceError', "'}'", self.srcMap, self.currentTok.beginPos)
 
+            body: list[Node] = []
             while bodyEnd > self.idx:
                 nodes = self.buildNodes()
                 if isinstance(nodes, Error): return nodes
@@ -430,6 +458,3 @@ class Parser:
             return body
         return self.parse()
         
-
-    def errorLine(self, pos: Position):
-        return self.srcCode[pos.lineNo]
\ No newline at end of file
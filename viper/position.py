@@ -1,37 +1,115 @@
 from __future__ import annotations
 
-class Position:
-    def __init__(self, idx: int = 0, lineNo: int = 0, columnNo: int = 0) -> None:
-        self.idx: int = idx
-        self.lineNo: int = lineNo
-        self.columnNo: int = columnNo
-
-    def advance(self, currentChar: str | None = None):
-        self.columnNo += 1
-        self.idx += 1
-        if currentChar == "\n":
-            self.lineNo += 1
-            self.columnNo = 0
-
-        return self
-
-    def revert(self) -> None:
-        self.idx -= 1
-        self.columnNo -= 1
-        if self.columnNo < 0:
-            self.lineNo -= 1
-            self.columnNo = 0
-    
+from bisect import bisect_right
+from typing import Iterator
+
+CHUNKSIZE = 1 << 16
+
+def readChunks(path: str, chunkSize: int = CHUNKSIZE) -> Iterator[str]:
+    with open(path, 'r') as srcFile:
+        while True:
+            chunk = srcFile.read(chunkSize)
+            if chunk == '': return
+            yield chunk.replace('\t', '    ')
+
+class SourceMap:
+    def __init__(self, srcCode: str) -> None:
+        self.srcCode = srcCode
+        self.starts: list[int] | None = None
+
+    @staticmethod
+    def of(src: str | SourceMap) -> SourceMap:
+        return src if isinstance(src, SourceMap) else SourceMap(src)
+
+    def lineStarts(self) -> list[int]:
+        if self.starts == None:
+            starts = [0]
+            srcCode = self.srcCode
+            idx = srcCode.find('\n')
+            while idx != -1:
+                starts.append(idx + 1)
+                idx = srcCode.find('\n', idx + 1)
+            self.starts = starts
+        return self.starts
+
+    def lineNo(self, idx: int) -> int:
+        return bisect_right(self.lineStarts(), idx) - 1
+
+    def columnNo(self, idx: int) -> int:
+        return idx - self.lineStarts()[self.lineNo(idx)]
+
+    def line(self, lineNo: int) -> str:
+        lineStarts = self.lineStarts()
+        if lineNo + 1 < len(lineStarts): return self.srcCode[lineStarts[lineNo] : lineStarts[lineNo + 1] - 1]
+        return self.srcCode[lineStarts[lineNo]:]
+
+    def lineAt(self, idx: int) -> str:
+        return self.line(self.lineNo(idx))
+
+    def chunks(self) -> Iterator[str]:
+        yield self.srcCode
+
+    def __repr__(self) -> str:
+        return f'<source {len(self.srcCode)} chars>'
+
+class FileSourceMap(SourceMap):
+    def __init__(self, path: str, chunkSize: int = CHUNKSIZE) -> None:
+        super().__init__('')
+        self.path = path
+        self.chunkSize = chunkSize
+        self.located: tuple[int, int, int] = (-1, 0, 0)
+
+    def locate(self, idx: int) -> tuple[int, int]:
+        if self.located[0] == idx: return self.located[1:]
+
+        lineNo = 0
+        lineStart = 0
+        base = 0
+        for chunk in self.chunks():
+            end = min(len(chunk), idx - base)
+            lineNo += chunk.count('\n', 0, end)
+            newline = chunk.rfind('\n', 0, end)
+            if newline != -1: lineStart = base + newline + 1
+            base += len(chunk)
+            if base >= idx: break
+
+        self.located = (idx, lineNo, lineStart)
+        return lineNo, lineStart
+
+    def lineNo(self, idx: int) -> int:
+        return self.locate(idx)[0]
+
+    def columnNo(self, idx: int) -> int:
+        return idx - self.locate(idx)[1]
+
+    def line(self, lineNo: int) -> str:
+        parts: list[str] = []
+        for chunk in self.chunks():
+            lines = chunk.split('\n')
+            if lineNo < len(lines) - 1:
+                parts.append(lines[lineNo])
+                break
+            if lineNo == len(lines) - 1: parts.append(lines[-1])
+            lineNo -= len(lines) - 1
+        return ''.join(parts)
+
+    def lineAt(self, idx: int) -> str:
+        lineStart = self.locate(idx)[1]
+        parts: list[str] = []
+        base = 0
+        for chunk in self.chunks():
+            if base + len(chunk) > lineStart:
+                begin = max(lineStart - base, 0)
+                end = chunk.find('\n', begin)
+                if end != -1:
+                    parts.append(chunk[begin:end])
+                    break
+                parts.append(chunk[begin:])
+            base += len(chunk)
+        return ''.join(parts)
+
+    def chunks(self) -> Iterator[str]:
+        return readChunks(self.path, self.chunkSize)
+
     def __repr__(self) -> str:
-        return f'lineNo: {self.lineNo}, columnNo: {self.columnNo}'
-
-    @property
-    def lineNoInFile(self) -> int:
-        return self.lineNo + 1
-
-    @property
-    def columnNoInFile(self) -> int:
-        return self.columnNo + 1
-    
-    def copy(self) -> Position:
-        return Position(self.idx, self.lineNo, self.columnNo)
\ No newline at end of file
+        return f'<source {self.path}>'
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+from marshal import dump
+from time import perf_counter
+from typing import Callable
+
+from interpreter import Interpreter
+from nodes import ForLoopNode, FunctionNode, IfElseNode, Node, ReturnNode, WhileLoopNode
+from position import SourceMap
+from resolver import Frame
+from symbolTable import SymbolTable
+
+REPORTSIZE = 20
+
+class Stat:
+    __slots__ = ('calls', 'primitiveCalls', 'selfTime', 'cumTime', 'active', 'callers')
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.primitiveCalls = 0
+        self.selfTime = 0.0
+        self.cumTime = 0.0
+        self.active = 0
+        self.callers: dict[tuple, list] = {}
+
+    def exit(self, elapsed: float, selfTime: float) -> None:
+        self.calls += 1
+        self.selfTime += selfTime
+        self.active -= 1
+        if self.active == 0: self.cumTime += elapsed
+
+class Profiler:
+    def __init__(self, path: str = '<viper>', outPath: str | None = None) -> None:
+        self.path = path
+        self.outPath = outPath
+        self.srcMap: SourceMap | None = None
+        self.module = (path, 0, '<module>')
+        self.nodeStats: dict[str, Stat] = {}
+        self.lineStats: dict[int, Stat] = {}
+        self.positions: dict[Node, Stat] = {}
+        self.functionStats: dict[tuple, Stat] = {self.module: Stat()}
+        self.functionKeys: dict[FunctionNode, tuple] = {}
+        self.nodeTimes: list[float] = [0.0]
+        self.calls: list[list] = [[self.module, 0.0]]
+
+    def bind(self, srcMap: SourceMap) -> None:
+        if srcMap is self.srcMap: return
+        self.srcMap = srcMap
+        self.positions.clear()
+
+    def lineStat(self, node: Node) -> Stat:
+        pos = beginPos(node)
+        lineNo = self.srcMap.lineNo(pos) if pos != None else -1 # type: ignore
+        stat = self.lineStats.get(lineNo)
+        if stat is None: stat = self.lineStats[lineNo] = Stat()
+        self.positions[node] = stat
+        return stat
+
+    def functionKey(self, func: FunctionNode) -> tuple:
+        key = (self.path, self.srcMap.lineNo(func.returnType.beginPos) + 1, func.funcName.value) # type: ignore
+        self.functionKeys[func] = key
+        if key not in self.functionStats: self.functionStats[key] = Stat()
+        return key
+
+    def profile(self, run: Callable):
+        stat = self.functionStats[self.module]
+        stat.active += 1
+        start = perf_counter()
+        try: return run()
+        finally:
+            elapsed = perf_counter() - start
+            stat.primitiveCalls += 1
+            stat.exit(elapsed, elapsed - self.calls[0][1])
+            self.calls[0][1] = 0.0
+
+    def stats(self) -> dict:
+        return {
+            key: (stat.primitiveCalls, stat.calls, stat.selfTime, stat.cumTime, {caller: tuple(edge) for caller, edge in stat.callers.items()})
+            for key, stat in self.functionStats.items()
+        }
+
+    def report(self, size: int = REPORTSIZE) -> str:
+        lines = [f'profile: {self.functionStats[self.module].cumTime:.6f}s total']
+
+        lines.append(f"{'calls':>10} {'self':>10} {'cumulative':>12}  function")
+        functions = sorted(self.functionStats.items(), key=lambda item: item[1].cumTime, reverse=True)
+        for (_, lineNo, name), stat in functions[:size]:
+            calls = f'{stat.calls}' if stat.calls == stat.primitiveCalls else f'{stat.calls}/{stat.primitiveCalls}'
+            lines.append(f'{calls:>10} {stat.selfTime:>10.6f} {stat.cumTime:>12.6f}  {name}' + (f' (line {lineNo})' if lineNo else ''))
+
+        lines.append(f"{'evals':>10} {'self':>10} {'cumulative':>12}  line")
+        for lineNo, stat in sorted(self.lineStats.items(), key=lambda item: item[1].selfTime, reverse=True)[:size]:
+            source = f'{lineNo + 1}: ' + self.srcMap.line(lineNo).strip()[:60] if self.srcMap != None and lineNo >= 0 else '?'
+            lines.append(f'{stat.calls:>10} {stat.selfTime:>10.6f} {stat.cumTime:>12.6f}  {source}')
+
+        lines.append(f"{'count':>10} {'self':>10} {'cumulative':>12}  node")
+        for name, stat in sorted(self.nodeStats.items(), key=lambda item: item[1].selfTime, reverse=True)[:size]:
+            lines.append(f'{stat.calls:>10} {stat.selfTime:>10.6f} {stat.cumTime:>12.6f}  {name}')
+        return '\n'.join(lines)
+
+    def finish(self) -> str:
+        if self.outPath != None:
+            with open(self.outPath, 'wb') as outFile: dump(self.stats(), outFile)
+        return self.report()
+
+def beginPos(node: Node | None) -> int | None:
+    match node:
+        case IfElseNode():
+            return beginPos(node.ifNode.condition)
+        case ForLoopNode():
+            return beginPos(node.init)
+        case WhileLoopNode():
+            return beginPos(node.condition)
+        case FunctionNode():
+            return node.returnType.beginPos
+        case ReturnNode():
+            return beginPos(node.value)
+    return getattr(node, 'beginPos', None)
+
+class ProfilingInterpreter(Interpreter):
+    def __init__(self, nodes: list[Node], srcCode: str | SourceMap, profiler: Profiler, symbolTable: SymbolTable = SymbolTable(), frame: Frame | None = None) -> None:
+        super().__init__(nodes, srcCode, symbolTable, frame)
+        self.profiler = profiler
+        profiler.bind(self.srcMap)
+
+    def handleNode(self, node: Node):
+        profiler = self.profiler
+        nodeName = node.__class__.__name__
+        nodeStat = profiler.nodeStats.get(nodeName)
+        if nodeStat is None: nodeStat = profiler.nodeStats[nodeName] = Stat()
+        lineStat = profiler.positions.get(node)
+        if lineStat is None: lineStat = profiler.lineStat(node)
+
+        nodeTimes = profiler.nodeTimes
+        nodeStat.active += 1
+        lineStat.active += 1
+        nodeTimes.append(0.0)
+        start = perf_counter()
+        try: return getattr(self, 'handle' + nodeName)(node)
+        finally:
+            elapsed = perf_counter() - start
+            selfTime = elapsed - nodeTimes.pop()
+            nodeTimes[-1] += elapsed
+            nodeStat.exit(elapsed, selfTime)
+            lineStat.exit(elapsed, selfTime)
+
+    def invoke(self, func: FunctionNode, frame: Frame, key: tuple | None):
+        return self.measure(func, Interpreter.invoke, self, func, frame, key)
+
+    def memoHit(self, func: FunctionNode, slots: list, returnVal: object):
+        return self.measure(func, Interpreter.memoHit, self, func, slots, returnVal)
+
+    def measure(self, func: FunctionNode, run: Callable, *runArgs):
+        profiler = self.profiler
+        funcKey = profiler.functionKeys.get(func)
+        if funcKey is None: funcKey = profiler.functionKey(func)
+        stat = profiler.functionStats[funcKey]
+        calls = profiler.calls
+        callerKey = calls[-1][0]
+        edge = stat.callers.get(callerKey)
+        if edge is None: edge = stat.callers[callerKey] = [0, 0, 0.0, 0.0]
+
+        primitive = stat.active == 0
+        stat.active += 1
+        calls.append([funcKey, 0.0])
+        start = perf_counter()
+        try: return run(*runArgs)
+        finally:
+            elapsed = perf_counter() - start
+            selfTime = elapsed - calls.pop()[1]
+            calls[-1][1] += elapsed
+            stat.exit(elapsed, selfTime)
+            edge[0] += 1
+            edge[2] += selfTime
+            if primitive:
+                stat.primitiveCalls += 1
+                edge[1] += 1
+                edge[3] += elapsed
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import sys
+from contextlib import redirect_stdout
+from io import StringIO
+from time import perf_counter
+from typing import Iterable
+
+from closureCompiler import ClosureCompiler, Stmt
+from compiler import CodeObject, Compiler
+from errors import Error
+from inbuilt import Array, Primitive, makePrimitive
+from interpreter import Interpreter
+from lexer import Lexer
+from memo import MEMOSIZE, Memoizer
+from nodes import Node
+from optimizer import Optimizer
+from parser import Parser
+from position import SourceMap
+from resolver import Frame, Resolver
+from symbolTable import SymbolTable
+from tokens import Identifier
+from vm import MAXDEPTH, VM
+
+ENGINES = ('tree', 'vm', 'closure')
+
+class Result:
+    __slots__ = ('value', 'error', 'output', 'globals', 'elapsed')
+
+    def __init__(self, value: object, error: Error | None, output: str, globals: dict[str, object], elapsed: float) -> None:
+        self.value = value
+        self.error = error
+        self.output = output
+        self.globals = globals
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self) -> str:
+        if self.error != None: return f'<error {self.error.errorName}: {self.error.details} | {self.elapsed:.6f}s>'
+        return f'<ok {self.value!r} | {self.elapsed:.6f}s>'
+
+class Program:
+    def __init__(self, nodes: list[Node], srcMap: SourceMap, engine: str = 'tree', maxDepth: int = MAXDEPTH) -> None:
+        self.nodes = nodes
+        self.srcMap = srcMap
+        self.engine = engine
+        self.maxDepth = maxDepth
+        self.code: CodeObject | Stmt | Error | None = None
+        self.closures: ClosureCompiler | None = None
+        self.globals: dict[str, object] = {}
+        self.builtins: dict[str, object] = {}
+        self.names: dict[str, int] = {}
+        self.frameSize = 0
+
+    def prepare(self) -> Error | None:
+        if self.engine == 'vm':
+            self.code = Compiler(self.nodes, self.srcMap).compile()
+        elif self.engine == 'closure':
+            self.closures = ClosureCompiler(self.nodes, self.srcMap, self.globals)
+            self.builtins = dict(self.globals)
+            self.code = self.closures.compile()
+        else:
+            resolver = Resolver()
+            resolver.resolve(self.nodes)
+            self.names = dict(resolver.scopes[0])
+            self.frameSize = resolver.frameSize
+        if isinstance(self.code, Error): return self.code
+
+    def run(self, inputs: Iterable[object] | None = None, globals: dict[str, object] | None = None) -> Result:
+        values = {name: toViper(value) for name, value in (globals or {}).items()}
+        output = StringIO()
+        stdin = sys.stdin
+        sys.stdin = StringIO(''.join(f'{value}\n' for value in inputs or ()))
+        start = perf_counter()
+        try:
+            with redirect_stdout(output): returnVal, variables = self.execute(values)
+        finally:
+            sys.stdin = stdin
+        elapsed = perf_counter() - start
+
+        variables = {name: toPython(value) for name, value in variables.items() if isinstance(value, (Primitive, Array))}
+        if isinstance(returnVal, Error): return Result(None, returnVal, output.getvalue(), variables, elapsed)
+        return Result(toPython(returnVal), None, output.getvalue(), variables, elapsed)
+
+    def execute(self, values: dict[str, object]) -> tuple[object, dict[str, object]]:
+        if self.engine == 'vm':
+            return VM(self.code, self.srcMap, values, self.maxDepth).run(), values # type: ignore
+
+        if self.engine == 'closure':
+            self.globals.clear()
+            self.globals.update(self.builtins)
+            self.globals.update(values)
+            return self.closures.execute(self.code), dict(self.globals) # type: ignore
+
+        frame = Frame(self.frameSize)
+        symbolTable = SymbolTable({name: (Identifier.VARIABLE, value) for name, value in values.items()}, SymbolTable())
+        returnVal = Interpreter(self.nodes, self.srcMap, symbolTable, frame).evaluate()
+        variables = {name: frame.slots[slot] for name, slot in self.names.items()}
+        variables.update({name: value for name, (_, value) in symbolTable.symbols.items()})
+        if returnVal.__class__ is tuple: returnVal = returnVal[0]
+        return returnVal, variables
+
+def compile(srcCode: str, engine: str = 'tree', optimize: bool = False, memoSize: int = MEMOSIZE, maxDepth: int = MAXDEPTH) -> Program | Error:
+    if engine not in ENGINES: raise ValueError(f'unknown engine: {engine!r}')
+    srcMap = SourceMap(srcCode.replace('\t', '    '))
+    tokens = Lexer(srcMap).yieldTokens()
+    if isinstance(tokens, Error): return tokens
+    nodes = Parser(tokens, srcMap).parse()
+    if isinstance(nodes, Error): return nodes
+    if optimize: nodes = Optimizer().optimize(nodes)
+    Memoizer(memoSize).attach(nodes)
+
+    program = Program(nodes, srcMap, engine, maxDepth)
+    error = program.prepare()
+    return error if error != None else program
+
+def toViper(value: object) -> Primitive | Array:
+    if isinstance(value, (Primitive, Array)): return value
+    if isinstance(value, (list, tuple)): return Array.of(None, [toViper(elem) for elem in value])
+    return makePrimitive(value) # type: ignore
+
+def toPython(value: object) -> object:
+    if isinstance(value, Array): return list(value.values())
+    if isinstance(value, Primitive): return value.value
+    return value
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from nodes import AssignNode, BinOpNode, BoolNode, CallableNode, CompOpNode, ForLoopNode, FunctionNode, IdentifierNode, IfElseNode, IndexNode, Node, NumberNode, ReturnNode, StringNode, UnaryOpNode, WhileLoopNode
+from resolver import declaredNames
+
+PUREBUILTINS = ['sum', 'len', 'min', 'max', 'mean']
+
+class Purity:
+    def __init__(self) -> None:
+        self.functions: dict[str, FunctionNode] = {}
+        self.calls: dict[str, set[str] | None] = {}
+        self.pure: set[str] = set()
+        self.redefined = False
+
+    def analyze(self, nodes: list[Node]) -> set[str]:
+        self.redefined = False
+        for node in nodes:
+            if not isinstance(node, FunctionNode): continue
+            name = node.funcName.value
+            if name in self.functions and self.functions[name] is not node: self.redefined = True
+            self.functions[name] = node
+            self.calls[name] = calledNames(node)
+
+        pure = {name for name, calls in self.calls.items() if calls != None}
+        changed = True
+        while changed:
+            changed = False
+            for name in list(pure):
+                if all(callee in pure or (callee in PUREBUILTINS and callee not in self.functions) for callee in self.calls[name]): continue # type: ignore
+                pure.discard(name)
+                changed = True
+
+        self.pure = pure
+        return pure
+
+def calledNames(func: FunctionNode) -> set[str] | None:
+    if any(argType.endswith('[]') for argType in func.argTypes): return None
+    localNames = {varName.identifier for _, varName in func.args}
+    localNames.update(declaredNames(func.body))
+    calls: set[str] = set()
+    for node in func.body:
+        if not isPure(node, localNames, calls): return None
+    return calls
+
+def isPure(node: Node | None, localNames: set[str], calls: set[str]) -> bool:
+    match node:
+        case None | NumberNode() | StringNode() | BoolNode():
+            return True
+        case IdentifierNode():
+            return node.chainedIdentifier == None and node.identifier in localNames
+        case AssignNode():
+            return node.varName.identifier in localNames and isPure(node.value, localNames, calls)
+        case BinOpNode() | CompOpNode():
+            return isPure(node.leftElem, localNames, calls) and isPure(node.rightElem, localNames, calls)
+        case UnaryOpNode():
+            return isPure(node.elem, localNames, calls)
+        case IndexNode():
+            return isPure(node.target, localNames, calls) and isPure(node.index, localNames, calls)
+        case CallableNode():
+            callableName = node.callableName
+            if callableName.chainedIdentifier != None:
+                if callableName.identifier not in localNames: return False
+            elif callableName.identifier in localNames: return False
+            else: calls.add(callableName.identifier)
+            return all(isPure(param, localNames, calls) for param in node.params)
+        case IfElseNode():
+            for ifNode in [node.ifNode] + node.elifNodes:
+                if not isPure(ifNode.condition, localNames, calls): return False
+                if not all(isPure(stmt, localNames, calls) for stmt in ifNode.body): return False
+            return node.elseNode == None or all(isPure(stmt, localNames, calls) for stmt in node.elseNode.body)
+        case ForLoopNode():
+            return all(isPure(stmt, localNames, calls) for stmt in [node.init, node.condition, node.reAssign] + node.body)
+        case WhileLoopNode():
+            return all(isPure(stmt, localNames, calls) for stmt in [node.condition] + node.body)
+        case ReturnNode():
+            return isPure(node.value, localNames, calls)
+        case _:
+            return False
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+from operator import ge, gt, le, lt
+
+from nodes import ArrayNode, AssignNode, BinOpNode, CallableNode, CompOpNode, ForLoopNode, FunctionNode, IdentifierNode, IfElseNode, IndexAssignNode, IndexNode, Node, NumberNode, ReturnNode, UnaryOpNode, WhileLoopNode
+from tokens import ArithmeticOp, AssignOp, CompOp
+
+COUNTEROPS = {CompOp.LESS: lt, CompOp.LESSEQUAL: le, CompOp.GREATER: gt, CompOp.GREATEREQUAL: ge}
+
+class Frame:
+    __slots__ = ('slots', 'parent')
+
+    def __init__(self, size: int, parent: Frame | None = None) -> None:
+        self.slots: list = [None] * size
+        self.parent = parent
+
+    def ancestor(self, depth: int) -> Frame:
+        frame = self
+        for _ in range(depth): frame = frame.parent # type: ignore
+        return frame
+
+    def get(self, depth: int, slot: int):
+        if depth == 0: return self.slots[slot]
+        if depth == 1: return self.parent.slots[slot] # type: ignore
+        return self.ancestor(depth).slots[slot]
+
+    def set(self, depth: int, slot: int, value: object) -> None:
+        if depth == 0: self.slots[slot] = value
+        else: self.ancestor(depth).slots[slot] = value
+
+    def resize(self, size: int) -> None:
+        if size > len(self.slots): self.slots += [None] * (size - len(self.slots))
+
+    def __repr__(self) -> str:
+        return f'{self.slots}'
+
+class Resolver:
+    def __init__(self) -> None:
+        self.scopes: list[dict[str, int]] = [{}]
+
+    @property
+    def frameSize(self) -> int:
+        return len(self.scopes[0])
+
+    def resolve(self, nodes: list[Node]) -> list[Node]:
+        self.declare(declaredNames(nodes))
+        self.block(nodes)
+        return nodes
+
+    def declare(self, identifiers: list[str]) -> None:
+        scope = self.scopes[-1]
+        for identifier in identifiers: scope.setdefault(identifier, len(scope))
+
+    def bind(self, node: IdentifierNode) -> None:
+        for depth, scope in enumerate(reversed(self.scopes)):
+            if node.identifier in scope:
+                node.depth = depth
+                node.slot = scope[node.identifier]
+                return
+
+    def block(self, nodes: list[Node]) -> None:
+        for node in nodes: self.visit(node)
+
+    def visit(self, node: Node | None) -> None:
+        match node:
+            case IdentifierNode():
+                self.bind(node)
+            case AssignNode():
+                self.visit(node.value)
+                self.bind(node.varName)
+            case BinOpNode() | CompOpNode():
+                self.visit(node.leftElem)
+                self.visit(node.rightElem)
+            case UnaryOpNode():
+                self.visit(node.elem)
+            case ArrayNode():
+                self.block(node.elements)
+            case IndexNode():
+                self.visit(node.target)
+                self.visit(node.index)
+            case IndexAssignNode():
+                self.visit(node.value)
+                self.visit(node.target)
+            case CallableNode():
+                self.bind(node.callableName)
+                self.block(node.params)
+            case IfElseNode():
+                for ifNode in [node.ifNode] + node.elifNodes:
+                    self.visit(ifNode.condition)
+                    self.block(ifNode.body)
+                if node.elseNode != None: self.block(node.elseNode.body)
+            case ForLoopNode():
+                self.block([node.init, node.condition, node.reAssign] + node.body)
+            case WhileLoopNode():
+                self.visit(node.condition)
+                self.block(node.body)
+            case ReturnNode():
+                self.visit(node.value)
+            case FunctionNode():
+                node.slot = self.scopes[-1][node.funcName.value]
+                self.scopes.append({})
+                self.declare([varName.identifier for _, varName in node.args])
+                self.declare(declaredNames(node.body))
+                self.block(node.body)
+                node.frameSize = len(self.scopes.pop())
+            case _:
+                pass
+
+def declaredNames(nodes: list[Node]) -> list[str]:
+    names: list[str] = []
+    for node in nodes:
+        match node:
+            case AssignNode(dataType=dataType) if dataType != None:
+                names.append(node.varName.identifier)
+            case FunctionNode():
+                names.append(node.funcName.value)
+            case IfElseNode():
+                for ifNode in [node.ifNode] + node.elifNodes: names += declaredNames(ifNode.body)
+                if node.elseNode != None: names += declaredNames(node.elseNode.body)
+            case ForLoopNode():
+                names += declaredNames([node.init, node.reAssign] + node.body)
+            case WhileLoopNode():
+                names += declaredNames(node.body)
+            case _:
+                pass
+    return names
+
+def countedLoop(node: ForLoopNode) -> tuple:
+    init, condition, reAssign = node.init, node.condition, node.reAssign
+    identifier = init.varName.identifier
+    if init.dataType == None or init.dataType.value != 'num': return ()
+    if not (isinstance(condition, CompOpNode) and condition.operator.tokenType in COUNTEROPS and isCounter(condition.leftElem, identifier)): return ()
+    bound = condition.rightElem
+    if not (isinstance(bound, NumberNode) or (isinstance(bound, IdentifierNode) and bound.chainedIdentifier == None and bound.identifier != identifier)): return ()
+    if not isCounter(reAssign.varName, identifier) or (reAssign.dataType != None and reAssign.dataType.value != 'num'): return ()
+
+    step: int | float | None = None
+    match reAssign:
+        case AssignNode(assignOp=AssignOp.PLUSEQUAL, value=NumberNode(), dataType=None):
+            step = reAssign.value.num # type: ignore
+        case AssignNode(assignOp=AssignOp.MINUSEQUAL, value=NumberNode(), dataType=None):
+            step = -reAssign.value.num # type: ignore
+        case AssignNode(assignOp=AssignOp.EQUAL, value=BinOpNode(rightElem=NumberNode())) if isCounter(reAssign.value.leftElem, identifier): # type: ignore
+            operator = reAssign.value.operator.tokenType # type: ignore
+            if operator == ArithmeticOp.PLUS: step = reAssign.value.rightElem.num # type: ignore
+            elif operator == ArithmeticOp.MINUS: step = -reAssign.value.rightElem.num # type: ignore
+    if step == None: return ()
+
+    return COUNTEROPS[condition.operator.tokenType], step, any(observes(stmt, identifier) for stmt in node.body)
+
+def isCounter(node: Node, identifier: str) -> bool:
+    return isinstance(node, IdentifierNode) and node.chainedIdentifier == None and node.identifier == identifier
+
+def observes(node: Node | None, identifier: str) -> bool:
+    match node:
+        case IdentifierNode():
+            return node.identifier == identifier
+        case CallableNode() | FunctionNode():
+            return True
+        case AssignNode():
+            return node.varName.identifier == identifier or observes(node.value, identifier)
+        case BinOpNode() | CompOpNode():
+            return observes(node.leftElem, identifier) or observes(node.rightElem, identifier)
+        case UnaryOpNode():
+            return observes(node.elem, identifier)
+        case ArrayNode():
+            return any(observes(element, identifier) for element in node.elements)
+        case IndexNode():
+            return observes(node.target, identifier) or observes(node.index, identifier)
+        case IndexAssignNode():
+            return observes(node.target, identifier) or observes(node.value, identifier)
+        case IfElseNode():
+            stmts = [stmt for ifNode in [node.ifNode] + node.elifNodes for stmt in [ifNode.condition] + ifNode.body]
+            if node.elseNode != None: stmts += node.elseNode.body
+            return any(observes(stmt, identifier) for stmt in stmts)
+        case ForLoopNode():
+            return any(observes(stmt, identifier) for stmt in [node.init, node.condition, node.reAssign] + node.body)
+        case WhileLoopNode():
+            return any(observes(stmt, identifier) for stmt in [node.condition] + node.body)
+        case ReturnNode():
+            return observes(node.value, identifier)
+    return False
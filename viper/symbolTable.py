@@ -8,8 +8,15 @@ symbols: dict[str, tuple[Identifier | None, FunctionNode | Primitive | None]] =
     'num': (Identifier.DATATYPE, None),
     'bool': (Identifier.DATATYPE, None),
     'String': (Identifier.DATATYPE, None),
+    'num[]': (Identifier.DATATYPE, None),
+    'bool[]': (Identifier.DATATYPE, None),
+    'String[]': (Identifier.DATATYPE, None),
     'print': (Identifier.INBUILTFUNC, None),
     'sum': (Identifier.INBUILTFUNC, None),
+    'len': (Identifier.INBUILTFUNC, None),
+    'min': (Identifier.INBUILTFUNC, None),
+    'max': (Identifier.INBUILTFUNC, None),
+    'mean': (Identifier.INBUILTFUNC, None),
     'inputExpr': (Identifier.INBUILTFUNC, None),
     'inputNum': (Identifier.INBUILTFUNC, None),
 }
@@ -27,11 +34,12 @@ class SymbolTable:
         self.symbols[identifier] = (dataType, value)
 
     def get(self, identifier: str) -> Primitive | FunctionNode | None:
-        if identifier in self.symbols:
-            return self.symbols[identifier][1]
-        else:
-            if self.parentSymbols != None: return self.parentSymbols.get(identifier)
-            else: raise KeyError
+        symbolTable: SymbolTable | None = self
+        while symbolTable != None:
+            entry = symbolTable.symbols.get(identifier)
+            if entry != None: return entry[1]
+            symbolTable = symbolTable.parentSymbols
+        raise KeyError(identifier)
 
     def __contains__(self, identifier: 'str'):
         if identifier in self.symbols: return True
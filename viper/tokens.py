@@ -1,7 +1,11 @@
+from __future__ import annotations
+
 from enum import Enum
 from string import ascii_letters
+from typing import Iterable
+
+from errors import Error
 
-from position import Position
 
 # --------x--------x--------x--------
 # $ Constants
@@ -152,8 +156,8 @@ class Token:
         familyType: TokenFamily,
         tokenType: Literal | ArithmeticOp | CompOp | AssignOp | LogicalOp | Keyword | Punctuator | Separator | TokenFamily,
         value: str,
-        beginPos: Position,
-        endPos: Position | None = None,
+        beginPos: int,
+        endPos: int | None = None,
     ) -> None:
         self.familyType = familyType
         self.tokenType = tokenType
@@ -163,4 +167,65 @@ class Token:
         else: self.endPos = endPos
     
     def __repr__(self) -> str:
-        return f'{self.value}'
\ No newline at end of file
+        return f'{self.value}'
+
+class TokenStream:
+    def __init__(self, tokens: Iterable[Token | Error]) -> None:
+        self.source = iter(tokens)
+        self.buffer: list[Token] = []
+        self.offset = 0
+        self.eof: Token | None = None
+        self.error: Error | None = None
+        self.peak = 0
+        self.braces: dict[int, int] = {}
+        self.openBraces: list[int] = []
+
+    @staticmethod
+    def of(tokens: list[Token] | TokenStream) -> TokenStream:
+        if isinstance(tokens, TokenStream): return tokens
+        stream = TokenStream(())
+        stream.buffer = tokens
+        stream.eof = tokens[-1]
+        stream.peak = len(tokens)
+        for idx, token in enumerate(tokens): stream.track(token, idx)
+        return stream
+
+    def __getitem__(self, idx: int) -> Token:
+        idx -= self.offset
+        buffer = self.buffer
+        while idx >= len(buffer):
+            if self.eof != None: return self.eof
+            self.fill()
+        return buffer[idx]
+
+    def fill(self) -> None:
+        token = next(self.source, None)
+        if isinstance(token, Error):
+            self.error = token
+            token = Token(TokenFamily.PUNCTUATOR, Punctuator.EOF, 'EOF', token.beginPos)
+        elif token == None:
+            token = Token(TokenFamily.PUNCTUATOR, Punctuator.EOF, 'EOF', self.buffer[-1].endPos + 1 if len(self.buffer) else 0)
+
+        self.buffer.append(token)
+        self.track(token, self.offset + len(self.buffer) - 1)
+        if token.tokenType == Punctuator.EOF: self.eof = token
+        if len(self.buffer) > self.peak: self.peak = len(self.buffer)
+
+    def track(self, token: Token, idx: int) -> None:
+        if token.tokenType == Separator.LBRACE: self.openBraces.append(idx)
+        elif token.tokenType == Separator.RBRACE and len(self.openBraces): self.braces[self.openBraces.pop()] = idx
+
+    def matchingBrace(self, idx: int) -> int | None:
+        braces = self.braces
+        while idx not in braces:
+            if self.eof != None: return None
+            self.fill()
+        return braces[idx]
+
+    def release(self, idx: int) -> None:
+        del self.buffer[:idx - self.offset]
+        self.offset = idx
+        if len(self.braces): self.braces = {openIdx: closeIdx for openIdx, closeIdx in self.braces.items() if openIdx >= idx}
+
+    def __repr__(self) -> str:
+        return f'<tokens {self.offset}..{self.offset + len(self.buffer)}>'
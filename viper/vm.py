@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+from compiler import BINARY, BUILD_ARRAY, CALL, CALL_METHOD, CHECK_TYPE, COMPARE, DECLARE_GLOBAL, DECLARE_LOCAL, JUMP, JUMP_IF_FALSE, JUMP_IF_FALSE_OR_CLEAR, JUMP_IF_TRUE_OR_CLEAR, LOAD_CONST, LOAD_GLOBAL, LOAD_INDEX, LOAD_LOCAL, LOGICAL, MAKE_FUNCTION, POP, RETURN, STORE_GLOBAL, STORE_INDEX, STORE_LOCAL, TAIL_CALL, UNARY_NEG, UNARY_NOT, CodeObject
+from errors import Error, InvalidAssignmentError, InvalidIndexError, InvalidTypeError, UndefinedNameError
+from inbuilt import INBUILTTYPES, Array, InbuiltFunctions, Primitive
+from memo import MISS, memoKey
+from nodes import BinOpNode, CallableNode, CompOpNode, IndexAssignNode, Node
+from position import SourceMap
+
+class FunctionObject:
+    dataType = 'func'
+    def __init__(self, codeObj: CodeObject) -> None:
+        self.codeObj = codeObj
+
+    def __repr__(self) -> str:
+        return f'<function {self.codeObj.name}>'
+
+class Builtin:
+    dataType = 'func'
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.func = getattr(InbuiltFunctions, name)
+
+    def __repr__(self) -> str:
+        return f'<inbuilt {self.name}>'
+
+BUILTINS: list[str] = ['print', 'sum', 'len', 'min', 'max', 'mean', 'inputExpr', 'inputNum']
+MAXDEPTH = 100000
+MAXPENDING = 4096
+
+class VM:
+    def __init__(self, codeObj: CodeObject, srcCode: str | SourceMap, globals: dict[str, object] | None = None, maxDepth: int = MAXDEPTH) -> None:
+        self.codeObj = codeObj
+        self.srcMap = SourceMap.of(srcCode)
+        self.globals: dict[str, object] = globals if globals != None else {}
+        for name in BUILTINS: self.globals.setdefault(name, Builtin(name))
+        self.maxDepth = maxDepth
+
+    def run(self):
+        return self.execute(self.codeObj, [None] * self.codeObj.nLocals)
+
+    def execute(self, codeObj: CodeObject, fastLocals: list):
+        code = codeObj.code
+        consts = codeObj.consts
+        names = codeObj.names
+        globals = self.globals
+        stack: list = []
+        push = stack.append
+        pop = stack.pop
+        pc = 0
+        base = 0
+        maxDepth = self.maxDepth
+        frames: list[tuple] = []
+        memoFrames: list[tuple] = []
+
+        while True:
+            op = code[pc]
+            arg = code[pc + 1]
+            pc += 2
+
+            if op == LOAD_LOCAL:
+                value = fastLocals[arg]
+                if value is None: return self.undefinedName(codeObj, pc, codeObj.localNames[arg])
+                push(value)
+            elif op == LOAD_CONST:
+                push(consts[arg])
+            elif op == LOAD_GLOBAL:
+                try: push(globals[names[arg]])
+                except KeyError: return self.undefinedName(codeObj, pc, names[arg])
+            elif op == BINARY:
+                right = pop()
+                left = pop()
+                try: push(arg(left, right))
+                except Exception: return self.unsupportedOperands(codeObj, pc, left, right)
+            elif op == COMPARE:
+                right = pop()
+                left = pop()
+                try: push(arg(left, right))
+                except Exception: return self.unsupportedOperands(codeObj, pc, left, right)
+            elif op == JUMP_IF_FALSE:
+                if not truthy(pop()): pc = arg
+            elif op == CALL or op == TAIL_CALL:
+                func = stack[-arg - 1]
+                if isinstance(func, FunctionObject):
+                    funcCode = func.codeObj
+                    calleeLocals = stack[-arg:] if arg else []
+                    del stack[-arg - 1:]
+                    for value, expectedType in zip(calleeLocals, funcCode.argTypes):
+                        if getattr(value, 'dataType', None) != expectedType: return self.argTypeError(codeObj, pc, funcCode, calleeLocals)
+                    if arg > len(funcCode.argTypes): del calleeLocals[len(funcCode.argTypes):]
+                    memo = funcCode.memo
+                    if memo is not None:
+                        key = memoKey(calleeLocals)
+                        result = memo.get(key)
+                        if result is not MISS: push(result); continue
+                    calleeLocals += [None] * (funcCode.nLocals - len(calleeLocals))
+
+                    if op == CALL:
+                        if len(frames) >= maxDepth: return self.recursionError(codeObj, pc)
+                        frames.append((codeObj, code, consts, names, pc, fastLocals, base))
+                        base = len(stack)
+                    else: del stack[base:]
+                    if memo is not None and (op == CALL or len(memoFrames) < MAXPENDING): memoFrames.append((len(frames), memo, key))
+                    codeObj = funcCode
+                    code = funcCode.code
+                    consts = funcCode.consts
+                    names = funcCode.names
+                    fastLocals = calleeLocals
+                    pc = 0
+                    continue
+
+                args = stack[-arg:] if arg else []
+                del stack[-arg - 1:]
+                result = self.call(codeObj, pc, func, args)
+                if isinstance(result, Error): return result
+                push(result)
+            elif op == RETURN:
+                if len(frames) == 0: return pop()
+                result = pop()
+                while memoFrames and memoFrames[-1][0] == len(frames):
+                    _, memo, key = memoFrames.pop()
+                    memo.put(key, result)
+                del stack[base:]
+                codeObj, code, consts, names, pc, fastLocals, base = frames.pop()
+                push(result)
+            elif op == JUMP:
+                pc = arg
+            elif op == CHECK_TYPE:
+                value = stack[-1]
+                if arg not in INBUILTTYPES:
+                    node = codeObj.nodes[pc - 1]
+                    return UndefinedNameError(f"Type {arg} is not defined", self.srcMap, node.dataType.beginPos, node.dataType.endPos) # type: ignore
+                if getattr(value, 'dataType', None) != arg:
+                    node = codeObj.nodes[pc - 1]
+                    return InvalidAssignmentError(f"Type {getattr(value, 'dataType', None)} can't be assigned to declared type {arg}", self.srcMap, node.beginPos, node.endPos) # type: ignore
+            elif op == DECLARE_LOCAL:
+                fastLocals[arg] = pop()
+            elif op == DECLARE_GLOBAL:
+                globals[names[arg]] = pop()
+            elif op == STORE_LOCAL:
+                slot, augOp = arg
+                value = pop()
+                currentVal = fastLocals[slot]
+                if currentVal is None: return self.undefinedName(codeObj, pc, codeObj.localNames[slot])
+                result = self.reassign(codeObj, pc, currentVal, value, augOp)
+                if isinstance(result, Error): return result
+                fastLocals[slot] = result
+            elif op == STORE_GLOBAL:
+                nameIdx, augOp = arg
+                value = pop()
+                currentVal = globals.get(names[nameIdx])
+                if currentVal is None: return self.undefinedName(codeObj, pc, names[nameIdx])
+                result = self.reassign(codeObj, pc, currentVal, value, augOp)
+                if isinstance(result, Error): return result
+                globals[names[nameIdx]] = result
+            elif op == POP:
+                pop()
+            elif op == UNARY_NEG:
+                value = pop()
+                try: push(-value)
+                except Exception: return self.unsupportedOperand(codeObj, pc, value)
+            elif op == UNARY_NOT:
+                value = pop()
+                try: push(value.__not__())
+                except Exception: return self.unsupportedOperand(codeObj, pc, value)
+            elif op == JUMP_IF_FALSE_OR_CLEAR:
+                value = stack[-1]
+                if value.__class__ is Array: continue
+                if not truthy(value): pc = arg
+                else: stack[-1] = None
+            elif op == JUMP_IF_TRUE_OR_CLEAR:
+                value = stack[-1]
+                if value.__class__ is Array: continue
+                if truthy(value): pc = arg
+                else: stack[-1] = None
+            elif op == LOGICAL:
+                right = pop()
+                left = stack[-1]
+                if left is None: stack[-1] = right
+                else:
+                    try: stack[-1] = arg(left, right)
+                    except Exception: return self.unsupportedOperands(codeObj, pc, left, right)
+            elif op == CALL_METHOD:
+                methodName, nArgs = arg
+                if nArgs: args = stack[-nArgs:]; del stack[-nArgs:]
+                else: args = []
+                result = self.callMethod(codeObj, pc, pop(), methodName, args)
+                if isinstance(result, Error): return result
+                push(result)
+            elif op == LOAD_INDEX:
+                index = pop()
+                target = pop()
+                if target.__class__ is Array:
+                    try: push(target.get(index)); continue # type: ignore
+                    except Exception as e: return self.subscriptError(codeObj, pc, e)
+                return self.notSubscriptable(codeObj, pc, target)
+            elif op == STORE_INDEX:
+                value = pop()
+                index = pop()
+                target = pop()
+                result = self.storeIndex(codeObj, pc, target, index, value, arg)
+                if isinstance(result, Error): return result
+            elif op == BUILD_ARRAY:
+                count, elementType = arg
+                values = stack[-count:] if count else []
+                if count: del stack[-count:]
+                try: push(Array.of(elementType, values))
+                except TypeError as e: return self.subscriptError(codeObj, pc, e)
+            elif op == MAKE_FUNCTION:
+                funcCode: CodeObject = consts[arg]
+                node = codeObj.nodes[pc - 1]
+                for dataType, _ in node.args: # type: ignore
+                    if dataType.identifier not in INBUILTTYPES:
+                        return UndefinedNameError(f"Name '{dataType.identifier}' is undefined", self.srcMap, dataType.beginPos, dataType.endPos)
+                push(FunctionObject(funcCode))
+
+    def argTypeError(self, codeObj: CodeObject, pc: int, funcCode: CodeObject, args: list):
+        node: CallableNode = codeObj.nodes[pc - 1] # type: ignore
+        for param, arg, expectedType in zip(node.params, args, funcCode.argTypes):
+            if getattr(arg, 'dataType', None) != expectedType:
+                return InvalidAssignmentError(
+                        f"Type {getattr(arg, 'dataType', None)} can't be assigned to parameter of type {expectedType}",
+                        self.srcMap,
+                        param.beginPos, param.endPos
+                    )
+
+    def call(self, codeObj: CodeObject, pc: int, func: object, args: list):
+        node: CallableNode = codeObj.nodes[pc - 1] # type: ignore
+
+        if isinstance(func, Builtin):
+            try: return func.func(*args)
+            except Exception as e:
+                return Error('Error', f'{e}', self.srcMap, node.beginPos, node.endPos)
+
+        return InvalidTypeError(f"Type {getattr(func, 'dataType', None)} is not callable", self.srcMap, node.beginPos, node.endPos)
+
+    def callMethod(self, codeObj: CodeObject, pc: int, value: object, methodName: str, args: list):
+        node: CallableNode = codeObj.nodes[pc - 1] # type: ignore
+        if isinstance(value, Array) and methodName in Array.methods:
+            try: return getattr(value, methodName)(*args)
+            except Exception as e: return self.subscriptError(codeObj, pc, e)
+        if not isinstance(value, Primitive):
+            return InvalidTypeError(f"Type {getattr(value, 'dataType', None)} is not callable", self.srcMap, node.beginPos, node.endPos)
+
+        try: return value.deepCopy(getattr(value, methodName)(*[arg.value for arg in args]))
+        except Exception as e:
+            return Error('Error', f'{e}', self.srcMap, node.beginPos, node.endPos)
+
+    def reassign(self, codeObj: CodeObject, pc: int, currentVal: object, value: object, augOp):
+        node: Node = codeObj.nodes[pc - 1] # type: ignore
+        if getattr(value, 'dataType', None) != getattr(currentVal, 'dataType', None):
+            return InvalidAssignmentError(
+                    f"Type {getattr(value, 'dataType', None)} can't be assigned to declared type {getattr(currentVal, 'dataType', None)}",
+                    self.srcMap,
+                    node.beginPos, node.endPos
+                )
+        if augOp == None: return value
+
+        try: return augOp(currentVal, value)
+        except Exception: return self.unsupportedOperands(codeObj, pc, currentVal, value)
+
+    def storeIndex(self, codeObj: CodeObject, pc: int, target: object, index: object, value: object, augOp):
+        node: IndexAssignNode = codeObj.nodes[pc - 1] # type: ignore
+        if not isinstance(target, Array): return self.notSubscriptable(codeObj, pc, target)
+        if getattr(value, 'dataType', None) != target.elementType:
+            return InvalidAssignmentError(f"Type {getattr(value, 'dataType', None)} can't be assigned to element of type {target.elementType}", self.srcMap, node.beginPos, node.endPos)
+
+        try:
+            if augOp != None: value = augOp(target.get(index), value)
+            target.set(index, value) # type: ignore
+        except Exception as e: return self.subscriptError(codeObj, pc, e)
+
+    def subscriptError(self, codeObj: CodeObject, pc: int, e: Exception):
+        node: Node = codeObj.nodes[pc - 1] # type: ignore
+        if isinstance(e, IndexError): return InvalidIndexError(f'{e}', self.srcMap, node.beginPos, node.endPos)
+        return InvalidTypeError(f'{e}' or 'Unsupported operand types', self.srcMap, node.beginPos, node.endPos)
+
+    def notSubscriptable(self, codeObj: CodeObject, pc: int, target: object):
+        node: Node = codeObj.nodes[pc - 1] # type: ignore
+        return InvalidTypeError(f"Type {getattr(target, 'dataType', None)} is not subscriptable", self.srcMap, node.beginPos, node.endPos)
+
+    def recursionError(self, codeObj: CodeObject, pc: int):
+        node: Node = codeObj.nodes[pc - 1] # type: ignore
+        return Error('RecursionError', f'Maximum call depth of {self.maxDepth} exceeded', self.srcMap, node.beginPos, node.endPos)
+
+    def undefinedName(self, codeObj: CodeObject, pc: int, identifier: str):
+        node: Node = codeObj.nodes[pc - 1] # type: ignore
+        if isinstance(node, CallableNode):
+            return UndefinedNameError(f"Name '{node.callableName}' is undefined", self.srcMap, node.beginPos, node.callableName.endPos)
+        return UndefinedNameError(f"Name {identifier} is undefined", self.srcMap, node.beginPos, node.endPos)
+
+    def unsupportedOperands(self, codeObj: CodeObject, pc: int, left: object, right: object):
+        node = codeObj.nodes[pc - 1]
+        operator = node.operator.tokenType.value if isinstance(node, (BinOpNode, CompOpNode)) else node.assignOp.value # type: ignore
+        return InvalidTypeError(
+            f"Unsopported operand types for '{operator}': {getattr(left, 'dataType', None)} and {getattr(right, 'dataType', None)}",
+            self.srcMap, # type: ignore
+            node.beginPos, # type: ignore
+            node.endPos # type: ignore
+        )
+
+    def unsupportedOperand(self, codeObj: CodeObject, pc: int, value: object):
+        node = codeObj.nodes[pc - 1]
+        return InvalidTypeError(
+            f"Unsupported operand type for '{node.operator.value}': {getattr(value, 'dataType', None)}", # type: ignore
+            self.srcMap, # type: ignore
+            node.beginPos, # type: ignore
+            node.endPos # type: ignore
+        )
+
+def truthy(value: object) -> bool:
+    if isinstance(value, Primitive): return bool(value.value)
+    return bool(value)